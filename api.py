@@ -0,0 +1,291 @@
+"""
+Async HTTP API for F1RacerAgent, as a plain ASGI app served by uvicorn.
+
+Every generation endpoint awaits the agent's async methods, so one worker
+serves many requests concurrently instead of blocking a thread per LLM call.
+Each request is bounded by API_REQUEST_TIMEOUT_SECONDS (504 on expiry); pass
+"latency_budget" to get a fallback response instead of waiting that long.
+
+    POST /context   {"racer", "team", "stage", "session_type", "circuit", "race", "result", "position", "mood"}
+    POST /post      {"racer", "context_type"}
+    POST /reply     {"racer", "comment"}
+    POST /mention   {"racer", "person", "mention_context"}
+    POST /like      {"racer", "post"}
+    POST /thoughts  {"racer"}
+    GET  /health
+    GET  /metrics
+
+Agents are kept per worker, keyed by racer, team and race context. POST
+/context sets a racer's context for later requests to that worker; with
+several workers, send the same fields as "context" on each request instead,
+which needs no shared state.
+
+    python api.py --port 8000 --workers 4
+    uvicorn api:app --workers 4
+"""
+import argparse
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config import get_config
+from f1_agent_langchain import F1RacerAgent, RaceResult, RaceStage, SessionType, get_shared_processor
+from metrics import metrics_registry
+
+MAX_BODY_BYTES = 64 * 1024
+DEFAULT_RACER = "Lightning McQueen"
+DEFAULT_TEAM = "Rusteze Racing"
+CONTEXT_FIELDS = ("stage", "session_type", "circuit", "race", "result", "position", "mood")
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def _required(body: Dict, name: str) -> str:
+    value = body.get(name)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(400, f"'{name}' is required")
+    return value
+
+def _enum(enum_type, value, name: str):
+    if value is None:
+        return None
+    try:
+        return enum_type(value)
+    except ValueError:
+        choices = ", ".join(member.value for member in enum_type)
+        raise HTTPError(400, f"'{name}' must be one of: {choices}")
+
+def parse_context(fields: Dict) -> Dict:
+    """Validate context fields into F1RacerAgent.update_context keyword arguments"""
+    position = fields.get("position")
+    if position is not None and not isinstance(position, int):
+        raise HTTPError(400, "'position' must be an integer")
+    return {
+        "stage": _enum(RaceStage, fields.get("stage", RaceStage.PRACTICE.value), "stage"),
+        "session_type": _enum(SessionType, fields.get("session_type"), "session_type"),
+        "circuit_name": fields.get("circuit"),
+        "race_name": fields.get("race"),
+        "last_result": _enum(RaceResult, fields.get("result"), "result"),
+        "position": position,
+        "mood": fields.get("mood")
+    }
+
+class AgentPool:
+    """
+    Agents for this worker, keyed by (racer, team, context).
+
+    An agent's context never changes after it is built, so concurrent
+    requests never see each other's context. A racer's agents share one
+    near-duplicate index so posts stay varied across contexts. The least
+    recently used agents are dropped beyond max_agents.
+    """
+
+    def __init__(self, max_agents: int = 256):
+        self.max_agents = max_agents
+        self._agents: "OrderedDict[Tuple, F1RacerAgent]" = OrderedDict()
+        self._contexts: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, racer: str, team: str, context: Optional[Dict] = None) -> F1RacerAgent:
+        if context is None:
+            context = self._contexts.get((racer, team), {})
+        key = (racer, team, json.dumps(context, sort_keys=True))
+
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is not None:
+                self._agents.move_to_end(key)
+                return agent
+
+        # Validate before building anything
+        update = parse_context(context)
+        agent = F1RacerAgent(racer, team)
+        agent.update_context(**update)
+
+        with self._lock:
+            sibling = next((a for (r, t, _), a in self._agents.items() if (r, t) == (racer, team)), None)
+            if sibling is not None and sibling.post_index is not None:
+                agent.post_index = sibling.post_index
+            agent = self._agents.setdefault(key, agent)
+            while len(self._agents) > self.max_agents:
+                self._agents.popitem(last=False)
+        return agent
+
+    def warm_up(self, racer: str, team: str):
+        """Build the shared processor and a first agent, so no request pays for them"""
+        try:
+            get_shared_processor()
+        except Exception as e:
+            print(f"Warning: LangChain processor failed to initialize: {e}")
+        self.get(racer, team)
+
+    def set_context(self, racer: str, team: str, fields: Dict) -> F1RacerAgent:
+        context = {name: fields[name] for name in CONTEXT_FIELDS if fields.get(name) is not None}
+        parse_context(context)
+        self._contexts[(racer, team)] = context
+        return self.get(racer, team, context)
+
+pool = AgentPool()
+
+def _agent(body: Dict) -> F1RacerAgent:
+    context = body.get("context")
+    if context is not None and not isinstance(context, dict):
+        raise HTTPError(400, "'context' must be an object")
+    return pool.get(_required(body, "racer"), body.get("team") or DEFAULT_TEAM, context)
+
+def _budget(body: Dict) -> Optional[float]:
+    budget = body.get("latency_budget")
+    if budget is not None and not isinstance(budget, (int, float)):
+        raise HTTPError(400, "'latency_budget' must be a number")
+    return budget
+
+async def post(body: Dict) -> Dict:
+    agent = _agent(body)
+    return {"racer": agent.racer_name, "text": await agent.aspeak(body.get("context_type") or "general", _budget(body))}
+
+async def reply(body: Dict) -> Dict:
+    agent = _agent(body)
+    comment = _required(body, "comment")
+    return {"racer": agent.racer_name, "text": await agent.areply_to_comment(comment, _budget(body))}
+
+async def mention(body: Dict) -> Dict:
+    agent = _agent(body)
+    person = _required(body, "person")
+    text = await agent.amention_teammate_or_competitor(person, body.get("mention_context") or "positive", _budget(body))
+    return {"racer": agent.racer_name, "text": text}
+
+async def like(body: Dict) -> Dict:
+    agent = _agent(body)
+    return {"racer": agent.racer_name, "text": await agent.asimulate_like_action(_required(body, "post"))}
+
+async def thoughts(body: Dict) -> Dict:
+    agent = _agent(body)
+    return {"racer": agent.racer_name, "text": await agent.athink(_budget(body))}
+
+async def context(body: Dict) -> Dict:
+    agent = pool.set_context(_required(body, "racer"), body.get("team") or DEFAULT_TEAM, body)
+    return {
+        "racer": agent.racer_name,
+        "team": agent.team_name,
+        "stage": agent.context.stage.value,
+        "circuit": agent.context.circuit_name,
+        "race": agent.context.race_name,
+        "mood": agent.context.mood
+    }
+
+async def health(body: Dict) -> Dict:
+    try:
+        ready = get_shared_processor().available
+    except Exception:
+        ready = False
+    return {"status": "ok", "processor_ready": ready}
+
+async def metrics(body: Dict) -> Dict:
+    return metrics_registry.snapshot()
+
+ROUTES = {
+    ("POST", "/post"): post,
+    ("POST", "/reply"): reply,
+    ("POST", "/mention"): mention,
+    ("POST", "/like"): like,
+    ("POST", "/thoughts"): thoughts,
+    ("POST", "/context"): context,
+    ("GET", "/health"): health,
+    ("GET", "/metrics"): metrics
+}
+
+async def _read_body(receive) -> Dict:
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise HTTPError(400, "client disconnected")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, "request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            break
+
+    raw = b"".join(chunks)
+    if not raw:
+        return {}
+    try:
+        body = json.loads(raw)
+    except ValueError:
+        raise HTTPError(400, "body must be JSON")
+    if not isinstance(body, dict):
+        raise HTTPError(400, "body must be a JSON object")
+    return body
+
+async def _respond(send, status: int, payload: Dict):
+    data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())]
+    })
+    await send({"type": "http.response.body", "body": data})
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Off the event loop: building the processor imports LangChain and
+            # opens the HTTP client
+            await asyncio.to_thread(pool.warm_up, DEFAULT_RACER, DEFAULT_TEAM)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    method = scope["method"]
+    path = scope["path"].rstrip("/") or "/"
+    handler = ROUTES.get((method, path))
+    try:
+        if handler is None:
+            allowed = any(route_path == path for _, route_path in ROUTES)
+            raise HTTPError(405 if allowed else 404, "method not allowed" if allowed else "not found")
+
+        body = await _read_body(receive) if method == "POST" else {}
+        timeout = get_config().API_REQUEST_TIMEOUT_SECONDS
+        try:
+            payload = await asyncio.wait_for(handler(body), timeout)
+        except asyncio.TimeoutError:
+            metrics_registry.increment("api_timeouts", path)
+            raise HTTPError(504, f"request took longer than {timeout:g}s")
+        await _respond(send, 200, payload)
+
+    except HTTPError as e:
+        await _respond(send, e.status, {"error": e.message})
+    except Exception as e:
+        print(f"API error on {method} {path}: {e}")
+        await _respond(send, 500, {"error": "internal error"})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=get_config().API_WORKERS)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers, lifespan="on")
+
+if __name__ == "__main__":
+    main()
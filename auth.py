@@ -143,55 +143,69 @@ def validate_password_strength(password: str) -> tuple[bool, str]:
     
     return True, "Password strength is adequate"
 
-# Rate limiting (basic implementation)
-import time
-from collections import defaultdict
+# Rate limiting
+import threading
+from login_limiter import RateLimiter, create_rate_limiter
+from config import get_config
 
-class RateLimiter:
-    """Simple rate limiter for login attempts"""
-    
-    def __init__(self, max_attempts: int = 5, window_minutes: int = 15):
-        self.max_attempts = max_attempts
-        self.window_seconds = window_minutes * 60
-        self.attempts = defaultdict(list)
-    
-    def is_allowed(self, identifier: str) -> bool:
-        """Check if login attempt is allowed"""
-        now = time.time()
-        
-        # Clean old attempts
-        self.attempts[identifier] = [
-            attempt_time for attempt_time in self.attempts[identifier]
-            if now - attempt_time < self.window_seconds
-        ]
-        
-        # Check if under limit
-        return len(self.attempts[identifier]) < self.max_attempts
-    
-    def record_attempt(self, identifier: str):
-        """Record a login attempt"""
-        self.attempts[identifier].append(time.time())
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Login rate limiter from configuration, created on first use"""
+    global _rate_limiter
     
-    def get_wait_time(self, identifier: str) -> int:
-        """Get wait time before next attempt allowed"""
-        if not self.attempts[identifier]:
-            return 0
-        
-        oldest_attempt = min(self.attempts[identifier])
-        wait_time = self.window_seconds - (time.time() - oldest_attempt)
-        return max(0, int(wait_time))
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            config = get_config()
+            _rate_limiter = create_rate_limiter(
+                config.MAX_LOGIN_ATTEMPTS,
+                config.LOGIN_RATE_LIMIT_MINUTES,
+                config.LOGIN_RATE_LIMIT_PATH,
+                config.LOGIN_RATE_LIMIT_MAX_IDENTIFIERS
+            )
+        return _rate_limiter
 
-# Global rate limiter
-rate_limiter = RateLimiter()
+def login_identifiers(username: str) -> list:
+    """Rate limit keys for a login attempt: the username, and the client address when known"""
+    identifiers = [f"user:{(username or '').strip().lower()}"]
+    # st.context.ip_address only exists on newer Streamlit; key by user alone without it
+    ip_address = getattr(getattr(st, "context", None), "ip_address", None)
+    if isinstance(ip_address, str) and ip_address:
+        identifiers.append(f"ip:{ip_address}")
+    return identifiers
 
 def check_rate_limit(identifier: str) -> tuple[bool, int]:
     """Check if login attempt is rate limited"""
-    if rate_limiter.is_allowed(identifier):
-        return True, 0
-    else:
-        wait_time = rate_limiter.get_wait_time(identifier)
-        return False, wait_time
+    return get_rate_limiter().check(identifier)
 
 def record_login_attempt(identifier: str):
     """Record a login attempt for rate limiting"""
-    rate_limiter.record_attempt(identifier)
+    get_rate_limiter().record_attempt(identifier)
+
+def reserve_login_attempt(identifiers: list) -> int:
+    """
+    Count a login attempt against every identifier before checking the password.
+    
+    Each check-and-count is atomic, so concurrent logins cannot all take the
+    last attempt. Returns 0 when the attempt may go ahead, else the seconds to
+    wait; a refused attempt is not counted against any identifier.
+    """
+    limiter = get_rate_limiter()
+    reserved = []
+    wait = 0
+    for identifier in identifiers:
+        allowed, seconds = limiter.check(identifier, record=True)
+        if allowed:
+            reserved.append(identifier)
+        else:
+            wait = max(wait, seconds)
+    if wait:
+        release_login_attempt(reserved)
+    return wait
+
+def release_login_attempt(identifiers: list):
+    """Take back a reserved attempt, so successful logins do not count toward the limit"""
+    limiter = get_rate_limiter()
+    for identifier in identifiers:
+        limiter.release_attempt(identifier)
@@ -0,0 +1,210 @@
+"""
+Offline benchmark suite for every F1RacerAgent operation, including fallbacks.
+
+Runs against the local fake LLM backend (LLM_BACKEND=fake), so no Azure
+endpoint is needed. With the default zero fake latency the numbers are the
+agent's own overhead. Set --latency/--tps to simulate a realistic model.
+
+For each operation it reports throughput, p50/p95/p99 latency and the memory
+allocated per call. Use --save to write a JSON baseline, and --baseline to
+compare against one and exit non-zero on a regression.
+
+    python benchmarks/bench_agent.py
+    python benchmarks/bench_agent.py --iterations 500 --save bench_baseline.json
+    python benchmarks/bench_agent.py --baseline bench_baseline.json --tolerance 0.25
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_COMMENTS = [
+    "Amazing drive today! You were flying out there!",
+    "Tough luck with the result, but we believe in you!",
+    "What's your favorite part about racing at this circuit?",
+    "Keep pushing! The championship is still possible!",
+    "That overtake was absolutely brilliant!",
+]
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def measure(name, operation, iterations):
+    """Time each call and count the bytes it allocates"""
+    operation(0)  # warm-up
+
+    latencies = []
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    allocated_before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "operation": name,
+        "iterations": iterations,
+        "throughput_per_s": iterations / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "retained_kib": (current - allocated_before) / 1024,
+        "peak_kib": peak / 1024,
+    }
+
+def build_operations(agent, batch_size):
+    """Every agent operation as a callable taking the iteration number"""
+    comment = lambda i: SAMPLE_COMMENTS[i % len(SAMPLE_COMMENTS)] + f" #{i}"
+
+    return {
+        "speak": lambda i: agent.speak("general"),
+        "speak_stream": lambda i: "".join(agent.speak_stream("general")),
+        "reply_to_comment": lambda i: agent.reply_to_comment(comment(i)),
+        "reply_to_comment_stream": lambda i: "".join(agent.reply_to_comment_stream(comment(i))),
+        "mention": lambda i: agent.mention_teammate_or_competitor(f"Driver {i}", "competitive"),
+        "simulate_like_action": lambda i: agent.simulate_like_action(comment(i)),
+        "think": lambda i: agent.think(),
+        "think_stream": lambda i: "".join(agent.think_stream()),
+        "aspeak": lambda i: asyncio.run(agent.aspeak("general")),
+        "batch_reply_to_comment": lambda i: agent.batch_reply_to_comment(
+            [comment(i * batch_size + j) for j in range(batch_size)]
+        ),
+        "abatch_reply_to_comment": lambda i: asyncio.run(agent.abatch_reply_to_comment(
+            [comment(i * batch_size + j) for j in range(batch_size)]
+        )),
+        "batch_simulate_like_action": lambda i: agent.batch_simulate_like_action(
+            [comment(i * batch_size + j) for j in range(batch_size)]
+        ),
+    }
+
+def build_fallback_operations(agent):
+    """The non-LLM paths, measured directly"""
+    comment = lambda i: SAMPLE_COMMENTS[i % len(SAMPLE_COMMENTS)]
+
+    return {
+        "fallback_speak": lambda i: agent._fallback_speak("general"),
+        "fallback_reply": lambda i: agent._fallback_reply(comment(i)),
+        "fallback_mention": lambda i: agent._fallback_mention(f"Driver {i}", "teammate"),
+        "fallback_think": lambda i: agent._fallback_think(),
+        "fallback_like": lambda i: agent.simulate_like_action(comment(i)),
+    }
+
+def run_suite(args):
+    """Run the LLM-backed, error-path and fallback benchmarks"""
+    from f1_agent_langchain import F1RacerAgent, LangChainProcessor, RaceStage
+    from config import reload_config
+
+    results = []
+
+    config = reload_config()
+    agent = F1RacerAgent("Bench Driver", "Bench Racing", processor=LangChainProcessor(config))
+    agent.update_context(RaceStage.RACE, circuit_name="Monza", race_name="Italian Grand Prix")
+    for name, operation in build_operations(agent, args.batch_size).items():
+        results.append(measure(name, operation, args.iterations))
+
+    # Every LLM call fails: measures the exception-to-fallback path. The breaker
+    # would open after a few failures and short-circuit every later call, so
+    # it never trips here; the open circuit gets its own rows below.
+    os.environ["FAKE_LLM_ERROR_RATE"] = "1.0"
+    failing_config = reload_config()
+    never_trips = replace(failing_config, CIRCUIT_FAILURE_THRESHOLD=sys.maxsize)
+    failing = F1RacerAgent("Bench Driver", "Bench Racing", processor=LangChainProcessor(never_trips))
+    for name in ("speak", "reply_to_comment", "think"):
+        operation = build_operations(failing, args.batch_size)[name]
+        results.append(measure(f"{name}[llm_error]", operation, args.iterations))
+        assert not failing.processor.breaker.is_open
+
+    # Circuit open: calls are refused before reaching the model
+    tripped = F1RacerAgent("Bench Driver", "Bench Racing", processor=LangChainProcessor(failing_config))
+    for _ in range(failing_config.CIRCUIT_FAILURE_THRESHOLD):
+        tripped.processor.breaker.record_failure(RuntimeError("benchmark"))
+    for name in ("speak", "reply_to_comment", "think"):
+        operation = build_operations(tripped, args.batch_size)[name]
+        results.append(measure(f"{name}[circuit_open]", operation, args.iterations))
+    os.environ["FAKE_LLM_ERROR_RATE"] = str(args.error_rate)
+    reload_config()
+
+    # Processor unavailable: pure fallback paths
+    offline = F1RacerAgent("Bench Driver", "Bench Racing", processor=agent.processor)
+    offline.processor_ready = False
+    for name, operation in build_fallback_operations(offline).items():
+        results.append(measure(name, operation, args.iterations))
+
+    return results
+
+def compare(results, baseline_path, tolerance):
+    """Return the operations whose p95 or throughput regressed beyond tolerance"""
+    with open(baseline_path) as f:
+        baseline = {entry["operation"]: entry for entry in json.load(f)}
+
+    regressions = []
+    for entry in results:
+        previous = baseline.get(entry["operation"])
+        if not previous:
+            continue
+        if entry["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{entry['operation']}: p95 {previous['p95_ms']:.2f} -> {entry['p95_ms']:.2f} ms")
+        if entry["throughput_per_s"] < previous["throughput_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{entry['operation']}: throughput {previous['throughput_per_s']:.1f} -> "
+                f"{entry['throughput_per_s']:.1f}/s"
+            )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="fake time to first token, seconds")
+    parser.add_argument("--tps", type=float, default=0.0, help="fake tokens per second (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cache", action="store_true", help="leave the response cache enabled")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a JSON file written by --save")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_SECONDS"] = str(args.latency)
+    os.environ["FAKE_LLM_TOKENS_PER_SECOND"] = str(args.tps)
+    os.environ["FAKE_LLM_ERROR_RATE"] = str(args.error_rate)
+    os.environ["CACHE_ENABLED"] = "true" if args.cache else "false"
+    os.environ["CACHE_DIR"] = ""
+
+    results = run_suite(args)
+
+    header = f"{'operation':32} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'retained KiB':>13} {'peak KiB':>10}"
+    print(header)
+    print("-" * len(header))
+    for entry in results:
+        print(f"{entry['operation']:32} {entry['throughput_per_s']:10.1f} {entry['p50_ms']:9.3f} "
+              f"{entry['p95_ms']:9.3f} {entry['p99_ms']:9.3f} {entry['retained_kib']:13.1f} {entry['peak_kib']:10.1f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Post-generation throughput: HTTP API vs. the Streamlit app, on the fake LLM backend.
+
+"streamlit" drives streamlit_app.py through AppTest. Each simulated user is
+one session that logs in, configures the agent and clicks Generate Post; every
+click reruns the whole script and holds that session until the LLM answers.
+"api" starts `uvicorn api:app` with --workers processes and sends the same
+number of POST /post requests, --concurrency at a time.
+
+Both paths use the same F1RacerAgent core and the same fake model latency, so
+the difference is the serving model.
+
+    python benchmarks/bench_api.py --requests 200 --concurrency 20 --latency 0.2
+    python benchmarks/bench_api.py --workers 4 --skip-streamlit
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def summarize(mode: str, latencies: list, elapsed: float) -> dict:
+    latencies.sort()
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "throughput_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+    }
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def run_api(requests: int, concurrency: int, workers: int) -> dict:
+    """Start uvicorn, wait for /health, then send POST /post with bounded concurrency"""
+    import httpx
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    async def drive() -> dict:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("API server did not start")
+                await asyncio.sleep(0.1)
+
+            semaphore = asyncio.Semaphore(concurrency)
+            latencies = []
+
+            async def one(i: int):
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post("/post", json={"racer": f"Driver {i % concurrency}"})
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(requests)))
+            return summarize(f"api[{workers} worker(s)]", latencies, time.perf_counter() - started)
+
+    try:
+        return asyncio.run(drive())
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+def run_streamlit(requests: int, concurrency: int) -> dict:
+    """One AppTest session per simulated user, each clicking Generate Post in turn"""
+    from streamlit.testing.v1 import AppTest
+
+    def button(app, label):
+        return next(b for b in app.button if label in b.label)
+
+    sessions = []
+    for _ in range(concurrency):
+        app = AppTest.from_file(os.path.join(ROOT, "streamlit_app.py"), default_timeout=60)
+        app.run()
+        app.text_input[0].input("admin")
+        app.text_input[1].input("f1racing2024")
+        app.button[0].click().run()
+        button(app, "Configure Agent").click().run()
+        sessions.append(app)
+
+    latencies = []
+    lock = threading.Lock()
+    per_session = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def user(app, clicks: int):
+        for _ in range(clicks):
+            started = time.perf_counter()
+            button(app, "Generate Post").click().run()
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=user, args=(app, clicks)) for app, clicks in zip(sessions, per_session)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize("streamlit", latencies, time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20, help="requests in flight / simulated users")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake time to first token, seconds")
+    parser.add_argument("--tps", type=float, default=0.0, help="fake tokens per second (0 = instant)")
+    parser.add_argument("--skip-streamlit", action="store_true")
+    args = parser.parse_args()
+
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_SECONDS"] = str(args.latency)
+    os.environ["FAKE_LLM_TOKENS_PER_SECOND"] = str(args.tps)
+    os.environ["CACHE_ENABLED"] = "false"
+    os.environ["CACHE_DIR"] = ""
+    os.environ["INTERACTION_STORE_PATH"] = ""
+    os.environ["DEDUP_ENABLED"] = "false"  # the fake model repeats itself; don't time the retries
+
+    results = []
+    if not args.skip_streamlit:
+        results.append(run_streamlit(args.requests, args.concurrency))
+    results.append(run_api(args.requests, args.concurrency, args.workers))
+
+    for result in results:
+        print("  ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                        for key, value in result.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Cold-start import time for the agent's entry points.
+
+Each measurement runs in a fresh interpreter, like a container cold start
+or a freshly spawned worker, and reports the median wall time to import the
+module plus which heavy packages that import pulled in. "first_llm_use"
+times building the shared processor on the fake backend, which is where
+LangChain is loaded now.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --runs 10 --modules f1_agent_langchain api
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_PACKAGES = ("langchain", "langchain_core", "langchain_openai", "openai", "httpx", "streamlit")
+
+DEFAULT_MODULES = ["config", "f1_agent_langchain", "grid", "cli", "api"]
+
+IMPORT_SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+loaded = sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy!r}))
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+FIRST_USE_SNIPPET = """
+import json, time
+import f1_agent_langchain
+started = time.perf_counter()
+f1_agent_langchain.get_shared_processor()
+print(json.dumps({"seconds": time.perf_counter() - started, "loaded": []}))
+"""
+
+def run_snippet(code: str) -> dict:
+    env = dict(os.environ, LLM_BACKEND="fake", CACHE_DIR="", INTERACTION_STORE_PATH="")
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def measure(code: str, runs: int) -> dict:
+    # One unmeasured run so every measured run finds the bytecode cache warm
+    run_snippet(code)
+    samples = [run_snippet(code) for _ in range(runs)]
+    return {
+        "median_ms": statistics.median(sample["seconds"] for sample in samples) * 1000,
+        "loaded": samples[-1]["loaded"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        result = measure(IMPORT_SNIPPET.format(module=module, heavy=HEAVY_PACKAGES), args.runs)
+        print(f"import {module:<20} median_ms={result['median_ms']:8.1f}  "
+              f"loaded={','.join(result['loaded']) or '-'}")
+
+    result = measure(FIRST_USE_SNIPPET, args.runs)
+    print(f"{'first_llm_use':<27} median_ms={result['median_ms']:8.1f}")
+
+if __name__ == "__main__":
+    main()
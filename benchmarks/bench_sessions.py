@@ -0,0 +1,72 @@
+"""
+Per-session cost of F1RacerAgent: shared processor vs. one processor per session.
+
+Measures the memory allocated by each new session's agent and the latency of
+that session's first request. "per-session" reproduces the old behaviour where
+every agent built its own LangChainProcessor, Azure client and chains;
+"shared" uses the process-wide registry.
+
+    python benchmarks/bench_sessions.py --sessions 50
+    python benchmarks/bench_sessions.py --sessions 20 --live   # also time a real first request
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from f1_agent_langchain import F1RacerAgent, LangChainProcessor, clear_shared_processors
+
+def run(mode: str, sessions: int, live: bool) -> dict:
+    """Create `sessions` agents and record memory/latency for each one"""
+    clear_shared_processors()
+    agents = []
+    memory = []
+    build_times = []
+    first_request = []
+
+    tracemalloc.start()
+    for i in range(sessions):
+        before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+
+        processor = LangChainProcessor() if mode == "per-session" else None
+        agent = F1RacerAgent(f"Driver {i}", "Bench Racing", processor=processor)
+
+        build_times.append(time.perf_counter() - started)
+        memory.append(tracemalloc.get_traced_memory()[0] - before)
+        agents.append(agent)
+
+        if live:
+            started = time.perf_counter()
+            agent.reply_to_comment(f"Good luck this weekend! ({mode} {i})")
+            first_request.append(time.perf_counter() - started)
+    tracemalloc.stop()
+
+    result = {
+        "mode": mode,
+        "sessions": sessions,
+        "memory_per_session_kib": statistics.mean(memory) / 1024,
+        "build_ms_p50": statistics.median(build_times) * 1000,
+    }
+    if first_request:
+        result["first_request_ms_p50"] = statistics.median(first_request) * 1000
+        result["first_request_ms_max"] = max(first_request) * 1000
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--live", action="store_true", help="send one request per session to the LLM backend")
+    args = parser.parse_args()
+
+    for mode in ("per-session", "shared"):
+        result = run(mode, args.sessions, args.live)
+        print("  ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                        for key, value in result.items()))
+
+if __name__ == "__main__":
+    main()
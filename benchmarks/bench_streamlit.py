@@ -0,0 +1,145 @@
+"""
+Server CPU time per Streamlit rerun, on the fake LLM backend.
+
+Drives streamlit_app.py through AppTest: logs in, configures the agent,
+fills the interaction history, then repeats two interactions and reports the
+CPU time (time.process_time) each rerun costs:
+
+    select    change the post type, which only re-renders
+    generate  click "Generate Post"
+    page      click whichever of the history panel's Older/Newer is enabled
+
+"full" reruns the whole script for every interaction, which is what every
+click cost before the app used fragments. "fragment" reruns only the
+fragment that owns the clicked widget, which is what the server does for a
+widget inside an @st.fragment. AppTest has no public switch for fragment
+reruns, so the benchmark queues the fragment on AppTest's rerun request the
+way the browser does; for an app without fragments only "full" is reported.
+
+The numbers include AppTest parsing the rerun's messages, which scales with
+the same element count the browser would receive. The script is compiled
+once, as on the server.
+
+    python benchmarks/bench_streamlit.py --reruns 50
+    git show HEAD~1:streamlit_app.py > old_app.py && python benchmarks/bench_streamlit.py --app old_app.py
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Fragment ids to rerun instead of the whole script; empty for a full rerun
+_fragment_queue = []
+
+def _patch_app_test():
+    """
+    Make AppTest rerun like the server does.
+
+    AppTest compiles the script afresh for every run, which would swamp the
+    app's own cost; the server compiles it once, so share one ScriptCache.
+    Reruns also carry _fragment_queue, as a browser rerun of a fragment does.
+    """
+    import streamlit.testing.v1.app_test as app_test
+    import streamlit.testing.v1.local_script_runner as local_script_runner
+    from streamlit.runtime.scriptrunner import RerunData
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+    def rerun_data(**kwargs):
+        return RerunData(fragment_id_queue=list(_fragment_queue), **kwargs)
+
+    local_script_runner.RerunData = rerun_data
+
+def fragment_id(app, name: str):
+    """Id of the registered fragment wrapping the function called name, if any"""
+    for fid, wrapped in app._fragment_storage._fragments.items():
+        for cell in wrapped.__closure__ or ():
+            if getattr(cell.cell_contents, "__name__", None) == name:
+                return fid
+    return None
+
+def button(app, label: str):
+    return next(b for b in app.button if label in b.label)
+
+def start_session(path: str, posts: int):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(path, default_timeout=60)
+    app.run()
+    app.text_input[0].input("admin")
+    app.text_input[1].input("f1racing2024")
+    app.button[0].click().run()
+    button(app, "Configure Agent").click().run()
+    for _ in range(posts):
+        button(app, "Generate Post").click().run()
+    return app
+
+def measure(app, reruns: int, interact) -> dict:
+    cpu = []
+    for i in range(reruns):
+        started = time.process_time()
+        interact(app, i)
+        cpu.append(time.process_time() - started)
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+    return {"mean_ms": statistics.mean(cpu) * 1000, "p50_ms": statistics.median(cpu) * 1000}
+
+def select(app, i: int):
+    post_type = next(s for s in app.selectbox if s.label == "Post Type")
+    post_type.select_index(i % len(post_type.options)).run()
+
+def generate(app, i: int):
+    button(app, "Generate Post").click().run()
+
+def page(app, i: int):
+    preferred = ["Older", "Newer"] if i % 2 == 0 else ["Newer", "Older"]
+    enabled = [b for label in preferred for b in app.button if label in b.label and not b.disabled]
+    enabled[0].click().run()
+
+SCENARIOS = {
+    "select": (select, "agent_interaction_tab"),
+    "generate": (generate, "agent_interaction_tab"),
+    "page": (page, "interaction_history_panel"),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=os.path.join(ROOT, "streamlit_app.py"))
+    parser.add_argument("--reruns", type=int, default=30, help="timed reruns per scenario and mode")
+    parser.add_argument("--posts", type=int, default=10, help="posts in the history before timing")
+    args = parser.parse_args()
+
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_SECONDS"] = "0"
+    os.environ["FAKE_LLM_TOKENS_PER_SECOND"] = "0"
+    os.environ["CACHE_ENABLED"] = "false"
+    os.environ["CACHE_DIR"] = ""
+    # Paging reads the persistent store
+    store_dir = tempfile.mkdtemp()
+    os.environ["INTERACTION_STORE_PATH"] = os.path.join(store_dir, "interactions.db")
+    os.environ["DEDUP_ENABLED"] = "false"
+    os.environ["HISTORY_PAGE_SIZE"] = "5"
+    _patch_app_test()
+
+    for scenario, (interact, fragment) in SCENARIOS.items():
+        for mode in ("full", "fragment"):
+            _fragment_queue.clear()
+            app = start_session(os.path.abspath(args.app), args.posts)
+            if mode == "fragment":
+                fid = fragment_id(app, fragment)
+                if fid is None:
+                    continue
+                _fragment_queue.append(fid)
+            result = measure(app, args.reruns, interact)
+            print(f"scenario={scenario}  mode={mode}  reruns={args.reruns}  "
+                  f"cpu_mean_ms={result['mean_ms']:.2f}  cpu_p50_ms={result['p50_ms']:.2f}")
+
+if __name__ == "__main__":
+    main()
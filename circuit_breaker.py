@@ -0,0 +1,163 @@
+import threading
+import time
+from enum import Enum
+from typing import Callable, Dict, Optional
+
+class CircuitState(Enum):
+    """States of the LLM circuit breaker"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while the circuit is open"""
+
+def counts_as_failure(error: BaseException) -> bool:
+    """Whether an error says the backend is degraded (not just a bad request)"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int) and 400 <= status_code < 500 and status_code not in (408, 429):
+        return False
+    return True
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker shared by every LLM call.
+
+    After failure_threshold consecutive failures the circuit opens and callers
+    are refused immediately so they can serve fallbacks. While open, a
+    background thread runs the probe every recovery_seconds; the first
+    successful probe moves the circuit to half-open, where up to
+    half_open_max_calls real requests are let through. A success there closes
+    the circuit, a failure opens it again. Without a probe the circuit moves to
+    half-open on its own once recovery_seconds have passed.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_seconds: float = 30.0,
+                 half_open_max_calls: int = 1, probe: Optional[Callable[[], object]] = None,
+                 on_transition: Optional[Callable[[CircuitState, CircuitState], None]] = None):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.probe = probe
+        self.on_transition = on_transition
+
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._half_open_in_flight = 0
+        self._opened_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._probes = 0
+        self._rejected = 0
+        self._prober: Optional[threading.Thread] = None
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == CircuitState.OPEN
+
+    def before_call(self):
+        """Reserve permission for one LLM call, or raise CircuitOpenError"""
+        with self._lock:
+            self._maybe_half_open()
+
+            if self._state == CircuitState.OPEN:
+                self._rejected += 1
+                raise CircuitOpenError(f"LLM circuit open since {self._opened_at:.0f}: {self._last_error}")
+
+            if self._state == CircuitState.HALF_OPEN:
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    self._rejected += 1
+                    raise CircuitOpenError("LLM circuit half-open; trial request already in flight")
+                self._half_open_in_flight += 1
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            if self._state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self._transition(CircuitState.CLOSED)
+
+    def record_failure(self, error: BaseException):
+        if not counts_as_failure(error):
+            self.release()
+            return
+
+        with self._lock:
+            self._last_error = f"{type(error).__name__}: {error}"
+            self._consecutive_failures += 1
+
+            if self._state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self._open()
+            elif self._state == CircuitState.CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def release(self):
+        """Give back a half-open slot for a call that neither succeeded nor failed"""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def _open(self):
+        """Open the circuit and start background probing (lock held)"""
+        self._opened_at = time.time()
+        self._transition(CircuitState.OPEN)
+
+        if self.probe is not None and (self._prober is None or not self._prober.is_alive()):
+            self._prober = threading.Thread(target=self._probe_until_recovered, name="llm-circuit-probe", daemon=True)
+            self._prober.start()
+
+    def _maybe_half_open(self):
+        """Without a probe, allow a trial once the recovery window has passed (lock held)"""
+        if (self.probe is None and self._state == CircuitState.OPEN
+                and time.time() - self._opened_at >= self.recovery_seconds):
+            self._half_open_in_flight = 0
+            self._transition(CircuitState.HALF_OPEN)
+
+    def _probe_until_recovered(self):
+        """Background loop: probe the backend until it answers, then go half-open"""
+        while True:
+            time.sleep(self.recovery_seconds)
+            with self._lock:
+                if self._state != CircuitState.OPEN:
+                    return
+                self._probes += 1
+
+            try:
+                self.probe()
+            except Exception as e:
+                with self._lock:
+                    self._last_error = f"{type(e).__name__}: {e}"
+                continue
+
+            with self._lock:
+                if self._state == CircuitState.OPEN:
+                    self._half_open_in_flight = 0
+                    self._transition(CircuitState.HALF_OPEN)
+            return
+
+    def _transition(self, new_state: CircuitState):
+        old_state = self._state
+        self._state = new_state
+        if old_state != new_state and self.on_transition:
+            self.on_transition(old_state, new_state)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "state": self._state.value,
+                "consecutive_failures": self._consecutive_failures,
+                "opened_at": self._opened_at,
+                "last_error": self._last_error,
+                "probes": self._probes,
+                "rejected": self._rejected
+            }
@@ -0,0 +1,200 @@
+"""
+Run F1RacerAgent over a file of inputs without the Streamlit UI.
+
+Reads JSONL or CSV (by extension, or --format) and runs one task per row:
+
+    reply    fan comments      column "comment" (or "text")
+    like     posts to like     column "post" (or "text")
+    mention  mention targets   column "person", optional "context" (default positive)
+
+Rows are processed --parallel at a time and written to --output as JSONL in
+the order they complete, one {"id", "task", "input", "output", "elapsed_ms"}
+object per row. Rows are identified by their "id" column, or by row number.
+
+The output file doubles as the checkpoint: on start, every id already in it
+is skipped, so an interrupted run picks up where it stopped instead of
+generating (and paying for) the same rows again. Rows that failed are written
+with an "error" field and retried on the next run. So are rows answered with
+a canned fallback instead of the LLM (circuit open, timeout, rate limit...),
+unless --allow-fallback is given.
+
+    python cli.py reply comments.jsonl -o replies.jsonl --parallel 16
+    python cli.py mention targets.csv -o mentions.jsonl --stage post_race --result podium
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, Set, Tuple
+
+from f1_agent_langchain import F1RacerAgent, RaceResult, RaceStage, track_fallbacks
+from request_scheduler import Priority, prioritized
+
+TASKS = {
+    "reply": lambda agent, row: agent.reply_to_comment(_field(row, "comment", "text")),
+    "like": lambda agent, row: agent.simulate_like_action(_field(row, "post", "text")),
+    "mention": lambda agent, row: agent.mention_teammate_or_competitor(
+        _field(row, "person", "person_name"), row.get("context") or "positive"
+    ),
+}
+
+def _field(row: Dict, *names: str) -> str:
+    for name in names:
+        if row.get(name):
+            return str(row[name])
+    raise ValueError(f"row has no {' or '.join(repr(name) for name in names)} field")
+
+def read_rows(path: str, fmt: str) -> Iterator[Tuple[str, Dict]]:
+    """Yield (id, row) pairs lazily so large inputs are never loaded whole"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for number, row in enumerate(rows, start=1):
+            yield str(row["id"] if "id" in row else number), row
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Ids already written successfully; drops a line torn by a crash mid-write"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, "rb+") as f:
+        data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            f.truncate(complete)
+        for line in data[:complete].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if "error" not in record:
+                done.add(str(record.get("id")))
+    return done
+
+class JsonlWriter:
+    """Appends records as they complete; fsyncs every sync_every records"""
+
+    def __init__(self, path: str, sync_every: int = 100):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.sync_every = sync_every
+        self.written = 0
+
+    def write(self, record: Dict):
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self.written += 1
+            if self.written % self.sync_every == 0:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+def run_row(agent: F1RacerAgent, task: str, row_id: str, row: Dict, allow_fallback: bool = False) -> Dict:
+    started = time.perf_counter()
+    record = {"id": row_id, "task": task, "input": row}
+    try:
+        with prioritized(Priority.BATCH), track_fallbacks() as fallbacks:
+            record["output"] = TASKS[task](agent, row)
+        if fallbacks and not allow_fallback:
+            record["error"] = f"fallback response served ({', '.join(sorted(set(fallbacks)))})"
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return record
+
+def run(agent: F1RacerAgent, task: str, rows: Iterator[Tuple[str, Dict]], done: Set[str],
+        writer: JsonlWriter, parallel: int, allow_fallback: bool = False) -> Dict[str, int]:
+    """
+    Stream rows through the agent with at most `parallel` in flight.
+
+    Only a bounded window of rows is read ahead, so memory stays flat however
+    long the input is.
+    """
+    counts = {"processed": 0, "skipped": 0, "errors": 0}
+    pending = set()
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="cli") as executor:
+        for row_id, row in rows:
+            if row_id in done:
+                counts["skipped"] += 1
+                continue
+            if len(pending) >= parallel * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _write_finished(finished, writer, counts)
+            pending.add(executor.submit(run_row, agent, task, row_id, row, allow_fallback))
+
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            _write_finished(finished, writer, counts)
+    return counts
+
+def _write_finished(finished, writer: JsonlWriter, counts: Dict[str, int]):
+    for future in finished:
+        record = future.result()
+        writer.write(record)
+        counts["errors" if "error" in record else "processed"] += 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("task", choices=sorted(TASKS))
+    parser.add_argument("input", help="JSONL or CSV file")
+    parser.add_argument("-o", "--output", required=True, help="JSONL results, also the resume checkpoint")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="input format (default: from extension)")
+    parser.add_argument("--parallel", type=int, default=8, help="rows in flight at once")
+    parser.add_argument("--allow-fallback", action="store_true",
+                        help="count rows answered with a canned fallback as done instead of failed")
+    parser.add_argument("--racer", default="Lightning McQueen")
+    parser.add_argument("--team", default="Rusteze Racing")
+    parser.add_argument("--stage", choices=[stage.value for stage in RaceStage], default=RaceStage.RACE.value)
+    parser.add_argument("--result", choices=[result.value for result in RaceResult])
+    parser.add_argument("--position", type=int)
+    parser.add_argument("--circuit")
+    parser.add_argument("--race")
+    parser.add_argument("--mood")
+    args = parser.parse_args()
+
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+    fmt = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+
+    agent = F1RacerAgent(args.racer, args.team)
+    agent.update_context(
+        RaceStage(args.stage),
+        circuit_name=args.circuit,
+        race_name=args.race,
+        last_result=RaceResult(args.result) if args.result else None,
+        position=args.position,
+        mood=args.mood,
+        pregenerate=False
+    )
+
+    done = load_checkpoint(args.output)
+    writer = JsonlWriter(args.output)
+    started = time.perf_counter()
+    try:
+        counts = run(agent, args.task, read_rows(args.input, fmt), done, writer, args.parallel, args.allow_fallback)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    rate = counts["processed"] / elapsed if elapsed else 0.0
+    print(
+        f"{counts['processed']} processed, {counts['skipped']} already done, {counts['errors']} failed "
+        f"in {elapsed:.1f}s ({rate:.1f}/s)",
+        file=sys.stderr
+    )
+    sys.exit(1 if counts["errors"] else 0)
+
+if __name__ == "__main__":
+    main()
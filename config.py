@@ -1,7 +1,15 @@
 import os
 from dataclasses import dataclass
 from typing import Optional
-import streamlit as st
+
+REQUIRED_ENV_HELP = """Please ensure the following environment variables are set:
+- AZURE_OPENAI_ENDPOINT
+- AZURE_OPENAI_API_KEY
+- AZURE_OPENAI_API_VERSION (optional)
+- AZURE_OPENAI_DEPLOYMENT_NAME (optional)"""
+
+class ConfigurationError(ValueError):
+    """The environment does not describe a valid configuration"""
 
 @dataclass
 class Config:
@@ -30,13 +38,78 @@ class Config:
     DEFAULT_RACE: str = "German Grand Prix"
     
     # LLM Configuration
+    LLM_BACKEND: str = "azure"
     LLM_TEMPERATURE: float = 0.7
     LLM_MAX_TOKENS: int = 500
     LLM_TIMEOUT_SECONDS: int = 30
+    LLM_MAX_RETRIES: int = 1
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE: int = 20
+    LLM_LATENCY_BUDGET_SECONDS: float = 0.0  # 0 disables the budget
+    LLM_BUDGET_WORKERS: int = 100  # threads for budgeted calls; only a cap on threads, not on LLM concurrency
+    LLM_REQUESTS_PER_MINUTE: int = 0  # deployment RPM quota; 0 disables the limit
+    LLM_TOKENS_PER_MINUTE: int = 0  # deployment TPM quota; 0 disables the limit
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    
+    # Circuit Breaker Configuration
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RECOVERY_SECONDS: int = 30
+    CIRCUIT_HALF_OPEN_MAX_CALLS: int = 1
+    
+    # HTTP API Configuration
+    API_REQUEST_TIMEOUT_SECONDS: float = 30.0
+    API_WORKERS: int = 1
+    
+    # Near-duplicate Post Detection Configuration
+    DEDUP_ENABLED: bool = True
+    DEDUP_SIMILARITY_THRESHOLD: float = 0.7
+    DEDUP_MAX_POSTS: int = 10000
+    DEDUP_MAX_RETRIES: int = 2
+    
+    # Speculative Pre-generation Configuration
+    SPECULATION_ENABLED: bool = False
+    SPECULATION_MAX_CONCURRENCY: int = 2
+    SPECULATION_TOKENS_PER_MINUTE: int = 4000
+    
+    # Fake LLM Configuration (LLM_BACKEND=fake)
+    FAKE_LLM_LATENCY_SECONDS: float = 0.2
+    FAKE_LLM_TOKENS_PER_SECOND: float = 50.0
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    
+    # Sentiment Configuration
+    SENTIMENT_LLM_ESCALATION: bool = True
+    SENTIMENT_CONFIDENCE_THRESHOLD: float = 0.3
+    SENTIMENT_BATCH_MAX_ITEMS: int = 25
+    SENTIMENT_BATCH_MAX_PROMPT_TOKENS: int = 3000
+    SENTIMENT_BATCH_MAX_RETRIES: int = 2
+    
+    # Response Cache Configuration
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_DIR: str = ""
+    CACHE_CONTENT_TTL_SECONDS: int = 300
+    CACHE_REPLY_TTL_SECONDS: int = 900
+    CACHE_SENTIMENT_TTL_SECONDS: int = 604800
     
     # UI Configuration
     SIDEBAR_WIDTH: int = 300
     MAX_INTERACTION_HISTORY: int = 50
+    HISTORY_SPILL_DIR: str = ""  # empty keeps only the in-memory ring
+    INTERACTION_STORE_PATH: str = "data/interactions.sqlite3"  # empty disables persistence
+    HISTORY_PAGE_SIZE: int = 10
+    
+    # Login Rate Limiting (limits are MAX_LOGIN_ATTEMPTS per LOGIN_RATE_LIMIT_MINUTES)
+    LOGIN_RATE_LIMIT_PATH: str = "data/login_attempts.sqlite3"  # empty keeps a per-process limit
+    LOGIN_RATE_LIMIT_MAX_IDENTIFIERS: int = 10000
+    
+    # Session State Configuration
+    SESSION_BACKEND: str = "memory"  # "memory" (this process) or "sqlite" (shared file)
+    SESSION_STORE_PATH: str = "data/sessions.sqlite3"
+    SESSION_TTL_SECONDS: int = 86400
+    
+    # Metrics Configuration
+    METRICS_EXPORT_PATH: str = "data/metrics.jsonl"
     
     @classmethod
     def from_env(cls) -> 'Config':
@@ -47,6 +120,12 @@ class Config:
         azure_api_key = os.environ.get("AZURE_OPENAI_API_KEY")
         azure_api_version = os.environ.get("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
         azure_deployment = os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4o-mini")
+        llm_backend = os.environ.get("LLM_BACKEND", "azure").lower()
+        
+        # The local fake backend needs no Azure credentials
+        if llm_backend == "fake":
+            azure_endpoint = azure_endpoint or "https://fake-llm.local"
+            azure_api_key = azure_api_key or "fake-llm-key"
         
         # Validate required configuration
         if not azure_endpoint:
@@ -78,13 +157,78 @@ class Config:
             DEFAULT_RACE=os.environ.get("DEFAULT_RACE", "German Grand Prix"),
             
             # LLM settings
+            LLM_BACKEND=llm_backend,
             LLM_TEMPERATURE=float(os.environ.get("LLM_TEMPERATURE", "0.7")),
             LLM_MAX_TOKENS=int(os.environ.get("LLM_MAX_TOKENS", "500")),
             LLM_TIMEOUT_SECONDS=int(os.environ.get("LLM_TIMEOUT_SECONDS", "30")),
+            LLM_MAX_RETRIES=int(os.environ.get("LLM_MAX_RETRIES", "1")),
+            LLM_MAX_CONCURRENCY=int(os.environ.get("LLM_MAX_CONCURRENCY", "8")),
+            LLM_HTTP_MAX_CONNECTIONS=int(os.environ.get("LLM_HTTP_MAX_CONNECTIONS", "100")),
+            LLM_HTTP_MAX_KEEPALIVE=int(os.environ.get("LLM_HTTP_MAX_KEEPALIVE", "20")),
+            LLM_LATENCY_BUDGET_SECONDS=float(os.environ.get("LLM_LATENCY_BUDGET_SECONDS", "0")),
+            LLM_BUDGET_WORKERS=int(os.environ.get("LLM_BUDGET_WORKERS", "100")),
+            LLM_REQUESTS_PER_MINUTE=int(os.environ.get("LLM_REQUESTS_PER_MINUTE", "0")),
+            LLM_TOKENS_PER_MINUTE=int(os.environ.get("LLM_TOKENS_PER_MINUTE", "0")),
+            LLM_QUEUE_TIMEOUT_SECONDS=float(os.environ.get("LLM_QUEUE_TIMEOUT_SECONDS", "30")),
+            
+            # Circuit breaker settings
+            CIRCUIT_FAILURE_THRESHOLD=int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5")),
+            CIRCUIT_RECOVERY_SECONDS=int(os.environ.get("CIRCUIT_RECOVERY_SECONDS", "30")),
+            CIRCUIT_HALF_OPEN_MAX_CALLS=int(os.environ.get("CIRCUIT_HALF_OPEN_MAX_CALLS", "1")),
+            
+            # HTTP API settings
+            API_REQUEST_TIMEOUT_SECONDS=float(os.environ.get("API_REQUEST_TIMEOUT_SECONDS", "30")),
+            API_WORKERS=int(os.environ.get("API_WORKERS", "1")),
+            
+            # Near-duplicate post detection settings
+            DEDUP_ENABLED=os.environ.get("DEDUP_ENABLED", "true").lower() == "true",
+            DEDUP_SIMILARITY_THRESHOLD=float(os.environ.get("DEDUP_SIMILARITY_THRESHOLD", "0.7")),
+            DEDUP_MAX_POSTS=int(os.environ.get("DEDUP_MAX_POSTS", "10000")),
+            DEDUP_MAX_RETRIES=int(os.environ.get("DEDUP_MAX_RETRIES", "2")),
+            
+            # Speculative pre-generation settings
+            SPECULATION_ENABLED=os.environ.get("SPECULATION_ENABLED", "false").lower() == "true",
+            SPECULATION_MAX_CONCURRENCY=int(os.environ.get("SPECULATION_MAX_CONCURRENCY", "2")),
+            SPECULATION_TOKENS_PER_MINUTE=int(os.environ.get("SPECULATION_TOKENS_PER_MINUTE", "4000")),
+            
+            # Fake LLM settings
+            FAKE_LLM_LATENCY_SECONDS=float(os.environ.get("FAKE_LLM_LATENCY_SECONDS", "0.2")),
+            FAKE_LLM_TOKENS_PER_SECOND=float(os.environ.get("FAKE_LLM_TOKENS_PER_SECOND", "50")),
+            FAKE_LLM_ERROR_RATE=float(os.environ.get("FAKE_LLM_ERROR_RATE", "0.0")),
+            
+            # Sentiment settings
+            SENTIMENT_LLM_ESCALATION=os.environ.get("SENTIMENT_LLM_ESCALATION", "true").lower() == "true",
+            SENTIMENT_CONFIDENCE_THRESHOLD=float(os.environ.get("SENTIMENT_CONFIDENCE_THRESHOLD", "0.3")),
+            SENTIMENT_BATCH_MAX_ITEMS=int(os.environ.get("SENTIMENT_BATCH_MAX_ITEMS", "25")),
+            SENTIMENT_BATCH_MAX_PROMPT_TOKENS=int(os.environ.get("SENTIMENT_BATCH_MAX_PROMPT_TOKENS", "3000")),
+            SENTIMENT_BATCH_MAX_RETRIES=int(os.environ.get("SENTIMENT_BATCH_MAX_RETRIES", "2")),
+            
+            # Response cache settings
+            CACHE_ENABLED=os.environ.get("CACHE_ENABLED", "true").lower() == "true",
+            CACHE_MAX_ENTRIES=int(os.environ.get("CACHE_MAX_ENTRIES", "1024")),
+            CACHE_DIR=os.environ.get("CACHE_DIR", ""),
+            CACHE_CONTENT_TTL_SECONDS=int(os.environ.get("CACHE_CONTENT_TTL_SECONDS", "300")),
+            CACHE_REPLY_TTL_SECONDS=int(os.environ.get("CACHE_REPLY_TTL_SECONDS", "900")),
+            CACHE_SENTIMENT_TTL_SECONDS=int(os.environ.get("CACHE_SENTIMENT_TTL_SECONDS", "604800")),
             
             # UI settings
             SIDEBAR_WIDTH=int(os.environ.get("SIDEBAR_WIDTH", "300")),
-            MAX_INTERACTION_HISTORY=int(os.environ.get("MAX_INTERACTION_HISTORY", "50"))
+            MAX_INTERACTION_HISTORY=int(os.environ.get("MAX_INTERACTION_HISTORY", "50")),
+            HISTORY_SPILL_DIR=os.environ.get("HISTORY_SPILL_DIR", ""),
+            INTERACTION_STORE_PATH=os.environ.get("INTERACTION_STORE_PATH", "data/interactions.sqlite3"),
+            HISTORY_PAGE_SIZE=int(os.environ.get("HISTORY_PAGE_SIZE", "10")),
+            
+            # Login rate limiting
+            LOGIN_RATE_LIMIT_PATH=os.environ.get("LOGIN_RATE_LIMIT_PATH", "data/login_attempts.sqlite3"),
+            LOGIN_RATE_LIMIT_MAX_IDENTIFIERS=int(os.environ.get("LOGIN_RATE_LIMIT_MAX_IDENTIFIERS", "10000")),
+            
+            # Session state
+            SESSION_BACKEND=os.environ.get("SESSION_BACKEND", "memory").lower(),
+            SESSION_STORE_PATH=os.environ.get("SESSION_STORE_PATH", "data/sessions.sqlite3"),
+            SESSION_TTL_SECONDS=int(os.environ.get("SESSION_TTL_SECONDS", "86400")),
+            
+            # Metrics settings
+            METRICS_EXPORT_PATH=os.environ.get("METRICS_EXPORT_PATH", "data/metrics.jsonl")
         )
     
     def validate(self) -> bool:
@@ -100,6 +244,12 @@ class Config:
             if not getattr(self, field):
                 return False
         
+        if self.LLM_BACKEND not in ("azure", "fake"):
+            return False
+        
+        if not (0.0 <= self.FAKE_LLM_ERROR_RATE <= 1.0):
+            return False
+        
         # Validate numeric ranges
         if not (0.0 <= self.LLM_TEMPERATURE <= 2.0):
             return False
@@ -110,6 +260,45 @@ class Config:
         if not (5 <= self.LLM_TIMEOUT_SECONDS <= 300):
             return False
         
+        if not (1 <= self.LLM_MAX_CONCURRENCY <= 64):
+            return False
+        
+        if not (0 <= self.LLM_MAX_RETRIES <= 5):
+            return False
+        
+        if self.LLM_LATENCY_BUDGET_SECONDS < 0:
+            return False
+        
+        if not (1 <= self.LLM_BUDGET_WORKERS <= 1024):
+            return False
+        
+        if self.LLM_REQUESTS_PER_MINUTE < 0 or self.LLM_TOKENS_PER_MINUTE < 0 or self.LLM_QUEUE_TIMEOUT_SECONDS <= 0:
+            return False
+        
+        if self.CIRCUIT_FAILURE_THRESHOLD < 1 or self.CIRCUIT_RECOVERY_SECONDS < 1:
+            return False
+        
+        if self.API_REQUEST_TIMEOUT_SECONDS <= 0 or self.API_WORKERS < 1:
+            return False
+        
+        if not (0.0 < self.DEDUP_SIMILARITY_THRESHOLD <= 1.0) or not (0 <= self.DEDUP_MAX_RETRIES <= 5):
+            return False
+        
+        if not (1 <= self.SPECULATION_MAX_CONCURRENCY <= 8) or self.SPECULATION_TOKENS_PER_MINUTE < 0:
+            return False
+        
+        if not (0.0 <= self.SENTIMENT_CONFIDENCE_THRESHOLD <= 1.0):
+            return False
+        
+        if self.MAX_INTERACTION_HISTORY < 1 or self.HISTORY_PAGE_SIZE < 1:
+            return False
+        
+        if self.MAX_LOGIN_ATTEMPTS < 1 or self.LOGIN_RATE_LIMIT_MINUTES < 1 or self.LOGIN_RATE_LIMIT_MAX_IDENTIFIERS < 1:
+            return False
+        
+        if self.SESSION_BACKEND not in ("memory", "sqlite") or self.SESSION_TTL_SECONDS < 1:
+            return False
+        
         return True
     
     def to_dict(self) -> dict:
@@ -136,24 +325,17 @@ class Config:
 _config: Optional[Config] = None
 
 def get_config() -> Config:
-    """Get global configuration instance"""
+    """Get global configuration instance; raises ConfigurationError if the environment is invalid"""
     global _config
     
     if _config is None:
         try:
-            _config = Config.from_env()
-            if not _config.validate():
-                raise ValueError("Configuration validation failed")
-        except Exception as e:
-            st.error(f"Configuration error: {e}")
-            st.info("""
-            Please ensure the following environment variables are set:
-            - AZURE_OPENAI_ENDPOINT
-            - AZURE_OPENAI_API_KEY
-            - AZURE_OPENAI_API_VERSION (optional)
-            - AZURE_OPENAI_DEPLOYMENT_NAME (optional)
-            """)
-            st.stop()
+            config = Config.from_env()
+        except ValueError as e:
+            raise ConfigurationError(f"Configuration error: {e}") from e
+        if not config.validate():
+            raise ConfigurationError("Configuration validation failed")
+        _config = config
     
     return _config
 
@@ -219,9 +401,16 @@ def get_env_info() -> dict:
             if key.startswith(("AZURE_", "APP_", "DEBUG", "ENVIRONMENT"))
         },
         "config_valid": _config is not None and _config.validate() if _config else False,
-        "streamlit_version": st.__version__
+        "streamlit_version": _package_version("streamlit")
     }
 
+def _package_version(name: str) -> Optional[str]:
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
 # Configuration for different environments
 def get_environment_config() -> dict:
     """Get environment-specific configuration"""
@@ -0,0 +1,112 @@
+import hashlib
+import re
+import threading
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Universal hashing (a * x + b) mod p over 32-bit feature hashes
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+def shingles(text: str) -> List[str]:
+    """Word unigrams and bigrams; short posts have too few word trigrams"""
+    words = _WORD_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index for near-duplicate text lookup.
+
+    Each text becomes a num_perm-value MinHash signature, cut into bands of
+    rows_per_band values. Texts that share any whole band land in the same
+    bucket. A lookup hashes the query's bands and compares only the few texts
+    in those buckets, so its cost does not grow with the number of indexed
+    texts. Candidates are confirmed by their estimated Jaccard similarity.
+    Signatures live in one growing uint32 array used as a ring: once
+    max_entries texts are indexed, the oldest is overwritten and unbucketed.
+    """
+
+    def __init__(self, threshold: float = 0.7, max_entries: int = 10000, num_perm: int = 64,
+                 rows_per_band: int = 4, seed: int = 7):
+        if num_perm % rows_per_band:
+            raise ValueError("num_perm must be a multiple of rows_per_band")
+
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.num_perm = num_perm
+        self.rows_per_band = rows_per_band
+        self.bands = num_perm // rows_per_band
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)[:, None]
+
+        self._signatures = np.zeros((min(256, max_entries), num_perm), dtype=np.uint32)
+        self._buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(self.bands)]
+        self._next_slot = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text's shingles"""
+        features = shingles(text)
+        if not features:
+            return np.full(self.num_perm, int(_MERSENNE_PRIME), dtype=np.uint32)
+
+        digests = b"".join(hashlib.blake2b(f.encode("utf-8"), digest_size=4).digest() for f in features)
+        values = np.frombuffer(digests, dtype=np.uint32).astype(np.uint64)[None, :]
+        return ((self._a * values + self._b) % _MERSENNE_PRIME).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        rows = self.rows_per_band
+        return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands)]
+
+    def find(self, text: str) -> Optional[float]:
+        """Similarity of the closest indexed near-duplicate, or None"""
+        return self.find_signature(self.signature(text))
+
+    def find_signature(self, signature: np.ndarray) -> Optional[float]:
+        with self._lock:
+            candidates = set()
+            for buckets, key in zip(self._buckets, self._band_keys(signature)):
+                candidates.update(buckets.get(key, ()))
+            if not candidates:
+                return None
+
+            slots = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            similarity = (self._signatures[slots] == signature).mean(axis=1).max()
+
+        return float(similarity) if similarity >= self.threshold else None
+
+    def add(self, text: str) -> np.ndarray:
+        """Index a text; returns its signature"""
+        signature = self.signature(text)
+        self.add_signature(signature)
+        return signature
+
+    def add_signature(self, signature: np.ndarray):
+        with self._lock:
+            slot = self._next_slot
+            if self._size == self.max_entries:
+                # Ring is full: this slot holds the oldest entry
+                for buckets, key in zip(self._buckets, self._band_keys(self._signatures[slot])):
+                    bucket = buckets[key]
+                    bucket.discard(slot)
+                    if not bucket:
+                        del buckets[key]
+            else:
+                self._size += 1
+                if slot == len(self._signatures):
+                    grown = np.zeros((min(2 * slot, self.max_entries), self.num_perm), dtype=np.uint32)
+                    grown[:slot] = self._signatures
+                    self._signatures = grown
+
+            self._signatures[slot] = signature
+            for buckets, key in zip(self._buckets, self._band_keys(signature)):
+                buckets.setdefault(key, set()).add(slot)
+            self._next_slot = (slot + 1) % self.max_entries
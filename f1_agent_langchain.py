@@ -1,19 +1,51 @@
+import asyncio
+import contextvars
+import hashlib
+import json
 import random
 import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Set
-from dataclasses import dataclass
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Set, Union
+from dataclasses import astuple, dataclass
 from enum import Enum
+from types import MappingProxyType
 
-# LangChain imports
-from langchain_openai import AzureChatOpenAI
-from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain.schema import SystemMessage, HumanMessage
-from langchain.chains import LLMChain
+# LangChain, the Azure client and httpx are imported by LangChainProcessor when
+# it is built, so importing this module (e.g. from a worker) stays fast
 
 # Configuration
-from config import get_config
+from config import Config, get_config
+from response_cache import CachePolicy, ResponseCache
+from sentiment_engine import default_engine as default_sentiment_engine
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from metrics import CHAIN_TAG_PREFIX, metrics_registry, is_timeout
+from speculation import SpeculationSlots, SpeculativeGenerator
+from keyword_index import KeywordIndex, default_extractor as default_keyword_extractor
+from fallback_matcher import default_matcher as default_fallback_matcher
+from history import InteractionHistory, InteractionRecord
+from dedup_index import NearDuplicateIndex
+from request_scheduler import (
+    Priority, RateLimitTimeout, RequestScheduler, current_priority, estimate_prompt_tokens
+)
+
+# Upper bound on stored results from calls that outlived their latency budget
+MAX_LATE_RESULTS = 256
+
+class LatencyBudgetExceeded(Exception):
+    """The LLM did not answer within the caller's latency budget"""
+
+class DuplicateContent(Exception):
+    """Generated text is a near-duplicate of something the agent already published"""
+    
+    def __init__(self, text: str, keep):
+        super().__init__("near-duplicate of a recent post")
+        self.text = text
+        self.keep = keep  # publishes the text anyway, for callers that already showed it
 
 class RaceStage(Enum):
     """Represents the main stages of a Formula 1 race weekend."""
@@ -55,27 +87,236 @@ class RaceContext:
     racer_name: str
     mood: str
 
+def parse_sentiment_result(result: str) -> Dict[str, float]:
+    """Convert the sentiment chain's 'Score: X.X, Explanation: ...' text into scores"""
+    
+    # Parse the result to extract score
+    score_line = [line for line in result.split('\n') if 'Score:' in line]
+    if score_line:
+        score_str = score_line[0].split('Score:')[1].split(',')[0].strip()
+        compound = float(score_str)
+    else:
+        compound = 0.0
+    
+    return sentiment_from_compound(compound)
+
+def sentiment_from_compound(compound: float) -> Dict[str, float]:
+    """Expand a -1..1 compound score into the compound/pos/neg/neu dict"""
+    
+    # Convert compound score to individual scores
+    if compound > 0.1:
+        pos = min(1.0, compound + 0.3)
+        neg = max(0.0, 0.1 - compound)
+    elif compound < -0.1:
+        pos = max(0.0, 0.1 + compound)
+        neg = min(1.0, abs(compound) + 0.3)
+    else:
+        pos = 0.5
+        neg = 0.5
+    
+    neu = max(0.0, 1.0 - pos - neg)
+    
+    return {
+        'compound': max(-1.0, min(1.0, compound)),
+        'pos': pos,
+        'neg': neg,
+        'neu': neu
+    }
+
+def parse_sentiment_batch_result(result: str) -> Dict[int, float]:
+    """
+    Parse the packed sentiment chain's JSON into {id: score}.
+    
+    Entries that are malformed or out of range are left out so the caller can
+    re-ask just those items.
+    """
+    try:
+        payload = json.loads(result)
+    except (TypeError, ValueError):
+        return {}
+    
+    entries = payload.get("results") if isinstance(payload, dict) else None
+    if not isinstance(entries, list):
+        return {}
+    
+    scores = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        item_id = entry.get("id")
+        score = entry.get("score")
+        if isinstance(item_id, bool) or not isinstance(item_id, int):
+            continue
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or not -1.0 <= score <= 1.0:
+            continue
+        scores[item_id] = float(score)
+    return scores
+
+# System prompts for the agent chains. The static instructions come first and
+# the per-driver context last, so every request shares the longest possible
+# prefix for provider-side prompt caching.
+SYSTEM_PROMPTS = {
+    "content": """Generate authentic F1 social media content that matches your personality and current situation.
+Keep it engaging, use appropriate F1 terminology, and include relevant hashtags.
+Be authentic to the emotional state based on recent results.
+
+You are {racer_name}, a professional Formula 1 driver for {team_name}.
+Your current context:
+- Race Stage: {stage}
+- Session: {session_type}
+- Circuit: {circuit_name}
+- Race: {race_name}
+- Recent Result: {last_result}
+- Position: {position}
+- Current Mood: {mood}""",
+    "reply": """Respond to fan comments professionally and authentically. Match the tone of the original comment.
+Be engaging, appreciative of fans, and maintain your professional image.
+Keep responses concise but meaningful.
+
+You are {racer_name}, a professional Formula 1 driver for {team_name}.
+Your current context:
+- Race Stage: {stage}
+- Circuit: {circuit_name}
+- Recent Result: {last_result}
+- Current Mood: {mood}""",
+    "mention": """Generate a social media mention about another person in F1.
+Keep it professional, respectful, and authentic to F1 culture.
+Include appropriate hashtags and maintain competitive spirit.
+
+You are {racer_name}, a professional Formula 1 driver for {team_name}.""",
+    "thoughts": """Generate internal thoughts that reflect your mental state and focus.
+Be introspective, strategic, and authentic to a professional racing driver's mindset.
+
+You are {racer_name}, a professional Formula 1 driver.
+Your current context:
+- Race Stage: {stage}
+- Session: {session_type}
+- Circuit: {circuit_name}
+- Recent Result: {last_result}
+- Current Mood: {mood}"""
+}
+
+# Prompt variable that identifies a PromptSnapshot in cache keys
+CONTEXT_KEY = "context_key"
+
+@dataclass(frozen=True)
+class PromptSnapshot:
+    """
+    Immutable prompt variables rendered from one version of a RaceContext.
+    
+    Built once per update_context; every call until the next change reuses the
+    rendered variables and system prompts. version counts changes per agent,
+    fingerprint is a content hash that is stable across processes and is what
+    goes into response cache keys.
+    """
+    version: int
+    fingerprint: str
+    variables: Mapping[str, str]
+    system_prompts: Mapping[str, str]
+    
+    @classmethod
+    def render(cls, version: int, racer_name: str, team_name: str, context: RaceContext) -> "PromptSnapshot":
+        variables = {
+            "racer_name": racer_name,
+            "team_name": team_name,
+            "stage": context.stage.value,
+            "session_type": context.session_type.value if context.session_type else "N/A",
+            "circuit_name": context.circuit_name,
+            "race_name": context.race_name,
+            "last_result": context.last_result.value if context.last_result else "N/A",
+            "position": str(context.position) if context.position else "N/A",
+            "mood": context.mood
+        }
+        system_prompts = {chain: template.format(**variables) for chain, template in SYSTEM_PROMPTS.items()}
+        fingerprint = hashlib.sha256(
+            json.dumps(variables, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+        return cls(version, fingerprint, MappingProxyType(variables), MappingProxyType(system_prompts))
+    
+    def chain_vars(self, chain_name: str, **extra: str) -> Dict[str, str]:
+        """Variables for one chain call: the pre-rendered system prompt plus per-call inputs"""
+        return {"system_prompt": self.system_prompts[chain_name], CONTEXT_KEY: self.fingerprint, **extra}
+
 class LangChainProcessor:
     """LangChain processor using Azure OpenAI"""
     
-    def __init__(self):
-        self.config = get_config()
+    def __init__(self, config: Optional[Config] = None):
+        self.config = config or get_config()
+        self.metrics = metrics_registry
+        from token_usage import TokenUsageCallback
+        self._token_callback = TokenUsageCallback(self.metrics)
+        self.scheduler = self._initialize_scheduler()
         self.llm = self._initialize_llm()
         self._initialize_chains()
+        self.breaker = self._initialize_breaker()
+        
+        # Background pool for latency-budgeted calls, plus results that arrived late.
+        # Sized apart from LLM_MAX_CONCURRENCY: a budgeted call must not wait for a
+        # thread while its budget runs, and threads are only started as needed.
+        self._background = ThreadPoolExecutor(
+            max_workers=self.config.LLM_BUDGET_WORKERS, thread_name_prefix="llm-background"
+        )
+        self._late_lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._abandoned: Set[str] = set()
+        self._late_results: "OrderedDict[str, str]" = OrderedDict()
+        self.cache = self._initialize_cache()
+        self.sentiment_engine = default_sentiment_engine
+        self.speculator = SpeculativeGenerator(
+            max_workers=self.config.SPECULATION_MAX_CONCURRENCY,
+            tokens_per_minute=self.config.SPECULATION_TOKENS_PER_MINUTE,
+            max_completion_tokens=self.config.LLM_MAX_TOKENS,
+            on_event=lambda event: self.metrics.increment("speculation", event)
+        )
     
     def _initialize_llm(self):
-        """Initialize Azure OpenAI LLM"""
+        """Initialize Azure OpenAI LLM (or the local fake backend)"""
+        if self.config.LLM_BACKEND == "fake":
+            from fake_llm import FakeChatModel
+            return FakeChatModel.from_config(self.config)
+        
+        from langchain_openai import AzureChatOpenAI
         return AzureChatOpenAI(
             azure_endpoint=self.config.AZURE_OPENAI_ENDPOINT,
             api_key=self.config.AZURE_OPENAI_API_KEY,
             api_version=self.config.AZURE_OPENAI_API_VERSION,
             deployment_name=self.config.AZURE_OPENAI_DEPLOYMENT_NAME,
             temperature=0.7,
-            max_tokens=500
+            max_tokens=500,
+            timeout=self.config.LLM_TIMEOUT_SECONDS,
+            max_retries=self.config.LLM_MAX_RETRIES,
+            stream_usage=True,
+            http_client=self._initialize_http_client()
+        )
+    
+    def _initialize_scheduler(self) -> RequestScheduler:
+        """Initialize the RPM/TPM scheduler every chain call is admitted through"""
+        return RequestScheduler(
+            requests_per_minute=self.config.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=self.config.LLM_TOKENS_PER_MINUTE,
+            max_completion_tokens=self.config.LLM_MAX_TOKENS,
+            queue_timeout=self.config.LLM_QUEUE_TIMEOUT_SECONDS,
+            metrics=self.metrics
+        )
+    
+    def _initialize_http_client(self):
+        """Keep-alive connection pool (an httpx.Client) shared by every request made through this processor"""
+        import httpx
+        return httpx.Client(
+            limits=httpx.Limits(
+                max_connections=self.config.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=self.config.LLM_HTTP_MAX_KEEPALIVE
+            )
         )
     
     def _initialize_chains(self):
         """Initialize LangChain chains for different tasks"""
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_core.runnables import RunnableLambda
+        
+        # Every chain waits here, between prompt and model, for rate-limit capacity
+        admission = RunnableLambda(self._admit, afunc=self._aadmit, name="rate_limit")
         
         # Sentiment analysis chain
         sentiment_prompt = ChatPromptTemplate.from_messages([
@@ -83,129 +324,708 @@ class LangChainProcessor:
             ("human", "Analyze this comment: '{comment}'\n\nReturn format: Score: X.X, Explanation: brief explanation")
         ])
         
-        self.sentiment_chain = sentiment_prompt | self.llm | StrOutputParser()
+        self.sentiment_chain = sentiment_prompt | admission | self.llm | StrOutputParser()
+        
+        # Packed sentiment chain: many comments per request, strict JSON out
+        sentiment_batch_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert at analyzing sentiment in social media comments.
+            You will receive a JSON array of comments, each with an integer "id" and a "text".
+            Score every comment between -1 (very negative) and 1 (very positive).
+            Respond with JSON only, exactly in this shape and with one entry per input id:
+            {{"results": [{{"id": 0, "score": 0.0}}]}}"""),
+            ("human", "{comments}")
+        ])
+        
+        self.sentiment_batch_chain = (
+            sentiment_batch_prompt
+            | admission
+            | self.llm.bind(response_format={"type": "json_object"})
+            | StrOutputParser()
+        )
         
-        # Content generation chain
+        # Agent chains: the system message is pre-rendered per context version
+        # (see PromptSnapshot), so the chains only splice it in
         content_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are {racer_name}, a professional Formula 1 driver for {team_name}. 
-            Your current context:
-            - Race Stage: {stage}
-            - Session: {session_type}
-            - Circuit: {circuit_name}
-            - Race: {race_name}
-            - Recent Result: {last_result}
-            - Position: {position}
-            - Current Mood: {mood}
-            
-            Generate authentic F1 social media content that matches your personality and current situation.
-            Keep it engaging, use appropriate F1 terminology, and include relevant hashtags.
-            Be authentic to the emotional state based on recent results."""),
-            ("human", "Generate a {content_type} social media post.")
+            ("system", "{system_prompt}"),
+            ("human", "Generate a {content_type} social media post.{avoid}")
         ])
         
-        self.content_chain = content_prompt | self.llm | StrOutputParser()
+        self.content_chain = content_prompt | admission | self.llm | StrOutputParser()
         
-        # Reply generation chain
         reply_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are {racer_name}, a professional Formula 1 driver for {team_name}.
-            Your current context:
-            - Race Stage: {stage}
-            - Circuit: {circuit_name}
-            - Recent Result: {last_result}
-            - Current Mood: {mood}
-            
-            Respond to fan comments professionally and authentically. Match the tone of the original comment.
-            Be engaging, appreciative of fans, and maintain your professional image.
-            Keep responses concise but meaningful."""),
+            ("system", "{system_prompt}"),
             ("human", "Respond to this fan comment: '{fan_comment}'")
         ])
         
-        self.reply_chain = reply_prompt | self.llm | StrOutputParser()
+        self.reply_chain = reply_prompt | admission | self.llm | StrOutputParser()
         
-        # Mention generation chain
+        # The mention context varies per call, so it follows the pre-rendered prompt
         mention_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are {racer_name}, a professional Formula 1 driver for {team_name}.
-            Generate a social media mention about another person in F1.
-            Context: {mention_context}
-            
-            Keep it professional, respectful, and authentic to F1 culture.
-            Include appropriate hashtags and maintain competitive spirit."""),
+            ("system", "{system_prompt}\nContext: {mention_context}"),
             ("human", "Create a {mention_context} mention about @{person_name}")
         ])
         
-        self.mention_chain = mention_prompt | self.llm | StrOutputParser()
+        self.mention_chain = mention_prompt | admission | self.llm | StrOutputParser()
         
-        # Thoughts generation chain
         thoughts_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are {racer_name}, a professional Formula 1 driver.
-            Your current context:
-            - Race Stage: {stage}
-            - Session: {session_type}
-            - Circuit: {circuit_name}
-            - Recent Result: {last_result}
-            - Current Mood: {mood}
-            
-            Generate internal thoughts that reflect your mental state and focus.
-            Be introspective, strategic, and authentic to a professional racing driver's mindset."""),
+            ("system", "{system_prompt}"),
             ("human", "What are your current internal thoughts and focus?")
         ])
         
-        self.thoughts_chain = thoughts_prompt | self.llm | StrOutputParser()
+        self.thoughts_chain = thoughts_prompt | admission | self.llm | StrOutputParser()
+        
+        self.chains = {
+            "sentiment": self.sentiment_chain,
+            "sentiment_batch": self.sentiment_batch_chain,
+            "content": self.content_chain,
+            "reply": self.reply_chain,
+            "mention": self.mention_chain,
+            "thoughts": self.thoughts_chain
+        }
+    
+    def _initialize_breaker(self) -> CircuitBreaker:
+        """Initialize the circuit breaker shared by every chain call"""
+        return CircuitBreaker(
+            failure_threshold=self.config.CIRCUIT_FAILURE_THRESHOLD,
+            recovery_seconds=self.config.CIRCUIT_RECOVERY_SECONDS,
+            half_open_max_calls=self.config.CIRCUIT_HALF_OPEN_MAX_CALLS,
+            probe=self._probe_llm,
+            on_transition=lambda old, new: self.metrics.increment("circuit_transitions", new.value)
+        )
+    
+    def _admit(self, prompt, config: Dict):
+        """Block until the scheduler admits this request at its priority"""
+        self.scheduler.acquire(estimate_prompt_tokens(prompt.to_messages()), self._priority_of(config))
+        return prompt
     
-    def analyze_sentiment(self, text: str) -> Dict[str, float]:
-        """Analyze sentiment using LangChain and Azure OpenAI"""
+    async def _aadmit(self, prompt, config: Dict):
+        """Async variant of _admit"""
+        await self.scheduler.aacquire(estimate_prompt_tokens(prompt.to_messages()), self._priority_of(config))
+        return prompt
+    
+    @staticmethod
+    def _priority_of(config: Dict) -> Priority:
+        return (config.get("metadata") or {}).get("priority", Priority.INTERACTIVE)
+    
+    def _probe_llm(self):
+        """Smallest possible request, used to detect that Azure OpenAI has recovered"""
+        self.llm.invoke("ping", max_tokens=1)
+    
+    @property
+    def available(self) -> bool:
+        """False while the circuit is open and every call would be refused"""
+        return not self.breaker.is_open
+    
+    def _initialize_cache(self) -> ResponseCache:
+        """Initialize the response cache with a policy per chain"""
+        enabled = self.config.CACHE_ENABLED
+        
+        # Sentiment is deterministic enough to always cache and persist; posts and
+        # thoughts are only reused within a short variety window so they stay fresh.
+        # With dedup on, a cached post is a near-copy of one the agent already
+        # published and would only be rejected, so posts are not cached at all.
+        policies = {
+            "sentiment": CachePolicy(enabled, self.config.CACHE_SENTIMENT_TTL_SECONDS, persist=True),
+            "content": CachePolicy(enabled and not self.config.DEDUP_ENABLED, self.config.CACHE_CONTENT_TTL_SECONDS),
+            "thoughts": CachePolicy(enabled, self.config.CACHE_CONTENT_TTL_SECONDS),
+            "reply": CachePolicy(enabled, self.config.CACHE_REPLY_TTL_SECONDS, persist=True),
+            "mention": CachePolicy(enabled, self.config.CACHE_REPLY_TTL_SECONDS)
+        }
+        
+        disk_path = os.path.join(self.config.CACHE_DIR, "responses.sqlite3") if self.config.CACHE_DIR else None
+        return ResponseCache(
+            policies, max_entries=self.config.CACHE_MAX_ENTRIES, disk_path=disk_path,
+            derived_variables={"system_prompt": CONTEXT_KEY}
+        )
+    
+    def analyze_sentiment(self, text: str, escalate: Optional[bool] = None) -> Dict[str, float]:
+        """Score sentiment locally, escalating low-confidence text to Azure OpenAI"""
+        scores, confidence = self.sentiment_engine.score_with_confidence(text)
+        if not self._should_escalate(confidence, escalate):
+            return scores
+        
         try:
-            result = self.sentiment_chain.invoke({"comment": text})
+            result = self.generate("sentiment", {"comment": text})
+            return parse_sentiment_result(result)
             
-            # Parse the result to extract score
-            score_line = [line for line in result.split('\n') if 'Score:' in line]
-            if score_line:
-                score_str = score_line[0].split('Score:')[1].split(',')[0].strip()
-                compound = float(score_str)
-            else:
-                compound = 0.0
+        except Exception as e:
+            print(f"Sentiment analysis error: {e}")
+            return scores
+    
+    async def aanalyze_sentiment(self, text: str, escalate: Optional[bool] = None) -> Dict[str, float]:
+        """Async variant of analyze_sentiment"""
+        scores, confidence = self.sentiment_engine.score_with_confidence(text)
+        if not self._should_escalate(confidence, escalate):
+            return scores
+        
+        try:
+            result = await self.agenerate("sentiment", {"comment": text})
+            return parse_sentiment_result(result)
             
-            # Convert compound score to individual scores
-            if compound > 0.1:
-                pos = min(1.0, compound + 0.3)
-                neg = max(0.0, 0.1 - compound)
-            elif compound < -0.1:
-                pos = max(0.0, 0.1 + compound)
-                neg = min(1.0, abs(compound) + 0.3)
+        except Exception as e:
+            print(f"Sentiment analysis error: {e}")
+            return scores
+    
+    def analyze_sentiment_bulk(self, texts: List[str], escalate: Optional[bool] = None,
+                               max_concurrency: Optional[int] = None) -> List[Dict[str, float]]:
+        """Score many texts in one local pass; only low-confidence items go to the LLM, packed"""
+        scores, confidence = self.sentiment_engine.score_batch_with_confidence(texts)
+        low = [i for i, value in enumerate(confidence) if self._should_escalate(value, escalate)]
+        if low:
+            try:
+                escalated = self.analyze_sentiment_batch([texts[i] for i in low], max_concurrency)
+                for i, result in zip(low, escalated):
+                    scores[i] = result
+            except Exception as e:
+                print(f"Sentiment analysis error: {e}")
+        
+        return scores
+    
+    async def aanalyze_sentiment_bulk(self, texts: List[str], escalate: Optional[bool] = None,
+                                      max_concurrency: Optional[int] = None) -> List[Dict[str, float]]:
+        """Async variant of analyze_sentiment_bulk"""
+        scores, confidence = self.sentiment_engine.score_batch_with_confidence(texts)
+        low = [i for i, value in enumerate(confidence) if self._should_escalate(value, escalate)]
+        if low:
+            try:
+                escalated = await self.aanalyze_sentiment_batch([texts[i] for i in low], max_concurrency)
+                for i, result in zip(low, escalated):
+                    scores[i] = result
+            except Exception as e:
+                print(f"Sentiment analysis error: {e}")
+        
+        return scores
+    
+    def analyze_sentiment_batch(self, texts: List[str],
+                                max_concurrency: Optional[int] = None) -> List[Dict[str, float]]:
+        """
+        Score many texts with packed LLM requests, several comments per prompt.
+        
+        Texts are split into packs that respect the prompt token budget and the
+        completion size. Items missing from or invalid in a response are re-asked
+        on their own pack, up to SENTIMENT_BATCH_MAX_RETRIES times; anything still
+        unscored gets the local engine's score.
+        """
+        results = [None] * len(texts)
+        pending = self._cached_sentiment(texts, results)
+        
+        for _ in range(self.config.SENTIMENT_BATCH_MAX_RETRIES + 1):
+            if not pending:
+                break
+            packs = self._pack_sentiment_items(texts, pending)
+            responses = self.generate_batch(
+                "sentiment_batch", [self._sentiment_pack_vars(texts, pack) for pack in packs], max_concurrency
+            )
+            pending = self._collect_sentiment_packs(texts, packs, responses, results)
+        
+        self._fill_local_sentiment(texts, pending, results)
+        return results
+    
+    async def aanalyze_sentiment_batch(self, texts: List[str],
+                                       max_concurrency: Optional[int] = None) -> List[Dict[str, float]]:
+        """Async variant of analyze_sentiment_batch"""
+        results = [None] * len(texts)
+        pending = self._cached_sentiment(texts, results)
+        
+        for _ in range(self.config.SENTIMENT_BATCH_MAX_RETRIES + 1):
+            if not pending:
+                break
+            packs = self._pack_sentiment_items(texts, pending)
+            responses = await self.agenerate_batch(
+                "sentiment_batch", [self._sentiment_pack_vars(texts, pack) for pack in packs], max_concurrency
+            )
+            pending = self._collect_sentiment_packs(texts, packs, responses, results)
+        
+        self._fill_local_sentiment(texts, pending, results)
+        return results
+    
+    def _cached_sentiment(self, texts: List[str], results: List) -> List[int]:
+        """Fill results from the single-item sentiment cache; return indexes still unscored"""
+        pending = []
+        for i, text in enumerate(texts):
+            cached = self.cache.get("sentiment", {"comment": text})
+            if cached is None:
+                pending.append(i)
+                continue
+            try:
+                results[i] = parse_sentiment_result(cached)
+            except ValueError:
+                pending.append(i)
+        return pending
+    
+    def _pack_sentiment_items(self, texts: List[str], indexes: List[int]) -> List[List[int]]:
+        """Split item indexes into packs that fit the prompt and completion budgets"""
+        # Every result entry costs roughly 12 completion tokens
+        max_items = max(1, min(self.config.SENTIMENT_BATCH_MAX_ITEMS, self.config.LLM_MAX_TOKENS // 12))
+        budget = self.config.SENTIMENT_BATCH_MAX_PROMPT_TOKENS
+        
+        packs = []
+        current = []
+        used = 0
+        for i in indexes:
+            # ~4 characters per token plus the JSON wrapper around each item
+            cost = len(texts[i]) // 4 + 10
+            if current and (len(current) >= max_items or used + cost > budget):
+                packs.append(current)
+                current = []
+                used = 0
+            current.append(i)
+            used += cost
+        
+        if current:
+            packs.append(current)
+        return packs
+    
+    def _sentiment_pack_vars(self, texts: List[str], pack: List[int]) -> Dict[str, str]:
+        """Render one pack as the JSON payload for the packed sentiment chain"""
+        items = [{"id": position, "text": texts[i]} for position, i in enumerate(pack)]
+        return {"comments": json.dumps(items, ensure_ascii=False)}
+    
+    def _collect_sentiment_packs(self, texts: List[str], packs: List[List[int]], responses: List,
+                                 results: List) -> List[int]:
+        """Validate packed responses into results; return indexes that need re-asking"""
+        failed = []
+        for pack, response in zip(packs, responses):
+            if isinstance(response, Exception):
+                print(f"Sentiment analysis error: {response}")
+                scores = {}
             else:
-                pos = 0.5
-                neg = 0.5
+                scores = parse_sentiment_batch_result(response)
             
-            neu = max(0.0, 1.0 - pos - neg)
+            for position, i in enumerate(pack):
+                score = scores.get(position)
+                if score is None:
+                    failed.append(i)
+                    continue
+                results[i] = sentiment_from_compound(score)
+                self.cache.set("sentiment", {"comment": texts[i]}, f"Score: {score}, Explanation: packed")
+        return failed
+    
+    def _fill_local_sentiment(self, texts: List[str], indexes: List[int], results: List):
+        """Use local scores for items the LLM never answered validly"""
+        if indexes:
+            local = self.sentiment_engine.score_batch([texts[i] for i in indexes])
+            for i, scores in zip(indexes, local):
+                results[i] = scores
+    
+    def _should_escalate(self, confidence: float, escalate: Optional[bool]) -> bool:
+        """Whether a local score is too uncertain to keep without asking the LLM"""
+        if escalate is None:
+            escalate = self.config.SENTIMENT_LLM_ESCALATION
+        return escalate and confidence < self.config.SENTIMENT_CONFIDENCE_THRESHOLD
+    
+    def generate(self, chain_name: str, variables: Dict, budget: Optional[float] = None) -> str:
+        """
+        Invoke a named chain with the given prompt variables.
+        
+        With a latency budget (seconds) the call runs on the background pool and
+        LatencyBudgetExceeded is raised if it has not answered in time. The
+        request keeps running and its result serves the next identical call.
+        """
+        cached = self._cached(chain_name, variables)
+        if cached is not None:
+            return cached
+        
+        if budget is None:
+            return self._invoke(chain_name, variables)
+        
+        key = self.cache.make_key(chain_name, variables)
+        future = self._submit_in_flight(key, chain_name, variables)
+        try:
+            return future.result(timeout=budget)
+        except FutureTimeoutError:
+            self._abandon_in_flight(chain_name, key, future)
+            raise LatencyBudgetExceeded(f"{chain_name} chain did not answer within {budget:.2f}s")
+    
+    async def agenerate(self, chain_name: str, variables: Dict, budget: Optional[float] = None) -> str:
+        """Async variant of generate"""
+        cached = self._cached(chain_name, variables)
+        if cached is not None:
+            return cached
+        
+        if budget is None:
+            return await self._ainvoke(chain_name, variables)
+        
+        # Run on the background pool so the request outlives this event loop
+        key = self.cache.make_key(chain_name, variables)
+        future = self._submit_in_flight(key, chain_name, variables)
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), budget)
+        except asyncio.TimeoutError:
+            self._abandon_in_flight(chain_name, key, future)
+            raise LatencyBudgetExceeded(f"{chain_name} chain did not answer within {budget:.2f}s")
+    
+    def _invoke(self, chain_name: str, variables: Dict, priority: Optional[Priority] = None) -> str:
+        """Call the chain through the circuit breaker, recording metrics and caching the result"""
+        self.breaker.before_call()
+        started = time.perf_counter()
+        try:
+            result = self.chains[chain_name].invoke(
+                variables, config=self._run_config(chain_name, priority=priority)
+            )
+        except Exception as e:
+            self._record_failure(chain_name, e)
+            raise
+        except BaseException:
+            # Cancelled or interrupted: neither a success nor a failure, but the
+            # half-open trial slot must be given back or the circuit sticks
+            self.breaker.release()
+            raise
+        finally:
+            self.metrics.record_latency(f"chain.{chain_name}", time.perf_counter() - started)
+        
+        self.breaker.record_success()
+        
+        self.cache.set(chain_name, variables, result)
+        return result
+    
+    async def _ainvoke(self, chain_name: str, variables: Dict, priority: Optional[Priority] = None) -> str:
+        """Async variant of _invoke"""
+        self.breaker.before_call()
+        started = time.perf_counter()
+        try:
+            result = await self.chains[chain_name].ainvoke(
+                variables, config=self._run_config(chain_name, priority=priority)
+            )
+        except Exception as e:
+            self._record_failure(chain_name, e)
+            raise
+        except BaseException:
+            # Cancelled or interrupted: neither a success nor a failure, but the
+            # half-open trial slot must be given back or the circuit sticks
+            self.breaker.release()
+            raise
+        finally:
+            self.metrics.record_latency(f"chain.{chain_name}", time.perf_counter() - started)
+        
+        self.breaker.record_success()
+        
+        self.cache.set(chain_name, variables, result)
+        return result
+    
+    def _submit_in_flight(self, key: str, chain_name: str, variables: Dict) -> Future:
+        """Start a background call, or join the identical one already running"""
+        with self._late_lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._background.submit(self._invoke, chain_name, variables, current_priority())
+                self._in_flight[key] = future
+                future.add_done_callback(lambda done, key=key: self._complete_in_flight(key, done))
+            return future
+    
+    def _abandon_in_flight(self, chain_name: str, key: str, future: Future):
+        """The caller gave up waiting: keep the eventual result for the next identical request"""
+        self.metrics.increment("budget_exceeded", chain_name)
+        with self._late_lock:
+            self._abandoned.add(key)
+        if future.done():
+            self._complete_in_flight(key, future)
+    
+    def _complete_in_flight(self, key: str, future: Future):
+        """Store the result of an abandoned background call"""
+        with self._late_lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            if key not in self._abandoned:
+                return
+            self._abandoned.discard(key)
             
-            return {
-                'compound': max(-1.0, min(1.0, compound)),
-                'pos': pos,
-                'neg': neg,
-                'neu': neu
-            }
+            if future.cancelled() or future.exception() is not None:
+                return
             
+            self._late_results[key] = future.result()
+            while len(self._late_results) > MAX_LATE_RESULTS:
+                self._late_results.popitem(last=False)
+    
+    def _take_late_result(self, chain_name: str, variables: Dict) -> Optional[str]:
+        """Hand out (once) a result that finished after its caller's budget ran out"""
+        if not self._late_results:
+            return None
+        with self._late_lock:
+            return self._late_results.pop(self.cache.make_key(chain_name, variables), None)
+    
+    def generate_batch(self, chain_name: str, variables_list: List[Dict],
+                       max_concurrency: Optional[int] = None) -> List[Union[str, Exception]]:
+        """
+        Invoke a named chain over many inputs with bounded concurrency.
+        
+        Results keep the input order. A failed item is returned in place as its
+        exception so callers can fall back per item. Cached items are served
+        without being sent to the LLM.
+        """
+        results, misses = self._lookup_batch(chain_name, variables_list)
+        if misses and self.breaker.state != CircuitState.CLOSED:
+            self._refuse_batch(results, misses)
+        elif misses:
+            started = time.perf_counter()
+            generated = self.chains[chain_name].batch(
+                [variables_list[i] for i in misses],
+                config=self._run_config(chain_name, max_concurrency, Priority.BATCH),
+                return_exceptions=True
+            )
+            self.metrics.record_latency(f"chain.{chain_name}.batch", time.perf_counter() - started)
+            self._fill_batch(chain_name, variables_list, results, misses, generated)
+        
+        return results
+    
+    async def agenerate_batch(self, chain_name: str, variables_list: List[Dict],
+                              max_concurrency: Optional[int] = None) -> List[Union[str, Exception]]:
+        """Async variant of generate_batch"""
+        results, misses = self._lookup_batch(chain_name, variables_list)
+        if misses and self.breaker.state != CircuitState.CLOSED:
+            self._refuse_batch(results, misses)
+        elif misses:
+            started = time.perf_counter()
+            generated = await self.chains[chain_name].abatch(
+                [variables_list[i] for i in misses],
+                config=self._run_config(chain_name, max_concurrency, Priority.BATCH),
+                return_exceptions=True
+            )
+            self.metrics.record_latency(f"chain.{chain_name}.batch", time.perf_counter() - started)
+            self._fill_batch(chain_name, variables_list, results, misses, generated)
+        
+        return results
+    
+    def stream(self, chain_name: str, variables: Dict, priority: Optional[Priority] = None) -> Iterator[str]:
+        """Stream a named chain's output chunk by chunk, caching the full text at the end"""
+        cached = self._cached(chain_name, variables)
+        if cached is not None:
+            yield cached
+            return
+        
+        self.breaker.before_call()
+        started = time.perf_counter()
+        first_token = True
+        outcome = None
+        chunks = []
+        try:
+            config = self._run_config(chain_name, priority=priority)
+            for chunk in self.chains[chain_name].stream(variables, config=config):
+                if first_token:
+                    self.metrics.record_latency(f"chain.{chain_name}.first_token", time.perf_counter() - started)
+                    first_token = False
+                chunks.append(chunk)
+                yield chunk
+            outcome = "success"
         except Exception as e:
-            print(f"Sentiment analysis error: {e}")
-            return {'compound': 0.0, 'pos': 0.5, 'neg': 0.5, 'neu': 0.0}
+            outcome = "failure"
+            self._record_failure(chain_name, e)
+            raise
+        finally:
+            self.metrics.record_latency(f"chain.{chain_name}", time.perf_counter() - started)
+            if outcome == "success" or (outcome is None and not first_token):
+                self.breaker.record_success()
+            elif outcome is None:
+                # Abandoned before the first token: neither a success nor a failure
+                self.breaker.release()
+        
+        self.cache.set(chain_name, variables, "".join(chunks))
     
-    def extract_keywords(self, text: str) -> List[str]:
-        """Extract keywords using simple text processing"""
-        import re
+    def speculate(self, chain_name: str, variables: Dict, cancelled: threading.Event) -> Optional[Future]:
+        """
+        Start generating a response nobody has asked for yet.
         
-        # Simple keyword extraction
-        words = re.findall(r'\b\w+\b', text.lower())
-        stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'a', 'an'}
-        keywords = [word for word in words if len(word) > 3 and word not in stop_words]
+        Runs through stream(), so it is cached, metered and guarded by the
+        breaker like any other call, and stops early once cancelled is set.
+        Returns None when the speculation token budget is spent.
+        """
+        return self.speculator.submit(
+            lambda: self.stream(chain_name, variables, Priority.BACKGROUND), variables, cancelled
+        )
+    
+    def _record_failure(self, chain_name: str, error: BaseException):
+        """Count a failed chain call in the metrics and the circuit breaker"""
+        if isinstance(error, RateLimitTimeout):
+            # Never reached the backend: says nothing about its health
+            self.breaker.release()
+            return
         
-        return list(set(keywords))
+        if is_rate_limited(error):
+            self.metrics.increment("throttled", chain_name)
+            self.scheduler.pause(retry_after(error))
+        self.metrics.record_error(chain_name, error)
+        self.breaker.record_failure(error)
+    
+    def _refuse_batch(self, results: List, misses: List[int]):
+        """Fail every uncached batch item at once unless the circuit is closed"""
+        error = CircuitOpenError("LLM circuit open")
+        for i in misses:
+            results[i] = error
+    
+    def _run_config(self, chain_name: str, max_concurrency: Optional[int] = None,
+                    priority: Optional[Priority] = None) -> Dict:
+        """Runnable config that tags the call with its chain and priority and collects token usage"""
+        return {
+            "tags": [f"{CHAIN_TAG_PREFIX}{chain_name}"],
+            "metadata": {"priority": current_priority() if priority is None else priority},
+            "callbacks": [self._token_callback],
+            "max_concurrency": max_concurrency or self.config.LLM_MAX_CONCURRENCY
+        }
+    
+    def _cached(self, chain_name: str, variables: Dict) -> Optional[str]:
+        """Cache lookup that also counts hits in the metrics"""
+        cached = self.cache.get(chain_name, variables)
+        if cached is None:
+            cached = self._take_late_result(chain_name, variables)
+        if cached is not None:
+            self.metrics.increment("cache_hits", chain_name)
+        return cached
+    
+    def _lookup_batch(self, chain_name: str, variables_list: List[Dict]) -> Tuple[List, List[int]]:
+        """Serve what we can from the cache and return the indexes still to generate"""
+        results = [self._cached(chain_name, variables) for variables in variables_list]
+        misses = [i for i, result in enumerate(results) if result is None]
+        return results, misses
+    
+    def _fill_batch(self, chain_name: str, variables_list: List[Dict], results: List,
+                    misses: List[int], generated: List):
+        """Place generated items back in input order and cache the successful ones"""
+        for i, result in zip(misses, generated):
+            results[i] = result
+            if isinstance(result, str):
+                self.cache.set(chain_name, variables_list[i], result)
+                self.breaker.record_success()
+            elif isinstance(result, Exception):
+                self._record_failure(chain_name, result)
+    
+    def extract_keywords(self, text: str) -> List[str]:
+        """Extract the distinct keywords of a text"""
+        keywords, _ = default_keyword_extractor.extract(text)
+        return list(dict.fromkeys(keywords))
+
+# Log labels for each agent operation
+OPERATION_LABELS = {
+    "speak": "content generation",
+    "reply": "reply generation",
+    "mention": "mention generation",
+    "think": "thoughts generation"
+}
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether the backend refused a call for exceeding the deployment quota (HTTP 429)"""
+    return getattr(error, "status_code", None) == 429
+
+def retry_after(error: BaseException, default: float = 5.0) -> float:
+    """Seconds a 429 response asked us to wait, from its Retry-After header"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", default))
+    except (TypeError, ValueError):
+        return default
+
+def fallback_reason(error: BaseException) -> str:
+    """Classify why an LLM call ended in a fallback response"""
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, LatencyBudgetExceeded):
+        return "latency_budget"
+    if isinstance(error, DuplicateContent):
+        return "duplicate"
+    if isinstance(error, RateLimitTimeout) or is_rate_limited(error):
+        return "rate_limited"
+    return "timeout" if is_timeout(error) else "error"
+
+# Fallback reasons served in the current thread or task, while a caller tracks them
+_served_fallbacks: contextvars.ContextVar = contextvars.ContextVar("served_fallbacks", default=None)
+
+@contextmanager
+def track_fallbacks() -> Iterator[List[str]]:
+    """Collect the reason for every fallback response served inside the block"""
+    reasons: List[str] = []
+    token = _served_fallbacks.set(reasons)
+    try:
+        yield reasons
+    finally:
+        _served_fallbacks.reset(token)
+
+# Fallback response library, shared by every agent
+FALLBACK_RESPONSES = {
+    "win": [
+        "YES! What an incredible race! Can't believe we pulled that off! 🏆 #Victory #F1",
+        "VICTORY! Absolutely buzzing right now! Massive thanks to the entire team! 🥇 #ChampionMindset",
+        "P1! What a feeling! The car was absolutely perfect today! 🏁 #Winner"
+    ],
+    "podium": [
+        "Great result today! Really happy with the progress we're making! 🏆 #Podium #TeamWork",
+        "P3! Solid points in the bag! Team did an amazing job! 💪 #Points",
+        "Happy with that result! We maximized what we had today! 🏁 #F1"
+    ],
+    "disappointing": [
+        "Tough day but these things happen in racing. We'll bounce back stronger! 💪 #NeverGiveUp",
+        "Not our day today but the team never gives up. On to the next one! 🏁 #TeamSpirit",
+        "Disappointed but that's racing. Already looking ahead to next weekend! 🔄 #ComeBackStronger"
+    ],
+    "practice": [
+        "Good session today! Learning more about the car with every lap! 🏎️ #FP2 #Progress",
+        "Productive practice session! Getting the setup dialed in nicely! 🔧 #TeamWork",
+        "Solid work in practice today! The car is feeling better and better! 📈 #F1"
+    ],
+    "qualifying": [
+        "Qualifying day! Time to find those extra tenths! Car feels good! ⏱️ #Quali #Speed",
+        "Ready for quali! The setup feels solid! Let's see what we can do! 🏁 #QualifyingMode",
+        "Q-day! Feeling confident about our pace! Time to put it together! 💨 #F1"
+    ],
+    "general": [
+        "Always giving 100% for the team and the fans! 🏎️ #F1 #TeamWork",
+        "Another day at the office! Love what I do! ❤️ #LivingTheDream #Racing",
+        "Working hard with the team to extract every bit of performance! 🔧 #F1"
+    ]
+}
+
+# Fallback replies by comment category (see fallback_matcher.TextSignals.category)
+FALLBACK_REPLIES = {
+    "positive": [
+        "Thank you! Your support means everything! 🙏❤️",
+        "Really appreciate it! Messages like this keep us motivated! 😊🏁",
+        "Thanks! The fans are what make this sport so special! 🏎️💙"
+    ],
+    "negative": [
+        "Thanks for the honest feedback! We'll use it to get better! 💪🙏",
+        "Appreciate the perspective! Every opinion helps us improve! 👍",
+        "Fair point! We're always working to do better! 🔧💙"
+    ],
+    "question": [
+        "Great question! Always happy to connect with curious fans! 🤔😊",
+        "Thanks for asking! Love the engagement from supporters! 🙏💭",
+        "Good question! The fans ask the most interesting things! 😊🏁"
+    ],
+    "neutral": [
+        "Thanks for the comment! Love connecting with fans! 🙏😊",
+        "Appreciate the message! Fan support is incredible! ❤️🏁",
+        "Thanks! Great to hear from the racing community! 👍🏎️"
+    ]
+}
+
+# Process-wide processor registry, shared by every agent/session
+_processor_registry: Dict[tuple, LangChainProcessor] = {}
+_processor_registry_lock = threading.Lock()
+
+def get_shared_processor(config: Optional[Config] = None) -> LangChainProcessor:
+    """Return the shared processor for this configuration, creating it on first use"""
+    config = config or get_config()
+    # Keyed by every setting, not just the endpoint: cache, budget, scheduler and
+    # breaker settings are baked into the processor when it is built
+    key = astuple(config)
+    
+    with _processor_registry_lock:
+        processor = _processor_registry.get(key)
+        if processor is None:
+            processor = LangChainProcessor(config)
+            _processor_registry[key] = processor
+        return processor
+
+def clear_shared_processors():
+    """Drop all shared processors so the next agent builds a fresh one"""
+    with _processor_registry_lock:
+        _processor_registry.clear()
 
 class F1RacerAgent:
     """
     F1 Racer AI Agent powered by LangChain and Azure OpenAI
     """
     
-    def __init__(self, racer_name: str = "Lightning McQueen", team_name: str = "Rusteze Racing"):
+    def __init__(self, racer_name: str = "Lightning McQueen", team_name: str = "Rusteze Racing",
+                 processor: Optional[LangChainProcessor] = None):
         self.racer_name = racer_name
         self.team_name = team_name
         self.context = RaceContext(
@@ -219,61 +1039,67 @@ class F1RacerAgent:
             racer_name=racer_name,
             mood="focused"
         )
+        self.prompt_snapshot = PromptSnapshot.render(0, racer_name, team_name, self.context)
+        self._speculation = SpeculationSlots()
         
         try:
-            self.processor = LangChainProcessor()
+            self.processor = processor or get_shared_processor()
             self.processor_ready = True
         except Exception as e:
             print(f"Warning: LangChain processor failed to initialize: {e}")
+            self.processor = None
             self.processor_ready = False
         
+        self.metrics = metrics_registry
         self.recent_posts = []
-        self.interaction_history = []
         self.max_recent_posts = 10
         
+        history_size = (self.processor.config.MAX_INTERACTION_HISTORY if self._processor_initialized
+                        else Config.MAX_INTERACTION_HISTORY)
+        self.interaction_history = InteractionHistory(history_size)
+        
+        # Trending keywords/hashtags over posts, fan comments and replies
+        self.trends = KeywordIndex()
+        
+        # Near-duplicate detection over everything this agent has posted
+        self.post_index = None
+        if self._processor_initialized and self.processor.config.DEDUP_ENABLED:
+            self.post_index = NearDuplicateIndex(
+                threshold=self.processor.config.DEDUP_SIMILARITY_THRESHOLD,
+                max_entries=self.processor.config.DEDUP_MAX_POSTS
+            )
+        
         # Initialize fallback response library
         self._init_fallback_responses()
     
+    @property
+    def processor_ready(self) -> bool:
+        """True when LLM calls can be attempted: processor built and circuit not open"""
+        return self._processor_initialized and self.processor.available
+    
+    @processor_ready.setter
+    def processor_ready(self, ready: bool):
+        self._processor_initialized = ready
+    
+    def _unavailable_reason(self) -> str:
+        """Why processor_ready is False, for fallback metrics"""
+        return "circuit_open" if self._processor_initialized else "processor_unavailable"
+    
     def _init_fallback_responses(self):
         """Initialize fallback responses for when LangChain is unavailable"""
-        self.fallback_responses = {
-            "win": [
-                "YES! What an incredible race! Can't believe we pulled that off! 🏆 #Victory #F1",
-                "VICTORY! Absolutely buzzing right now! Massive thanks to the entire team! 🥇 #ChampionMindset",
-                "P1! What a feeling! The car was absolutely perfect today! 🏁 #Winner"
-            ],
-            "podium": [
-                "Great result today! Really happy with the progress we're making! 🏆 #Podium #TeamWork",
-                "P3! Solid points in the bag! Team did an amazing job! 💪 #Points",
-                "Happy with that result! We maximized what we had today! 🏁 #F1"
-            ],
-            "disappointing": [
-                "Tough day but these things happen in racing. We'll bounce back stronger! 💪 #NeverGiveUp",
-                "Not our day today but the team never gives up. On to the next one! 🏁 #TeamSpirit",
-                "Disappointed but that's racing. Already looking ahead to next weekend! 🔄 #ComeBackStronger"
-            ],
-            "practice": [
-                "Good session today! Learning more about the car with every lap! 🏎️ #FP2 #Progress",
-                "Productive practice session! Getting the setup dialed in nicely! 🔧 #TeamWork",
-                "Solid work in practice today! The car is feeling better and better! 📈 #F1"
-            ],
-            "qualifying": [
-                "Qualifying day! Time to find those extra tenths! Car feels good! ⏱️ #Quali #Speed",
-                "Ready for quali! The setup feels solid! Let's see what we can do! 🏁 #QualifyingMode",
-                "Q-day! Feeling confident about our pace! Time to put it together! 💨 #F1"
-            ],
-            "general": [
-                "Always giving 100% for the team and the fans! 🏎️ #F1 #TeamWork",
-                "Another day at the office! Love what I do! ❤️ #LivingTheDream #Racing",
-                "Working hard with the team to extract every bit of performance! 🔧 #F1"
-            ]
-        }
+        self.fallback_responses = FALLBACK_RESPONSES
     
     def update_context(self, stage: RaceStage, session_type: Optional[SessionType] = None,
                       circuit_name: str = None, race_name: str = None,
                       last_result: Optional[RaceResult] = None, position: Optional[int] = None,
-                      mood: str = None):
-        """Update the agent's contextual awareness"""
+                      mood: str = None, pregenerate: Optional[bool] = None):
+        """
+        Update the agent's contextual awareness.
+        
+        Pending pre-generated responses for the old context are cancelled. With
+        pregenerate (default SPECULATION_ENABLED) the likely next posts and
+        thoughts for the new context start generating in the background.
+        """
         
         if circuit_name:
             self.context.circuit_name = circuit_name
@@ -290,12 +1116,142 @@ class F1RacerAgent:
         else:
             self._analyze_and_update_mood()
         
-        context_change = {
-            "timestamp": datetime.now(),
-            "stage": stage.value,
-            "mood": self.context.mood
+        self.refresh_prompt_snapshot()
+        self._speculation.cancel()
+        
+        if pregenerate is None:
+            pregenerate = self._processor_initialized and self.processor.config.SPECULATION_ENABLED
+        if pregenerate:
+            self.pregenerate()
+        
+        self.interaction_history.add("Context Update", stage=stage.value, mood=self.context.mood)
+    
+    def export_state(self) -> Dict:
+        """
+        Names, context, recent posts and history as plain JSON values.
+        
+        Positional lists keep the serialized form small; from_state reverses it.
+        """
+        context = self.context
+        return {
+            "racer": self.racer_name,
+            "team": self.team_name,
+            "context": [
+                context.stage.value,
+                context.session_type.value if context.session_type else None,
+                context.circuit_name,
+                context.race_name,
+                context.last_result.value if context.last_result else None,
+                context.position,
+                context.mood
+            ],
+            "posts": [
+                [post["timestamp"].timestamp(), post["content"], post["context_type"], post["mood"], post["stage"]]
+                for post in self.recent_posts
+            ],
+            "history": [record.to_row() for record in self.interaction_history]
         }
-        self.interaction_history.append(context_change)
+    
+    @classmethod
+    def from_state(cls, state: Dict, processor: Optional[LangChainProcessor] = None) -> "F1RacerAgent":
+        """
+        Rebuild an agent from export_state() output without calling the LLM.
+        
+        Restored posts are re-indexed for trending and near-duplicate checks;
+        fan comments and replies seen before the export are not.
+        """
+        agent = cls(state["racer"], state["team"], processor=processor)
+        stage, session_type, circuit_name, race_name, last_result, position, mood = state["context"]
+        
+        context = agent.context
+        context.stage = RaceStage(stage)
+        context.session_type = SessionType(session_type) if session_type else None
+        context.circuit_name = circuit_name
+        context.race_name = race_name
+        context.last_result = RaceResult(last_result) if last_result else None
+        context.position = position
+        context.mood = mood
+        agent.refresh_prompt_snapshot()
+        
+        for timestamp, content, context_type, post_mood, post_stage in state.get("posts", []):
+            agent.recent_posts.append({
+                "timestamp": datetime.fromtimestamp(timestamp),
+                "content": content,
+                "context_type": context_type,
+                "mood": post_mood,
+                "stage": post_stage
+            })
+            agent.trends.add_many([content], post_stage, circuit_name)
+            if agent.post_index is not None:
+                agent.post_index.add(content)
+        
+        for row in state.get("history", []):
+            agent.interaction_history.append(InteractionRecord.from_row(row))
+        return agent
+    
+    def refresh_prompt_snapshot(self) -> PromptSnapshot:
+        """Re-render the prompt variables; call after changing context or names directly"""
+        self.prompt_snapshot = PromptSnapshot.render(
+            self.prompt_snapshot.version + 1, self.racer_name, self.team_name, self.context
+        )
+        return self.prompt_snapshot
+    
+    def pregenerate(self) -> int:
+        """
+        Speculatively generate the likely next speak and think results.
+        
+        Results land in slots for the current context; the next call with
+        matching inputs takes its slot instead of calling the LLM. Returns the
+        number of requests started, which the token budget may limit.
+        """
+        if not self.processor_ready:
+            return 0
+        
+        content_types = dict.fromkeys(["general", self._determine_context_from_state()])
+        requests = [("content", self._speak_vars(context_type)) for context_type in content_types]
+        requests.append(("thoughts", self._think_vars()))
+        
+        cancelled = self._speculation.cancelled
+        started = 0
+        for chain_name, variables in requests:
+            future = self.processor.speculate(chain_name, variables, cancelled)
+            if future is None:
+                break
+            self._speculation.put(self.processor.cache.make_key(chain_name, variables), future)
+            started += 1
+        return started
+    
+    def _take_speculation(self, chain_name: str, variables: Dict, budget: Optional[float]) -> Optional[str]:
+        """Pre-generated result for exactly these inputs, waiting for it if still running"""
+        future = self._speculation.take(self.processor.cache.make_key(chain_name, variables))
+        if future is None:
+            return None
+        
+        try:
+            result = future.result(timeout=budget)
+        except FutureTimeoutError:
+            raise LatencyBudgetExceeded(f"pre-generated {chain_name} not ready within {budget:.2f}s")
+        except Exception:
+            return None
+        
+        self.metrics.increment("speculation", "hit")
+        return result
+    
+    async def _atake_speculation(self, chain_name: str, variables: Dict, budget: Optional[float]) -> Optional[str]:
+        """Async variant of _take_speculation"""
+        future = self._speculation.take(self.processor.cache.make_key(chain_name, variables))
+        if future is None or future.cancelled():
+            return None
+        
+        try:
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), budget)
+        except asyncio.TimeoutError:
+            raise LatencyBudgetExceeded(f"pre-generated {chain_name} not ready within {budget:.2f}s")
+        except Exception:
+            return None
+        
+        self.metrics.increment("speculation", "hit")
+        return result
     
     def _analyze_and_update_mood(self):
         """Analyze and update mood based on context"""
@@ -318,43 +1274,323 @@ class F1RacerAgent:
             else:
                 self.context.mood = "neutral"
     
-    def speak(self, context_type: str = "general") -> str:
-        """Generate contextual F1 racer posts using LangChain"""
+    def speak(self, context_type: str = "general", latency_budget: Optional[float] = None) -> str:
+        """
+        Generate contextual F1 racer posts using LangChain.
         
-        if not self.processor_ready:
+        If the post is not ready within latency_budget seconds (default from
+        LLM_LATENCY_BUDGET_SECONDS) a fallback post is returned instead.
+        """
+        return self._generate_or_fallback(
+            "speak", "content", self._speak_vars, (context_type,), self._finish_speak, self._fallback_speak,
+            latency_budget
+        )
+    
+    async def aspeak(self, context_type: str = "general", latency_budget: Optional[float] = None) -> str:
+        """Async variant of speak"""
+        return await self._agenerate_or_fallback(
+            "speak", "content", self._speak_vars, (context_type,), self._finish_speak, self._fallback_speak,
+            latency_budget
+        )
+    
+    def batch_speak(self, context_types: List[str], max_concurrency: Optional[int] = None) -> List[str]:
+        """Generate one post per context type concurrently, keeping input order"""
+        return self._generate_batch_or_fallback(
+            "speak", "content", self._speak_vars, [(context_type,) for context_type in context_types],
+            self._finish_speak, self._fallback_speak, max_concurrency
+        )
+    
+    async def abatch_speak(self, context_types: List[str], max_concurrency: Optional[int] = None) -> List[str]:
+        """Async variant of batch_speak"""
+        return await self._agenerate_batch_or_fallback(
+            "speak", "content", self._speak_vars, [(context_type,) for context_type in context_types],
+            self._finish_speak, self._fallback_speak, max_concurrency
+        )
+    
+    def speak_stream(self, context_type: str = "general") -> Iterator[str]:
+        """Streaming variant of speak; the post is tracked once the stream completes"""
+        yield from self._stream_with_fallback(
+            "speak", "content", self._speak_vars, (context_type,), self._finish_speak, self._fallback_speak
+        )
+    
+    def _speak_vars(self, context_type: str) -> Dict[str, str]:
+        """Content chain variables from the current prompt snapshot"""
+        return self.prompt_snapshot.chain_vars("content", content_type=context_type, avoid="")
+
+    def _finish_speak(self, content: str, context_type: str) -> str:
+        """Clean up and track generated content, falling back if it came back empty"""
+        content = content.strip()
+        if not content:
+            self._record_fallback("speak", "empty")
             return self._fallback_speak(context_type)
         
+        if self.post_index is not None and self.post_index.find(content) is not None:
+            raise DuplicateContent(content, lambda: self._track_generated_content(content, context_type))
+        
+        # Track the post
+        self._track_generated_content(content, context_type)
+        
+        return content
+    
+    def _budget(self, latency_budget: Optional[float]) -> Optional[float]:
+        """Per-call latency budget, else the configured default; None means wait for the LLM"""
+        if latency_budget is None:
+            latency_budget = self.processor.config.LLM_LATENCY_BUDGET_SECONDS
+        return latency_budget if latency_budget and latency_budget > 0 else None
+    
+    def _remaining(self, deadline: Optional[float]) -> Optional[float]:
+        """Budget left before deadline (a perf_counter value); None means no deadline"""
+        if deadline is None:
+            return None
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise LatencyBudgetExceeded("latency budget spent on duplicate retries")
+        return remaining
+    
+    def _retry_duplicate(self, operation: str, variables: Dict, duplicate: DuplicateContent,
+                         retries_left: int) -> Dict:
+        """
+        Variables for regenerating after finish() rejected a near-duplicate.
+        
+        Re-raises the duplicate once the retries are used up, so the caller
+        serves a fallback instead.
+        """
+        self.metrics.increment("duplicates", operation)
+        if retries_left <= 0:
+            raise duplicate
+        return dict(variables, avoid=f" Make it clearly different from this recent post: \"{duplicate.text}\"")
+    
+    def _generate_or_fallback(self, operation: str, chain_name: str, build_vars, args: tuple,
+                              finish, fallback, latency_budget: Optional[float] = None) -> str:
+        """
+        Run one chain call and finish its result, or fall back.
+        
+        build_vars, finish and fallback all receive args; finish also gets the
+        generated text first. Latency and fallback reasons go to the metrics.
+        A call that overruns the latency budget falls back immediately while the
+        LLM request finishes in the background.
+        """
+        started = time.perf_counter()
         try:
-            # Prepare context for LangChain
-            context_vars = {
-                "racer_name": self.racer_name,
-                "team_name": self.team_name,
-                "stage": self.context.stage.value,
-                "session_type": self.context.session_type.value if self.context.session_type else "N/A",
-                "circuit_name": self.context.circuit_name,
-                "race_name": self.context.race_name,
-                "last_result": self.context.last_result.value if self.context.last_result else "N/A",
-                "position": str(self.context.position) if self.context.position else "N/A",
-                "mood": self.context.mood,
-                "content_type": context_type
-            }
-            
-            # Generate content using LangChain
-            content = self.processor.content_chain.invoke(context_vars)
+            if not self.processor_ready:
+                self._record_fallback(operation, self._unavailable_reason())
+                return fallback(*args)
             
-            # Clean up the response
-            content = content.strip()
-            if not content:
-                return self._fallback_speak(context_type)
+            try:
+                variables = build_vars(*args)
+                budget = self._budget(latency_budget)
+                result = self._take_speculation(chain_name, variables, budget)
+                if result is None:
+                    result = self.processor.generate(chain_name, variables, budget)
+                
+                deadline = started + budget if budget else None
+                retries = self.processor.config.DEDUP_MAX_RETRIES
+                while True:
+                    try:
+                        return finish(result, *args)
+                    except DuplicateContent as duplicate:
+                        variables = self._retry_duplicate(operation, variables, duplicate, retries)
+                        retries -= 1
+                        result = self.processor.generate(chain_name, variables, self._remaining(deadline))
+            except Exception as e:
+                print(f"LangChain {OPERATION_LABELS[operation]} error: {e}")
+                self._record_fallback(operation, fallback_reason(e))
+                return fallback(*args)
+        finally:
+            self.metrics.record_latency(f"op.{operation}", time.perf_counter() - started)
+    
+    async def _agenerate_or_fallback(self, operation: str, chain_name: str, build_vars, args: tuple,
+                                     finish, fallback, latency_budget: Optional[float] = None) -> str:
+        """Async variant of _generate_or_fallback"""
+        started = time.perf_counter()
+        try:
+            if not self.processor_ready:
+                self._record_fallback(operation, self._unavailable_reason())
+                return fallback(*args)
             
-            # Track the post
-            self._track_generated_content(content, context_type)
+            try:
+                variables = build_vars(*args)
+                budget = self._budget(latency_budget)
+                result = await self._atake_speculation(chain_name, variables, budget)
+                if result is None:
+                    result = await self.processor.agenerate(chain_name, variables, budget)
+                
+                deadline = started + budget if budget else None
+                retries = self.processor.config.DEDUP_MAX_RETRIES
+                while True:
+                    try:
+                        return finish(result, *args)
+                    except DuplicateContent as duplicate:
+                        variables = self._retry_duplicate(operation, variables, duplicate, retries)
+                        retries -= 1
+                        result = await self.processor.agenerate(chain_name, variables, self._remaining(deadline))
+            except Exception as e:
+                print(f"LangChain {OPERATION_LABELS[operation]} error: {e}")
+                self._record_fallback(operation, fallback_reason(e))
+                return fallback(*args)
+        finally:
+            self.metrics.record_latency(f"op.{operation}", time.perf_counter() - started)
+    
+    def _generate_batch_or_fallback(self, operation: str, chain_name: str, build_vars, args_list: List[tuple],
+                                    finish, fallback, max_concurrency: Optional[int]) -> List[str]:
+        """Batch variant of _generate_or_fallback; each item falls back on its own"""
+        started = time.perf_counter()
+        try:
+            if not self.processor_ready:
+                self._record_fallback(operation, self._unavailable_reason(), len(args_list))
+                return [fallback(*args) for args in args_list]
             
-            return content
+            variables_list = [build_vars(*args) for args in args_list]
+            outputs = [None] * len(args_list)
+            pending = list(range(len(args_list)))
+            retries = self.processor.config.DEDUP_MAX_RETRIES
+            # Each round regenerates only the items finish() rejected as duplicates
+            while pending:
+                try:
+                    results = self.processor.generate_batch(
+                        chain_name, [variables_list[i] for i in pending], max_concurrency
+                    )
+                except Exception as e:
+                    print(f"LangChain {OPERATION_LABELS[operation]} error: {e}")
+                    self._record_fallback(operation, fallback_reason(e), len(pending))
+                    for i in pending:
+                        outputs[i] = fallback(*args_list[i])
+                    break
+                pending = self._resolve_batch(
+                    operation, results, pending, variables_list, args_list, outputs, finish, fallback, retries
+                )
+                retries -= 1
+            return outputs
+        finally:
+            self.metrics.record_latency(f"op.{operation}.batch", time.perf_counter() - started)
+    
+    async def _agenerate_batch_or_fallback(self, operation: str, chain_name: str, build_vars,
+                                           args_list: List[tuple], finish, fallback,
+                                           max_concurrency: Optional[int]) -> List[str]:
+        """Async variant of _generate_batch_or_fallback"""
+        started = time.perf_counter()
+        try:
+            if not self.processor_ready:
+                self._record_fallback(operation, self._unavailable_reason(), len(args_list))
+                return [fallback(*args) for args in args_list]
             
+            variables_list = [build_vars(*args) for args in args_list]
+            outputs = [None] * len(args_list)
+            pending = list(range(len(args_list)))
+            retries = self.processor.config.DEDUP_MAX_RETRIES
+            while pending:
+                try:
+                    results = await self.processor.agenerate_batch(
+                        chain_name, [variables_list[i] for i in pending], max_concurrency
+                    )
+                except Exception as e:
+                    print(f"LangChain {OPERATION_LABELS[operation]} error: {e}")
+                    self._record_fallback(operation, fallback_reason(e), len(pending))
+                    for i in pending:
+                        outputs[i] = fallback(*args_list[i])
+                    break
+                pending = self._resolve_batch(
+                    operation, results, pending, variables_list, args_list, outputs, finish, fallback, retries
+                )
+                retries -= 1
+            return outputs
+        finally:
+            self.metrics.record_latency(f"op.{operation}.batch", time.perf_counter() - started)
+    
+    def _stream_with_fallback(self, operation: str, chain_name: str, build_vars, args: tuple,
+                              finish, fallback, prefix: str = "") -> Iterator[str]:
+        """
+        Yield chunks from a chain as they arrive, then run the usual finish step.
+        
+        If nothing but whitespace was produced (or the processor is unavailable
+        or fails before the first token) the fallback text is yielded instead.
+        """
+        started = time.perf_counter()
+        if not self.processor_ready:
+            self._record_fallback(operation, self._unavailable_reason())
+            yield fallback(*args)
+            return
+        
+        chunks = []
+        try:
+            variables = build_vars(*args)
+            speculated = self._take_speculation(chain_name, variables, None)
+            source = (speculated,) if speculated is not None else self.processor.stream(chain_name, variables)
+            for chunk in source:
+                if not chunk:
+                    continue
+                if not chunks:
+                    if not chunk.strip():
+                        continue
+                    chunk = prefix + chunk.lstrip()
+                    self.metrics.record_latency(f"op.{operation}.first_token", time.perf_counter() - started)
+                chunks.append(chunk)
+                yield chunk
         except Exception as e:
-            print(f"LangChain content generation error: {e}")
-            return self._fallback_speak(context_type)
+            print(f"LangChain {OPERATION_LABELS[operation]} error: {e}")
+            if not chunks:
+                self._record_fallback(operation, fallback_reason(e))
+        
+        text = "".join(chunks)[len(prefix):]
+        if not text.strip():
+            if not chunks:
+                self._record_fallback(operation, "empty")
+            yield fallback(*args)
+        else:
+            try:
+                finish(text, *args)
+            except DuplicateContent as duplicate:
+                # Already shown to the user chunk by chunk, so keep it
+                self.metrics.increment("duplicates", operation)
+                duplicate.keep()
+        
+        self.metrics.record_latency(f"op.{operation}.stream", time.perf_counter() - started)
+    
+    def _resolve_batch(self, operation: str, results: List, pending: List[int], variables_list: List[Dict],
+                       args_list: List[tuple], outputs: List, finish, fallback, retries_left: int) -> List[int]:
+        """
+        Finish one round of batch results into outputs.
+        
+        Returns the indices finish() rejected as near-duplicates, with their
+        variables in variables_list updated for regeneration; once the retries
+        are used up those items fall back instead.
+        """
+        retry = []
+        for i, result in zip(pending, results):
+            try:
+                outputs[i] = self._resolve_batch_item(operation, result, finish, fallback, *args_list[i])
+            except DuplicateContent as duplicate:
+                try:
+                    variables_list[i] = self._retry_duplicate(operation, variables_list[i], duplicate, retries_left)
+                    retry.append(i)
+                except DuplicateContent as e:
+                    self._record_fallback(operation, fallback_reason(e))
+                    outputs[i] = fallback(*args_list[i])
+        return retry
+    
+    def _resolve_batch_item(self, operation: str, result, finish, fallback, *args) -> str:
+        """Finish a single batch result, or fall back if that item failed; near-duplicates propagate"""
+        if isinstance(result, Exception):
+            print(f"LangChain {OPERATION_LABELS[operation]} error: {result}")
+            self._record_fallback(operation, fallback_reason(result))
+            return fallback(*args)
+        
+        try:
+            return finish(result, *args)
+        except DuplicateContent:
+            raise
+        except Exception as e:
+            print(f"LangChain {OPERATION_LABELS[operation]} error: {e}")
+            self._record_fallback(operation, fallback_reason(e))
+            return fallback(*args)
+    
+    def _record_fallback(self, operation: str, reason: str, count: int = 1):
+        """Count fallback responses served for an operation, by reason"""
+        for _ in range(count):
+            self.metrics.record_fallback(operation, reason)
+        served = _served_fallbacks.get()
+        if served is not None:
+            served.extend([reason] * count)
     
     def _fallback_speak(self, context_type: str) -> str:
         """Fallback content generation when LangChain is unavailable"""
@@ -363,16 +1599,24 @@ class F1RacerAgent:
         if context_type == "general":
             context_type = self._determine_context_from_state()
         
-        if context_type in self.fallback_responses:
-            base_messages = self.fallback_responses[context_type]
-            message = random.choice(base_messages)
-        else:
-            message = random.choice(self.fallback_responses["general"])
+        base_messages = self.fallback_responses.get(context_type, self.fallback_responses["general"])
         
         # Add circuit/race context
+        suffix = ""
         if self.context.race_name and "Grand Prix" in self.context.race_name:
             race_hashtag = self.context.race_name.replace(" Grand Prix", "GP").replace(" ", "")
-            message += f" #{race_hashtag}"
+            suffix = f" #{race_hashtag}"
+        
+        message = random.choice(base_messages) + suffix
+        
+        # Prefer a message that doesn't repeat a recent post, and index the one
+        # served so the next fallback avoids it too
+        if self.post_index is not None:
+            if self.post_index.find(message) is not None:
+                fresh = [m + suffix for m in base_messages if self.post_index.find(m + suffix) is None]
+                if fresh:
+                    message = random.choice(fresh)
+            self.post_index.add(message)
         
         return message
     
@@ -391,103 +1635,109 @@ class F1RacerAgent:
         else:
             return "general"
     
-    def reply_to_comment(self, original_comment: str) -> str:
-        """Generate contextual reply to fan comments using LangChain"""
-        
-        if not self.processor_ready:
+    def reply_to_comment(self, original_comment: str, latency_budget: Optional[float] = None) -> str:
+        """Generate contextual reply to fan comments using LangChain, within an optional latency budget"""
+        self._index_texts([original_comment])
+        return self._generate_or_fallback(
+            "reply", "reply", self._reply_vars, (original_comment,), self._finish_reply, self._fallback_reply,
+            latency_budget
+        )
+    
+    async def areply_to_comment(self, original_comment: str, latency_budget: Optional[float] = None) -> str:
+        """Async variant of reply_to_comment"""
+        self._index_texts([original_comment])
+        return await self._agenerate_or_fallback(
+            "reply", "reply", self._reply_vars, (original_comment,), self._finish_reply, self._fallback_reply,
+            latency_budget
+        )
+    
+    def batch_reply_to_comment(self, comments: List[str], max_concurrency: Optional[int] = None) -> List[str]:
+        """Reply to many fan comments concurrently, keeping input order"""
+        self._index_texts(comments)
+        return self._generate_batch_or_fallback(
+            "reply", "reply", self._reply_vars, [(comment,) for comment in comments],
+            self._finish_reply, self._fallback_reply, max_concurrency
+        )
+    
+    async def abatch_reply_to_comment(self, comments: List[str], max_concurrency: Optional[int] = None) -> List[str]:
+        """Async variant of batch_reply_to_comment"""
+        self._index_texts(comments)
+        return await self._agenerate_batch_or_fallback(
+            "reply", "reply", self._reply_vars, [(comment,) for comment in comments],
+            self._finish_reply, self._fallback_reply, max_concurrency
+        )
+    
+    def reply_to_comment_stream(self, original_comment: str) -> Iterator[str]:
+        """Streaming variant of reply_to_comment"""
+        self._index_texts([original_comment])
+        yield from self._stream_with_fallback(
+            "reply", "reply", self._reply_vars, (original_comment,), self._finish_reply, self._fallback_reply
+        )
+    
+    def _reply_vars(self, original_comment: str) -> Dict[str, str]:
+        """Reply chain variables from the current prompt snapshot"""
+        return self.prompt_snapshot.chain_vars("reply", fan_comment=original_comment)
+
+    def _finish_reply(self, reply: str, original_comment: str) -> str:
+        """Clean up a generated reply, falling back if it came back empty"""
+        reply = reply.strip()
+        if not reply:
+            self._record_fallback("reply", "empty")
             return self._fallback_reply(original_comment)
         
-        try:
-            # Prepare context for LangChain
-            context_vars = {
-                "racer_name": self.racer_name,
-                "team_name": self.team_name,
-                "stage": self.context.stage.value,
-                "circuit_name": self.context.circuit_name,
-                "last_result": self.context.last_result.value if self.context.last_result else "N/A",
-                "mood": self.context.mood,
-                "fan_comment": original_comment
-            }
-            
-            # Generate reply using LangChain
-            reply = self.processor.reply_chain.invoke(context_vars)
-            
-            # Clean up the response
-            reply = reply.strip()
-            if not reply:
-                return self._fallback_reply(original_comment)
-            
-            return reply
-            
-        except Exception as e:
-            print(f"LangChain reply generation error: {e}")
-            return self._fallback_reply(original_comment)
+        self._index_texts([reply])
+        
+        return reply
     
     def _fallback_reply(self, original_comment: str) -> str:
         """Fallback reply generation"""
-        
-        comment_lower = original_comment.lower()
-        
-        # Simple sentiment analysis
-        positive_words = ['amazing', 'great', 'awesome', 'fantastic', 'brilliant', 'excellent']
-        negative_words = ['bad', 'terrible', 'awful', 'disappointing', 'frustrating']
-        question_words = ['what', 'how', 'why', 'when', 'where', 'which', 'who']
-        
-        if any(word in comment_lower for word in positive_words):
-            replies = [
-                "Thank you! Your support means everything! 🙏❤️",
-                "Really appreciate it! Messages like this keep us motivated! 😊🏁",
-                "Thanks! The fans are what make this sport so special! 🏎️💙"
-            ]
-        elif any(word in comment_lower for word in negative_words):
-            replies = [
-                "Thanks for the honest feedback! We'll use it to get better! 💪🙏",
-                "Appreciate the perspective! Every opinion helps us improve! 👍",
-                "Fair point! We're always working to do better! 🔧💙"
-            ]
-        elif any(word in comment_lower for word in question_words) or '?' in comment_lower:
-            replies = [
-                "Great question! Always happy to connect with curious fans! 🤔😊",
-                "Thanks for asking! Love the engagement from supporters! 🙏💭",
-                "Good question! The fans ask the most interesting things! 😊🏁"
-            ]
-        else:
-            replies = [
-                "Thanks for the comment! Love connecting with fans! 🙏😊",
-                "Appreciate the message! Fan support is incredible! ❤️🏁",
-                "Thanks! Great to hear from the racing community! 👍🏎️"
-            ]
-        
-        return random.choice(replies)
+        category = default_fallback_matcher.classify(original_comment).category
+        return random.choice(FALLBACK_REPLIES[category])
     
-    def mention_teammate_or_competitor(self, person_name: str, context: str = "positive") -> str:
-        """Generate mention posts using LangChain"""
-        
-        if not self.processor_ready:
+    def mention_teammate_or_competitor(self, person_name: str, context: str = "positive",
+                                       latency_budget: Optional[float] = None) -> str:
+        """Generate mention posts using LangChain, within an optional latency budget"""
+        return self._generate_or_fallback(
+            "mention", "mention", self._mention_vars, (person_name, context),
+            self._finish_mention, self._fallback_mention, latency_budget
+        )
+    
+    async def amention_teammate_or_competitor(self, person_name: str, context: str = "positive",
+                                              latency_budget: Optional[float] = None) -> str:
+        """Async variant of mention_teammate_or_competitor"""
+        return await self._agenerate_or_fallback(
+            "mention", "mention", self._mention_vars, (person_name, context),
+            self._finish_mention, self._fallback_mention, latency_budget
+        )
+    
+    def batch_mention(self, mentions: List[Tuple[str, str]], max_concurrency: Optional[int] = None) -> List[str]:
+        """Generate mentions for many (person_name, context) pairs concurrently, keeping input order"""
+        return self._generate_batch_or_fallback(
+            "mention", "mention", self._mention_vars, [tuple(mention) for mention in mentions],
+            self._finish_mention, self._fallback_mention, max_concurrency
+        )
+    
+    async def abatch_mention(self, mentions: List[Tuple[str, str]], max_concurrency: Optional[int] = None) -> List[str]:
+        """Async variant of batch_mention"""
+        return await self._agenerate_batch_or_fallback(
+            "mention", "mention", self._mention_vars, [tuple(mention) for mention in mentions],
+            self._finish_mention, self._fallback_mention, max_concurrency
+        )
+    
+    def _mention_vars(self, person_name: str, context: str) -> Dict[str, str]:
+        """Mention chain variables from the current prompt snapshot"""
+        return self.prompt_snapshot.chain_vars("mention", mention_context=context, person_name=person_name)
+
+    def _finish_mention(self, mention: str, person_name: str, context: str) -> str:
+        """Clean up a generated mention, falling back if it came back empty"""
+        mention = mention.strip()
+        if not mention:
+            self._record_fallback("mention", "empty")
             return self._fallback_mention(person_name, context)
         
-        try:
-            # Prepare context for LangChain
-            context_vars = {
-                "racer_name": self.racer_name,
-                "team_name": self.team_name,
-                "mention_context": context,
-                "person_name": person_name
-            }
-            
-            # Generate mention using LangChain
-            mention = self.processor.mention_chain.invoke(context_vars)
-            
-            # Clean up the response
-            mention = mention.strip()
-            if not mention:
-                return self._fallback_mention(person_name, context)
-            
-            return mention
-            
-        except Exception as e:
-            print(f"LangChain mention generation error: {e}")
-            return self._fallback_mention(person_name, context)
+        self._index_texts([mention])
+        
+        return mention
     
     def _fallback_mention(self, person_name: str, context: str) -> str:
         """Fallback mention generation"""
@@ -516,66 +1766,138 @@ class F1RacerAgent:
     def simulate_like_action(self, post_content: str) -> str:
         """Simulate liking a post with sentiment analysis"""
         
+        started = time.perf_counter()
         try:
-            if self.processor_ready:
+            if self._processor_initialized:
                 sentiment = self.processor.analyze_sentiment(post_content)
                 compound = sentiment['compound']
             else:
-                # Simple fallback sentiment
-                positive_words = ['great', 'amazing', 'awesome', 'fantastic', 'excellent']
-                negative_words = ['bad', 'terrible', 'awful', 'disappointing']
-                
-                post_lower = post_content.lower()
-                pos_count = sum(1 for word in positive_words if word in post_lower)
-                neg_count = sum(1 for word in negative_words if word in post_lower)
-                compound = (pos_count - neg_count) / 5.0
+                self._record_fallback("like", "processor_unavailable")
+                compound = self._fallback_sentiment_score(post_content)
             
-            if compound > 0.5:
-                reactions = ["❤️ Loved", "❤️❤️❤️ Absolutely loved", "💪 Fully supported", "🔥 This is fire"]
-            elif compound > 0.1:
-                reactions = ["👍 Liked", "🙌 Supported", "💯 This", "✨ Quality content"]
-            else:
-                reactions = ["👍 Acknowledged", "🤝 Respect", "💙 Seen", "👍 Noted"]
-            
-            action = random.choice(reactions)
-            preview = post_content[:50] + "..." if len(post_content) > 50 else post_content
-            
-            return f"{action}: '{preview}'"
+            return self._format_like_action(post_content, compound)
             
         except Exception as e:
             print(f"Like simulation error: {e}")
+            self._record_fallback("like", fallback_reason(e))
             return f"👍 Liked: '{post_content[:50]}...'"
+        finally:
+            self.metrics.record_latency("op.like", time.perf_counter() - started)
     
-    def think(self) -> str:
-        """Generate internal thoughts using LangChain"""
-        
-        if not self.processor_ready:
-            return self._fallback_think()
+    async def asimulate_like_action(self, post_content: str) -> str:
+        """Async variant of simulate_like_action"""
         
+        started = time.perf_counter()
         try:
-            # Prepare context for LangChain
-            context_vars = {
-                "racer_name": self.racer_name,
-                "stage": self.context.stage.value,
-                "session_type": self.context.session_type.value if self.context.session_type else "N/A",
-                "circuit_name": self.context.circuit_name,
-                "last_result": self.context.last_result.value if self.context.last_result else "N/A",
-                "mood": self.context.mood
-            }
-            
-            # Generate thoughts using LangChain
-            thoughts = self.processor.thoughts_chain.invoke(context_vars)
-            
-            # Clean up the response
-            thoughts = thoughts.strip()
-            if not thoughts:
-                return self._fallback_think()
+            if self._processor_initialized:
+                sentiment = await self.processor.aanalyze_sentiment(post_content)
+                compound = sentiment['compound']
+            else:
+                self._record_fallback("like", "processor_unavailable")
+                compound = self._fallback_sentiment_score(post_content)
             
-            return f"💭 Internal thoughts: {thoughts}"
+            return self._format_like_action(post_content, compound)
             
         except Exception as e:
-            print(f"LangChain thoughts generation error: {e}")
+            print(f"Like simulation error: {e}")
+            self._record_fallback("like", fallback_reason(e))
+            return f"👍 Liked: '{post_content[:50]}...'"
+        finally:
+            self.metrics.record_latency("op.like", time.perf_counter() - started)
+    
+    def batch_simulate_like_action(self, posts: List[str], max_concurrency: Optional[int] = None) -> List[str]:
+        """Simulate liking many posts with one bulk sentiment pass, keeping input order"""
+        
+        started = time.perf_counter()
+        compounds = None
+        if self._processor_initialized:
+            try:
+                sentiments = self.processor.analyze_sentiment_bulk(posts, max_concurrency=max_concurrency)
+                compounds = [sentiment['compound'] for sentiment in sentiments]
+            except Exception as e:
+                print(f"Sentiment analysis error: {e}")
+                self._record_fallback("like", fallback_reason(e), len(posts))
+        else:
+            self._record_fallback("like", "processor_unavailable", len(posts))
+        
+        if compounds is None:
+            compounds = default_fallback_matcher.score_batch(posts)
+        
+        actions = [self._format_like_action(post, compound) for post, compound in zip(posts, compounds)]
+        self.metrics.record_latency("op.like.batch", time.perf_counter() - started)
+        return actions
+    
+    async def abatch_simulate_like_action(self, posts: List[str], max_concurrency: Optional[int] = None) -> List[str]:
+        """Async variant of batch_simulate_like_action"""
+        
+        started = time.perf_counter()
+        compounds = None
+        if self._processor_initialized:
+            try:
+                sentiments = await self.processor.aanalyze_sentiment_bulk(posts, max_concurrency=max_concurrency)
+                compounds = [sentiment['compound'] for sentiment in sentiments]
+            except Exception as e:
+                print(f"Sentiment analysis error: {e}")
+                self._record_fallback("like", fallback_reason(e), len(posts))
+        else:
+            self._record_fallback("like", "processor_unavailable", len(posts))
+        
+        if compounds is None:
+            compounds = default_fallback_matcher.score_batch(posts)
+        
+        actions = [self._format_like_action(post, compound) for post, compound in zip(posts, compounds)]
+        self.metrics.record_latency("op.like.batch", time.perf_counter() - started)
+        return actions
+    
+    def _fallback_sentiment_score(self, post_content: str) -> float:
+        """Simple fallback sentiment"""
+        return default_fallback_matcher.score(post_content)
+    
+    def _format_like_action(self, post_content: str, compound: float) -> str:
+        """Pick a reaction for the given sentiment score"""
+        if compound > 0.5:
+            reactions = ["❤️ Loved", "❤️❤️❤️ Absolutely loved", "💪 Fully supported", "🔥 This is fire"]
+        elif compound > 0.1:
+            reactions = ["👍 Liked", "🙌 Supported", "💯 This", "✨ Quality content"]
+        else:
+            reactions = ["👍 Acknowledged", "🤝 Respect", "💙 Seen", "👍 Noted"]
+        
+        action = random.choice(reactions)
+        preview = post_content[:50] + "..." if len(post_content) > 50 else post_content
+        
+        return f"{action}: '{preview}'"
+    
+    def think(self, latency_budget: Optional[float] = None) -> str:
+        """Generate internal thoughts using LangChain, within an optional latency budget"""
+        return self._generate_or_fallback(
+            "think", "thoughts", self._think_vars, (), self._finish_think, self._fallback_think, latency_budget
+        )
+    
+    async def athink(self, latency_budget: Optional[float] = None) -> str:
+        """Async variant of think"""
+        return await self._agenerate_or_fallback(
+            "think", "thoughts", self._think_vars, (), self._finish_think, self._fallback_think, latency_budget
+        )
+    
+    def think_stream(self) -> Iterator[str]:
+        """Streaming variant of think"""
+        yield from self._stream_with_fallback(
+            "think", "thoughts", self._think_vars, (), self._finish_think, self._fallback_think,
+            prefix="💭 Internal thoughts: "
+        )
+    
+    def _think_vars(self) -> Dict[str, str]:
+        """Thoughts chain variables from the current prompt snapshot"""
+        return self.prompt_snapshot.chain_vars("thoughts")
+
+    def _finish_think(self, thoughts: str) -> str:
+        """Clean up generated thoughts, falling back if they came back empty"""
+        thoughts = thoughts.strip()
+        if not thoughts:
+            self._record_fallback("think", "empty")
             return self._fallback_think()
+        
+        return f"💭 Internal thoughts: {thoughts}"
     
     def _fallback_think(self) -> str:
         """Fallback thoughts generation"""
@@ -622,10 +1944,26 @@ class F1RacerAgent:
         }
         
         self.recent_posts.append(entry)
+        self._index_texts([content])
+        if self.post_index is not None:
+            self.post_index.add(content)
         
         if len(self.recent_posts) > self.max_recent_posts:
             self.recent_posts.pop(0)
     
+    def _index_texts(self, texts: List[str]):
+        """Count texts into the trending index under the current stage and circuit"""
+        self.trends.add_many(texts, self.context.stage.value, self.context.circuit_name)
+    
+    def trending(self, k: int = 5, stage: Optional[RaceStage] = None,
+                 circuit_name: Optional[str] = None) -> Dict[str, List[Tuple[str, int]]]:
+        """Top keywords and hashtags, optionally for one stage and/or circuit"""
+        stage_value = stage.value if stage else None
+        return {
+            "keywords": self.trends.top_keywords(k, stage_value, circuit_name),
+            "hashtags": self.trends.top_hashtags(k, stage_value, circuit_name)
+        }
+    
     def get_agent_info(self) -> Dict:
         """Return comprehensive agent state"""
         
@@ -639,7 +1977,14 @@ class F1RacerAgent:
             "last_result": self.context.last_result,
             "position": self.context.position,
             "mood": self.context.mood,
+            "context_version": self.prompt_snapshot.version,
+            "pregenerated_pending": len(self._speculation),
             "recent_posts_count": len(self.recent_posts),
+            "indexed_posts": len(self.post_index) if self.post_index is not None else 0,
             "interaction_history_count": len(self.interaction_history),
-            "processor_ready": self.processor_ready
+            "processor_ready": self.processor_ready,
+            "circuit_breaker": self.processor.breaker.stats() if self._processor_initialized else {"state": "unavailable"},
+            "cache": self.processor.cache.stats() if self._processor_initialized else {},
+            "scheduler": self.processor.scheduler.stats() if self._processor_initialized else {},
+            "metrics": self.metrics.snapshot()
         }
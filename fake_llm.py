@@ -0,0 +1,182 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict, PrivateAttr
+
+DEFAULT_RESPONSES = [
+    "What a session! The car felt alive out there and the team nailed the setup. #F1 #Racing",
+    "Thanks for the support! Messages like this keep us pushing every single lap. 🏁",
+    "Respect to the whole grid today, that was proper racing from start to finish. #F1",
+    "Head down, focus on the data, and bring it all together when it matters most.",
+]
+
+class FakeLLMError(Exception):
+    """Injected failure raised by FakeChatModel"""
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic local stand-in for AzureChatOpenAI.
+
+    Simulates time to first token, a steady token rate and a random error rate,
+    and answers with canned outputs. Sentiment prompts get a parseable
+    'Score: X' line and packed sentiment prompts get valid JSON, so every chain
+    in LangChainProcessor works end to end without a network.
+    """
+
+    latency_seconds: float = 0.0
+    tokens_per_second: float = 0.0
+    error_rate: float = 0.0
+    responses: List[str] = DEFAULT_RESPONSES
+    seed: Optional[int] = 42
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    _rng: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+    _calls: int = PrivateAttr(default=0)
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    @classmethod
+    def from_config(cls, config) -> "FakeChatModel":
+        """Build a fake model from the FAKE_LLM_* configuration values"""
+        return cls(
+            latency_seconds=config.FAKE_LLM_LATENCY_SECONDS,
+            tokens_per_second=config.FAKE_LLM_TOKENS_PER_SECOND,
+            error_rate=config.FAKE_LLM_ERROR_RATE
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-f1-chat"
+
+    def _next_call(self) -> tuple:
+        """Pick the canned response index and decide whether this call fails"""
+        with self._lock:
+            call = self._calls
+            self._calls += 1
+            failed = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return call, failed
+
+    def _respond(self, messages: List[BaseMessage], call: int) -> str:
+        """Choose a canned output that the calling chain can parse"""
+        system = " ".join(str(m.content) for m in messages if m.type == "system")
+        human = " ".join(str(m.content) for m in messages if m.type == "human")
+
+        if "JSON array of comments" in system:
+            try:
+                items = json.loads(human)
+            except ValueError:
+                items = []
+            return json.dumps({"results": [
+                {"id": item.get("id"), "score": round(((call + position) % 21 - 10) / 10, 1)}
+                for position, item in enumerate(items) if isinstance(item, dict)
+            ]})
+
+        if "analyzing sentiment" in system:
+            score = ((call % 21) - 10) / 10
+            return f"Score: {score:.1f}, Explanation: canned response"
+
+        return self.responses[call % len(self.responses)]
+
+    @staticmethod
+    def _tokens(text: str) -> List[str]:
+        """Split text into word-ish chunks that roughly mimic model tokens"""
+        return re.findall(r"\s*\S+", text) or [text]
+
+    def _usage(self, messages: List[BaseMessage], text: str) -> Dict[str, int]:
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = len(self._tokens(text))
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        }
+
+    def _result(self, messages: List[BaseMessage], text: str) -> ChatResult:
+        usage = self._usage(messages, text)
+        message = AIMessage(content=text, usage_metadata=usage)
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={"token_usage": {
+                "prompt_tokens": usage["input_tokens"],
+                "completion_tokens": usage["output_tokens"],
+                "total_tokens": usage["total_tokens"]
+            }}
+        )
+
+    def _total_delay(self, text: str) -> float:
+        delay = self.latency_seconds
+        if self.tokens_per_second > 0:
+            delay += len(self._tokens(text)) / self.tokens_per_second
+        return delay
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        call, failed = self._next_call()
+        if failed:
+            time.sleep(self.latency_seconds)
+            raise FakeLLMError("Injected fake LLM failure")
+
+        text = self._respond(messages, call)
+        time.sleep(self._total_delay(text))
+        return self._result(messages, text)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        call, failed = self._next_call()
+        if failed:
+            await asyncio.sleep(self.latency_seconds)
+            raise FakeLLMError("Injected fake LLM failure")
+
+        text = self._respond(messages, call)
+        await asyncio.sleep(self._total_delay(text))
+        return self._result(messages, text)
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        call, failed = self._next_call()
+        time.sleep(self.latency_seconds)
+        if failed:
+            raise FakeLLMError("Injected fake LLM failure")
+
+        text = self._respond(messages, call)
+        for token in self._tokens(text):
+            if self.tokens_per_second > 0:
+                time.sleep(1 / self.tokens_per_second)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages, text)))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        call, failed = self._next_call()
+        await asyncio.sleep(self.latency_seconds)
+        if failed:
+            raise FakeLLMError("Injected fake LLM failure")
+
+        text = self._respond(messages, call)
+        for token in self._tokens(text):
+            if self.tokens_per_second > 0:
+                await asyncio.sleep(1 / self.tokens_per_second)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages, text)))
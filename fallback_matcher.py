@@ -0,0 +1,82 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple
+
+POSITIVE_WORDS = ("amazing", "great", "awesome", "fantastic", "brilliant", "excellent")
+NEGATIVE_WORDS = ("bad", "terrible", "awful", "disappointing", "frustrating")
+QUESTION_WORDS = ("what", "how", "why", "when", "where", "which", "who")
+
+class TextSignals(NamedTuple):
+    """What the fallback paths need to know about a text"""
+    positive: int  # distinct positive words
+    negative: int  # distinct negative words
+    question: bool
+
+    @property
+    def category(self) -> str:
+        """positive, negative, question or neutral, in that order of precedence"""
+        if self.positive:
+            return "positive"
+        if self.negative:
+            return "negative"
+        if self.question:
+            return "question"
+        return "neutral"
+
+    @property
+    def score(self) -> float:
+        """Rough sentiment compound used when no sentiment engine is available"""
+        return (self.positive - self.negative) / 5.0
+
+class FallbackMatcher:
+    """
+    Single-pass positive/negative/question classifier for the fallback paths.
+
+    All word lists compile into one case-insensitive alternation anchored on
+    word boundaries, so "bad" no longer matches inside "badge" and each text is
+    scanned once without being lowercased first. A literal '?' also marks a
+    question.
+    """
+
+    def __init__(self, positive: Iterable[str] = POSITIVE_WORDS, negative: Iterable[str] = NEGATIVE_WORDS,
+                 question: Iterable[str] = QUESTION_WORDS):
+        self._category: Dict[str, str] = {}
+        for category, words in (("question", question), ("negative", negative), ("positive", positive)):
+            for word in words:
+                self._category[word.lower()] = category
+
+        # Longest first so that a word is never shadowed by one of its prefixes
+        alternation = "|".join(re.escape(word) for word in sorted(self._category, key=len, reverse=True))
+        self._pattern = re.compile(rf"\b({alternation})\b|(\?)", re.IGNORECASE)
+
+    def classify(self, text: str) -> TextSignals:
+        positive = set()
+        negative = set()
+        question = False
+        category_of = self._category
+
+        for word, mark in self._pattern.findall(text or ""):
+            if mark:
+                question = True
+                continue
+            word = word.lower()
+            category = category_of[word]
+            if category == "positive":
+                positive.add(word)
+            elif category == "negative":
+                negative.add(word)
+            else:
+                question = True
+
+        return TextSignals(len(positive), len(negative), question)
+
+    def classify_batch(self, texts: Iterable[str]) -> List[TextSignals]:
+        return [self.classify(text) for text in texts]
+
+    def score(self, text: str) -> float:
+        return self.classify(text).score
+
+    def score_batch(self, texts: Iterable[str]) -> List[float]:
+        return [signals.score for signals in self.classify_batch(texts)]
+
+# Compiled once per process and shared by every agent
+default_matcher = FallbackMatcher()
@@ -0,0 +1,169 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from f1_agent_langchain import (
+    F1RacerAgent, LangChainProcessor, RaceResult, RaceStage, SessionType, get_shared_processor
+)
+from metrics import metrics_registry
+from request_scheduler import Priority, prioritized
+
+class GridPost(NamedTuple):
+    """One driver's output from a grid-wide round"""
+    racer_name: str
+    team_name: str
+    text: str
+
+class Grid:
+    """
+    A full grid of driver personas on one shared LLM backend.
+
+    Every driver is an F1RacerAgent built on the same processor, so the grid
+    shares one HTTP connection pool, cache and circuit breaker. Context
+    changes are applied to every driver at once (with optional per-driver
+    results, positions and moods), and grid-wide rounds generate all drivers'
+    output concurrently, at most max_concurrency at a time, yielding each
+    driver's result as soon as it completes.
+    """
+
+    def __init__(self, drivers: Iterable[Tuple[str, str]] = (), processor: Optional[LangChainProcessor] = None,
+                 max_concurrency: Optional[int] = None):
+        try:
+            self.processor = processor or get_shared_processor()
+        except Exception as e:
+            print(f"Warning: LangChain processor failed to initialize: {e}")
+            self.processor = None
+
+        if max_concurrency is None:
+            max_concurrency = self.processor.config.LLM_MAX_CONCURRENCY if self.processor else 1
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+
+        self.drivers: Dict[str, F1RacerAgent] = {}
+        for racer_name, team_name in drivers:
+            self.add_driver(racer_name, team_name)
+
+    def __len__(self) -> int:
+        return len(self.drivers)
+
+    def __iter__(self) -> Iterator[F1RacerAgent]:
+        return iter(list(self.drivers.values()))
+
+    def __getitem__(self, racer_name: str) -> F1RacerAgent:
+        return self.drivers[racer_name]
+
+    def add_driver(self, racer_name: str, team_name: str) -> F1RacerAgent:
+        """Add a driver persona on the grid's shared processor"""
+        if racer_name in self.drivers:
+            raise ValueError(f"Driver already on the grid: {racer_name}")
+        agent = F1RacerAgent(racer_name, team_name, processor=self.processor)
+        self.drivers[racer_name] = agent
+        return agent
+
+    def remove_driver(self, racer_name: str) -> F1RacerAgent:
+        return self.drivers.pop(racer_name)
+
+    def _check_drivers(self, *mappings: Optional[Mapping]):
+        unknown = sorted({name for mapping in mappings if mapping for name in mapping} - set(self.drivers))
+        if unknown:
+            raise ValueError(f"Unknown drivers: {', '.join(unknown)}")
+
+    def update_context(self, stage: RaceStage, session_type: Optional[SessionType] = None,
+                       circuit_name: str = None, race_name: str = None,
+                       results: Optional[Mapping[str, RaceResult]] = None,
+                       positions: Optional[Mapping[str, int]] = None,
+                       moods: Optional[Mapping[str, str]] = None, pregenerate: Optional[bool] = None):
+        """
+        Move every driver to a new context.
+
+        Stage, session, circuit and race are shared; results, positions and
+        moods are keyed by racer name; drivers missing from them get no result,
+        no position and a mood derived from their context.
+        """
+        self._check_drivers(results, positions, moods)
+        results = results or {}
+        positions = positions or {}
+        moods = moods or {}
+
+        for racer_name, agent in self.drivers.items():
+            agent.update_context(
+                stage=stage,
+                session_type=session_type,
+                circuit_name=circuit_name,
+                race_name=race_name,
+                last_result=results.get(racer_name),
+                position=positions.get(racer_name),
+                mood=moods.get(racer_name),
+                pregenerate=pregenerate
+            )
+
+    def _select(self, racer_names: Optional[Iterable[str]]) -> List[F1RacerAgent]:
+        if racer_names is None:
+            return list(self.drivers.values())
+        racer_names = list(racer_names)
+        self._check_drivers(racer_names)
+        return [self.drivers[name] for name in racer_names]
+
+    @staticmethod
+    def _as_batch(call, agent: F1RacerAgent) -> str:
+        """Grid rounds queue behind interactive requests at the rate limiter"""
+        with prioritized(Priority.BATCH):
+            return call(agent)
+
+    def _run_all(self, operation: str, call, agents: List[F1RacerAgent]) -> Iterator[GridPost]:
+        started = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=min(self.max_concurrency, max(len(agents), 1)),
+                                      thread_name_prefix=f"grid-{operation}")
+        try:
+            futures = {executor.submit(self._as_batch, call, agent): agent for agent in agents}
+            for future in as_completed(futures):
+                agent = futures[future]
+                yield GridPost(agent.racer_name, agent.team_name, future.result())
+        finally:
+            # Stop queued drivers if the caller stops consuming early
+            executor.shutdown(wait=False, cancel_futures=True)
+            metrics_registry.record_latency(f"grid.{operation}", time.perf_counter() - started)
+
+    async def _arun_all(self, operation: str, call, agents: List[F1RacerAgent]) -> AsyncIterator[GridPost]:
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(agent: F1RacerAgent) -> GridPost:
+            async with semaphore:
+                with prioritized(Priority.BATCH):
+                    return GridPost(agent.racer_name, agent.team_name, await call(agent))
+
+        tasks = [asyncio.ensure_future(run(agent)) for agent in agents]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            metrics_registry.record_latency(f"grid.{operation}", time.perf_counter() - started)
+
+    def speak_all(self, context_type: str = "general", racer_names: Optional[Iterable[str]] = None,
+                  latency_budget: Optional[float] = None) -> Iterator[GridPost]:
+        """Generate a post for every driver (or racer_names), yielding each as it completes"""
+        agents = self._select(racer_names)
+        return self._run_all("speak", lambda agent: agent.speak(context_type, latency_budget), agents)
+
+    def aspeak_all(self, context_type: str = "general", racer_names: Optional[Iterable[str]] = None,
+                   latency_budget: Optional[float] = None) -> AsyncIterator[GridPost]:
+        """Async variant of speak_all"""
+        agents = self._select(racer_names)
+        return self._arun_all("speak", lambda agent: agent.aspeak(context_type, latency_budget), agents)
+
+    def think_all(self, racer_names: Optional[Iterable[str]] = None,
+                  latency_budget: Optional[float] = None) -> Iterator[GridPost]:
+        """Generate every driver's thoughts, yielding each as it completes"""
+        agents = self._select(racer_names)
+        return self._run_all("think", lambda agent: agent.think(latency_budget), agents)
+
+    def athink_all(self, racer_names: Optional[Iterable[str]] = None,
+                   latency_budget: Optional[float] = None) -> AsyncIterator[GridPost]:
+        """Async variant of think_all"""
+        agents = self._select(racer_names)
+        return self._arun_all("think", lambda agent: agent.athink(latency_budget), agents)
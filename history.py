@@ -0,0 +1,140 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+def spill_path_for(directory: str, owner: str) -> Optional[str]:
+    """Per-owner spill file inside directory, or None when spilling is disabled"""
+    if not directory or not owner:
+        return None
+    return os.path.join(directory, re.sub(r"[^\w.-]", "_", owner) + ".jsonl")
+
+class InteractionRecord:
+    """
+    One history entry.
+
+    Slotted, with the timestamp kept as a float and the small fixed
+    vocabularies (kind, stage, mood) interned, so a full history costs a few
+    hundred bytes per entry on top of the text itself.
+    """
+    __slots__ = ("kind", "input", "output", "timestamp", "stage", "mood")
+
+    def __init__(self, kind: str, input: str = "", output: str = "", timestamp: Optional[float] = None,
+                 stage: Optional[str] = None, mood: Optional[str] = None):
+        self.kind = sys.intern(kind)
+        self.input = input
+        self.output = output
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.stage = sys.intern(stage) if stage else None
+        self.mood = sys.intern(mood) if mood else None
+
+    @property
+    def when(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp)
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "InteractionRecord":
+        return cls(**{name: data.get(name) for name in cls.__slots__ if data.get(name) is not None})
+
+    def to_row(self) -> List:
+        """Compact positional form, in __slots__ order"""
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def from_row(cls, row: List) -> "InteractionRecord":
+        return cls(*row)
+
+    def __repr__(self) -> str:
+        return f"InteractionRecord({self.kind!r}, {self.when:%H:%M:%S})"
+
+class InteractionHistory:
+    """
+    Fixed-size ring buffer of InteractionRecords.
+
+    Holds at most max_entries records, so memory stays flat however long the
+    session runs. With a spill_path, each record pushed out of the buffer is
+    appended to that JSONL file instead of being dropped.
+    """
+
+    def __init__(self, max_entries: int = 50, spill_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.spill_path = spill_path
+        self.spilled = 0
+        self._records: deque = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._spill_file = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[InteractionRecord]:
+        """Oldest to newest"""
+        with self._lock:
+            return iter(list(self._records))
+
+    @property
+    def total(self) -> int:
+        """Records ever added, including those spilled or dropped"""
+        return self.spilled + len(self._records)
+
+    def append(self, record: InteractionRecord) -> InteractionRecord:
+        with self._lock:
+            if len(self._records) == self.max_entries:
+                self._evict(self._records[0])
+            self._records.append(record)
+        return record
+
+    def add(self, kind: str, input: str = "", output: str = "", stage: Optional[str] = None,
+            mood: Optional[str] = None) -> InteractionRecord:
+        """Build and append a record"""
+        return self.append(InteractionRecord(kind, input, output, stage=stage, mood=mood))
+
+    def _evict(self, record: InteractionRecord):
+        """Spill the oldest record before the ring overwrites it (lock held)"""
+        self.spilled += 1
+        if not self.spill_path:
+            return
+
+        try:
+            if self._spill_file is None:
+                directory = os.path.dirname(self.spill_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._spill_file = open(self.spill_path, "a", encoding="utf-8")
+            self._spill_file.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+            self._spill_file.flush()
+        except OSError as e:
+            print(f"History spill error: {e}")
+
+    def recent(self, n: int = 10) -> List[InteractionRecord]:
+        """The newest n records, newest first"""
+        with self._lock:
+            count = min(n, len(self._records))
+            return [self._records[-i] for i in range(1, count + 1)]
+
+    def read_spilled(self) -> Iterator[InteractionRecord]:
+        """Records previously spilled to disk, oldest first"""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        with open(self.spill_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield InteractionRecord.from_dict(json.loads(line))
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def close(self):
+        with self._lock:
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
@@ -0,0 +1,182 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from history import InteractionRecord
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    input TEXT,
+    output TEXT,
+    stage TEXT,
+    mood TEXT,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS interactions_user_time ON interactions (username, timestamp);
+CREATE INDEX IF NOT EXISTS interactions_user_kind_time ON interactions (username, kind, timestamp);
+"""
+
+class InteractionStore:
+    """
+    Persistent per-user interaction history in SQLite (WAL mode).
+
+    record() only enqueues, so callers on the generation path never wait on
+    disk. A background writer commits queued records in batches of up to
+    batch_size, or every flush_interval seconds. Reads use their own
+    connection; with WAL they never block the writer. Results are paginated
+    newest first, optionally filtered by kind and time range.
+    """
+
+    def __init__(self, path: str, batch_size: int = 64, flush_interval: float = 0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._read_conn = self._connect()
+        self._read_conn.executescript(_SCHEMA)
+        self._read_lock = threading.Lock()
+
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="interaction-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, username: str, record: InteractionRecord):
+        """Queue one record for username; returns immediately"""
+        self._queue.put((username, record))
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = []
+            waiters = []
+            stop = False
+            deadline = None
+
+            while len(batch) < self.batch_size:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch:
+                self._write_batch(conn, batch)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                conn.close()
+                return
+
+    @staticmethod
+    def _write_batch(conn: sqlite3.Connection, batch: List[Tuple[str, InteractionRecord]]):
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO interactions (username, kind, input, output, stage, mood, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (username, r.kind, r.input, r.output, r.stage, r.mood, r.timestamp)
+                        for username, r in batch
+                    ]
+                )
+        except sqlite3.Error as e:
+            print(f"Interaction store write error: {e}")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far is committed"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _where(self, username: str, kind: Optional[str], since: Optional[float],
+               until: Optional[float]) -> Tuple[str, list]:
+        clauses = ["username = ?"]
+        params = [username]
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        return " AND ".join(clauses), params
+
+    def page(self, username: str, page: int = 0, page_size: int = 10, kind: Optional[str] = None,
+             since: Optional[float] = None, until: Optional[float] = None) -> List[InteractionRecord]:
+        """One page of a user's history, newest first"""
+        where, params = self._where(username, kind, since, until)
+        with self._read_lock:
+            rows = self._read_conn.execute(
+                f"SELECT kind, input, output, timestamp, stage, mood FROM interactions WHERE {where} "
+                "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                params + [page_size, page * page_size]
+            ).fetchall()
+        return [InteractionRecord(*row) for row in rows]
+
+    def count(self, username: str, kind: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None) -> int:
+        where, params = self._where(username, kind, since, until)
+        with self._read_lock:
+            return self._read_conn.execute(f"SELECT COUNT(*) FROM interactions WHERE {where}", params).fetchone()[0]
+
+    def kinds(self, username: str) -> List[str]:
+        """Interaction kinds this user has history for"""
+        with self._read_lock:
+            rows = self._read_conn.execute(
+                "SELECT DISTINCT kind FROM interactions WHERE username = ? ORDER BY kind", (username,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        """Flush pending writes and stop the writer"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+        with self._read_lock:
+            self._read_conn.close()
+
+# One store (and writer thread) per database file in this process
+_stores: Dict[str, InteractionStore] = {}
+_stores_lock = threading.Lock()
+
+def get_interaction_store(path: str) -> Optional[InteractionStore]:
+    """Shared store for path, or None when path is empty (persistence disabled)"""
+    if not path:
+        return None
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = InteractionStore(path)
+        return store
@@ -0,0 +1,202 @@
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+STOP_WORDS = frozenset({
+    "the", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "a", "an",
+    "this", "that", "these", "those", "from", "have", "has", "had", "were", "was", "been",
+    "what", "when", "where", "which", "will", "would", "could", "should", "your", "yours",
+    "they", "them", "their", "there", "here", "then", "than", "just", "also", "very", "much",
+    "into", "over", "about", "some", "more", "most", "only", "every", "each", "such",
+})
+
+# One pass finds both hashtags (group 1) and plain words of four or more characters (group 2)
+_TERM_PATTERN = re.compile(r"#(\w+)|\b(\w{4,})\b")
+
+class KeywordExtractor:
+    """Precompiled keyword and hashtag extraction for single texts, batches and streams"""
+
+    def __init__(self, stop_words: frozenset = STOP_WORDS):
+        self.stop_words = stop_words
+
+    def extract(self, text: str) -> Tuple[List[str], List[str]]:
+        """Return (keywords, hashtags) in order of appearance, lowercased, with repeats"""
+        keywords = []
+        hashtags = []
+        stop_words = self.stop_words
+        for hashtag, word in _TERM_PATTERN.findall((text or "").lower()):
+            if hashtag:
+                hashtags.append(hashtag)
+            elif word not in stop_words:
+                keywords.append(word)
+        return keywords, hashtags
+
+    def extract_stream(self, texts: Iterable[str]) -> Iterator[Tuple[List[str], List[str]]]:
+        """Lazily extract from an iterable of texts, one result per text"""
+        for text in texts:
+            yield self.extract(text)
+
+    def extract_batch(self, texts: Iterable[str]) -> List[Tuple[List[str], List[str]]]:
+        """Extract from many texts at once"""
+        return list(self.extract_stream(texts))
+
+class _Bucket:
+    """All terms seen exactly `count` times, in a doubly linked list ordered by count"""
+    __slots__ = ("count", "terms", "prev", "next")
+
+    def __init__(self, count: int):
+        self.count = count
+        self.terms: Dict[str, None] = {}
+        self.prev: Optional["_Bucket"] = None
+        self.next: Optional["_Bucket"] = None
+
+class FrequencyIndex:
+    """
+    Term counts kept in LFU-style frequency buckets.
+
+    Each increment moves a term into the bucket for its new count, creating it
+    when needed and unlinking buckets that empty out. Buckets are linked from
+    lowest to highest count, so top(k) reads from the highest bucket down and
+    costs O(k) however many distinct terms have been indexed. Within a bucket
+    the most recently bumped term ranks first.
+    """
+
+    def __init__(self):
+        self._head = _Bucket(0)  # sentinel below the lowest bucket
+        self._tail = self._head
+        self._bucket_of: Dict[str, _Bucket] = {}
+
+    def __len__(self) -> int:
+        return len(self._bucket_of)
+
+    def count(self, term: str) -> int:
+        bucket = self._bucket_of.get(term)
+        return bucket.count if bucket else 0
+
+    def add(self, term: str, amount: int = 1):
+        if amount <= 0:
+            return
+        current = self._bucket_of.get(term, self._head)
+        target = current.count + amount
+
+        # Walk up to the bucket that should precede the target count
+        before = current
+        while before.next is not None and before.next.count <= target:
+            before = before.next
+
+        if before.count == target:
+            bucket = before
+        else:
+            bucket = _Bucket(target)
+            bucket.prev = before
+            bucket.next = before.next
+            if before.next is not None:
+                before.next.prev = bucket
+            else:
+                self._tail = bucket
+            before.next = bucket
+
+        bucket.terms[term] = None
+        self._bucket_of[term] = bucket
+
+        if current is not self._head:
+            del current.terms[term]
+            if not current.terms:
+                self._unlink(current)
+
+    def _unlink(self, bucket: _Bucket):
+        bucket.prev.next = bucket.next
+        if bucket.next is not None:
+            bucket.next.prev = bucket.prev
+        else:
+            self._tail = bucket.prev
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """The k most frequent terms with their counts"""
+        result = []
+        bucket = self._tail
+        while bucket is not self._head and len(result) < k:
+            for term in reversed(bucket.terms):
+                result.append((term, bucket.count))
+                if len(result) == k:
+                    break
+            bucket = bucket.prev
+        return result
+
+class KeywordIndex:
+    """
+    Incremental keyword and hashtag frequencies per stage and circuit.
+
+    Every text is counted into four scopes: overall, its stage, its circuit,
+    and the stage/circuit pair. Any combination of filters is then answered
+    by a single FrequencyIndex lookup without rescanning history.
+    """
+
+    def __init__(self, extractor: Optional[KeywordExtractor] = None):
+        self.extractor = extractor or default_extractor
+        self._lock = threading.Lock()
+        self._keywords: Dict[Tuple, FrequencyIndex] = {}
+        self._hashtags: Dict[Tuple, FrequencyIndex] = {}
+        self.documents = 0
+
+    @staticmethod
+    def _scopes(stage: Optional[str], circuit: Optional[str]) -> List[Tuple]:
+        circuit = circuit.strip().lower() if circuit else None
+        scopes = [(None, None)]
+        if stage:
+            scopes.append((stage, None))
+        if circuit:
+            scopes.append((None, circuit))
+        if stage and circuit:
+            scopes.append((stage, circuit))
+        return scopes
+
+    def add(self, text: str, stage: Optional[str] = None, circuit: Optional[str] = None):
+        """Index one text under its stage and circuit"""
+        self.add_many([text], stage, circuit)
+
+    def add_many(self, texts: Iterable[str], stage: Optional[str] = None, circuit: Optional[str] = None):
+        """Index a batch (or stream) of texts sharing a stage and circuit"""
+        keyword_counts = Counter()
+        hashtag_counts = Counter()
+        documents = 0
+        for keywords, hashtags in self.extractor.extract_stream(texts):
+            keyword_counts.update(keywords)
+            hashtag_counts.update(hashtags)
+            documents += 1
+
+        scopes = self._scopes(stage, circuit)
+        with self._lock:
+            self.documents += documents
+            for scope in scopes:
+                self._update(self._keywords, scope, keyword_counts)
+                self._update(self._hashtags, scope, hashtag_counts)
+
+    @staticmethod
+    def _update(indexes: Dict[Tuple, FrequencyIndex], scope: Tuple, counts: Counter):
+        index = indexes.get(scope)
+        if index is None:
+            index = indexes[scope] = FrequencyIndex()
+        for term, amount in counts.items():
+            index.add(term, amount)
+
+    def _top(self, indexes: Dict[Tuple, FrequencyIndex], k: int,
+             stage: Optional[str], circuit: Optional[str]) -> List[Tuple[str, int]]:
+        scope = (stage or None, circuit.strip().lower() if circuit else None)
+        with self._lock:
+            index = indexes.get(scope)
+            return index.top(k) if index else []
+
+    def top_keywords(self, k: int = 10, stage: Optional[str] = None,
+                     circuit: Optional[str] = None) -> List[Tuple[str, int]]:
+        """Most frequent keywords, optionally for one stage and/or circuit"""
+        return self._top(self._keywords, k, stage, circuit)
+
+    def top_hashtags(self, k: int = 10, stage: Optional[str] = None,
+                     circuit: Optional[str] = None) -> List[Tuple[str, int]]:
+        """Most frequent hashtags, optionally for one stage and/or circuit"""
+        return self._top(self._hashtags, k, stage, circuit)
+
+# Shared extractor; it holds no per-text state
+default_extractor = KeywordExtractor()
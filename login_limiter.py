@@ -0,0 +1,235 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional, Tuple
+
+class WindowState(NamedTuple):
+    """Attempt counts for one identifier: the current fixed window and the one before it"""
+    start: float
+    current: int
+    previous: int
+
+Change = Callable[[Optional[WindowState]], Optional[WindowState]]
+
+class MemoryLimiterBackend:
+    """
+    Per-process window states in an LRU of at most max_identifiers entries.
+
+    Each update moves its identifier to the end, so the front is always the
+    least recently touched; idle entries are popped from there, so eviction
+    is amortized O(1) per update.
+    """
+
+    def __init__(self, max_identifiers: int = 10000):
+        self.max_identifiers = max_identifiers
+        self._states: "OrderedDict[str, Tuple[WindowState, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, identifier: str, now: float, idle_before: float, change: Change) -> Optional[WindowState]:
+        """Apply change to identifier's state atomically; returns the new state"""
+        with self._lock:
+            entry = self._states.pop(identifier, None)
+            state = change(entry[0] if entry else None)
+            if state is not None:
+                self._states[identifier] = (state, now)
+
+            while self._states:
+                _, touched = next(iter(self._states.values()))
+                if touched >= idle_before and len(self._states) <= self.max_identifiers:
+                    break
+                self._states.popitem(last=False)
+            return state
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS login_attempts (
+    identifier TEXT PRIMARY KEY,
+    window_start REAL NOT NULL,
+    current INTEGER NOT NULL,
+    previous INTEGER NOT NULL,
+    touched REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS login_attempts_touched ON login_attempts (touched);
+"""
+
+class SQLiteLimiterBackend:
+    """
+    Window states in a SQLite file, shared by every worker process on the host.
+
+    Each update is one IMMEDIATE transaction: a primary-key read and write,
+    plus deleting a bounded batch of idle rows through the touched index.
+    Every EVICT_BATCH updates, rows beyond max_identifiers are dropped, least
+    recently touched first.
+    """
+
+    EVICT_BATCH = 64
+
+    def __init__(self, path: str, max_identifiers: int = 10000):
+        self.path = path
+        self.max_identifiers = max_identifiers
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._updates = 0
+
+    def update(self, identifier: str, now: float, idle_before: float, change: Change) -> Optional[WindowState]:
+        """Apply change to identifier's state atomically across processes; returns the new state"""
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT window_start, current, previous FROM login_attempts WHERE identifier = ?",
+                    (identifier,)
+                ).fetchone()
+                state = change(WindowState(*row) if row else None)
+                if state is not None:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO login_attempts (identifier, window_start, current, previous, touched) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (identifier, state.start, state.current, state.previous, now)
+                    )
+                elif row is not None:
+                    conn.execute("DELETE FROM login_attempts WHERE identifier = ?", (identifier,))
+
+                conn.execute(
+                    "DELETE FROM login_attempts WHERE identifier IN "
+                    "(SELECT identifier FROM login_attempts WHERE touched < ? LIMIT ?)",
+                    (idle_before, self.EVICT_BATCH)
+                )
+                self._updates += 1
+                if self._updates % self.EVICT_BATCH == 0:
+                    conn.execute(
+                        "DELETE FROM login_attempts WHERE identifier IN "
+                        "(SELECT identifier FROM login_attempts ORDER BY touched DESC LIMIT -1 OFFSET ?)",
+                        (self.max_identifiers,)
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return state
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM login_attempts").fetchone()[0]
+
+class RateLimiter:
+    """
+    Sliding-window counter for login attempts.
+
+    Each identifier keeps two counters: attempts in the current fixed window
+    and in the previous one. The attempts in the last window_seconds are
+    estimated as current + previous * (the share of the previous window still
+    inside the sliding window), so every check is O(1) in time and memory.
+    Identifiers idle for two windows carry no weight and are evicted. With a
+    SQLite backend all worker processes on the host enforce one limit.
+    """
+
+    def __init__(self, max_attempts: int = 5, window_minutes: float = 15, backend=None):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_minutes * 60
+        self.backend = backend if backend is not None else MemoryLimiterBackend()
+
+    def _roll(self, state: Optional[WindowState], now: float) -> WindowState:
+        """State advanced to the window containing now"""
+        start = now - now % self.window_seconds
+        if state is None or state.start <= start - 2 * self.window_seconds:
+            return WindowState(start, 0, 0)
+        if state.start < start:
+            return WindowState(start, 0, state.current)
+        return state
+
+    def _estimate(self, state: WindowState, now: float) -> float:
+        overlap = 1.0 - (now - state.start) / self.window_seconds
+        return state.current + state.previous * overlap
+
+    def _wait_time(self, state: WindowState, now: float) -> int:
+        """Seconds until the estimate drops below max_attempts"""
+        elapsed = now - state.start
+        if state.current >= self.max_attempts:
+            # Wait for the next window, then for this window's count to slide out far enough
+            wait = (self.window_seconds - elapsed) + self.window_seconds * (1 - self.max_attempts / state.current)
+        else:
+            wait = self.window_seconds * (1 - (self.max_attempts - state.current) / state.previous) - elapsed
+        # The estimate must drop strictly below the limit, so round past the boundary
+        return max(1, math.floor(wait) + 1)
+
+    def _update(self, identifier: str, now: float, change: Change) -> Optional[WindowState]:
+        return self.backend.update(identifier, now, now - 2 * self.window_seconds, change)
+
+    def check(self, identifier: str, record: bool = False) -> Tuple[bool, int]:
+        """
+        (allowed, seconds to wait) for identifier, in one atomic step.
+
+        With record=True an allowed attempt is also counted, so concurrent
+        workers cannot both take the last attempt.
+        """
+        now = time.time()
+        allowed = True
+
+        def change(state: Optional[WindowState]) -> Optional[WindowState]:
+            nonlocal allowed
+            state = self._roll(state, now)
+            allowed = self._estimate(state, now) < self.max_attempts
+            if allowed and record:
+                state = state._replace(current=state.current + 1)
+            if state.current == 0 and state.previous == 0:
+                return None
+            return state
+
+        state = self._update(identifier, now, change)
+        return allowed, 0 if allowed else self._wait_time(state, now)
+
+    def release_attempt(self, identifier: str):
+        """Take back one attempt counted by check(record=True), e.g. once the login succeeded"""
+        now = time.time()
+
+        def change(state: Optional[WindowState]) -> Optional[WindowState]:
+            state = self._roll(state, now)
+            if state.current > 0:
+                state = state._replace(current=state.current - 1)
+            if state.current == 0 and state.previous == 0:
+                return None
+            return state
+
+        self._update(identifier, now, change)
+
+    def is_allowed(self, identifier: str) -> bool:
+        """Check if login attempt is allowed"""
+        return self.check(identifier)[0]
+
+    def record_attempt(self, identifier: str):
+        """Record a login attempt"""
+        now = time.time()
+
+        def change(state: Optional[WindowState]) -> WindowState:
+            state = self._roll(state, now)
+            return state._replace(current=state.current + 1)
+
+        self._update(identifier, now, change)
+
+    def get_wait_time(self, identifier: str) -> int:
+        """Get wait time before next attempt allowed"""
+        return self.check(identifier)[1]
+
+def create_rate_limiter(max_attempts: int, window_minutes: float, path: str = "",
+                        max_identifiers: int = 10000) -> RateLimiter:
+    """In-process limiter, or one shared through the SQLite file at path"""
+    if path:
+        backend = SQLiteLimiterBackend(path, max_identifiers)
+    else:
+        backend = MemoryLimiterBackend(max_identifiers)
+    return RateLimiter(max_attempts, window_minutes, backend)
@@ -0,0 +1,141 @@
+import asyncio
+import bisect
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Latency bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+CHAIN_TAG_PREFIX = "chain:"
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with count/sum/min/max"""
+
+    def __init__(self, buckets: List[float] = None):
+        self.buckets = buckets or LATENCY_BUCKETS_MS
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def observe(self, milliseconds: float):
+        self.counts[bisect.bisect_left(self.buckets, milliseconds)] += 1
+        self.count += 1
+        self.total_ms += milliseconds
+        self.min_ms = milliseconds if self.min_ms is None else min(self.min_ms, milliseconds)
+        self.max_ms = milliseconds if self.max_ms is None else max(self.max_ms, milliseconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of observations"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return float(self.buckets[i]) if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "min_ms": self.min_ms or 0.0,
+            "max_ms": self.max_ms or 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["+inf"], self.counts))
+        }
+
+def is_timeout(error: BaseException) -> bool:
+    """Whether an exception from an LLM call was a timeout"""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+        return True
+    return "timeout" in type(error).__name__.lower() or "timed out" in str(error).lower()
+
+class MetricsRegistry:
+    """
+    Process-wide metrics for chain invocations and agent operations.
+
+    Latencies are kept as histograms keyed by name ("chain.reply", "op.speak"),
+    plus counters for tokens, fallbacks (by reason), cache hits, errors and
+    timeouts, and gauges for current values such as queue depth.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self._latency: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+            self._tokens: Dict[str, Dict[str, int]] = defaultdict(lambda: {"prompt": 0, "completion": 0})
+            self._fallbacks: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+            self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+            self._gauges: Dict[str, Dict[str, float]] = defaultdict(dict)
+
+    def record_latency(self, name: str, seconds: float):
+        with self._lock:
+            self._latency[name].observe(seconds * 1000)
+
+    def record_tokens(self, chain_name: str, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            tokens = self._tokens[chain_name]
+            tokens["prompt"] += prompt_tokens
+            tokens["completion"] += completion_tokens
+
+    def record_fallback(self, operation: str, reason: str):
+        with self._lock:
+            self._fallbacks[operation][reason] += 1
+
+    def increment(self, counter: str, key: str, amount: int = 1):
+        """Bump a named counter (e.g. 'cache_hits', 'timeouts') for a chain or operation"""
+        with self._lock:
+            self._counters[counter][key] += amount
+
+    def set_gauge(self, gauge: str, key: str, value: float):
+        """Set a named gauge (e.g. 'queue_depth') to its current value"""
+        with self._lock:
+            self._gauges[gauge][key] = value
+
+    def record_error(self, chain_name: str, error: BaseException):
+        """Count a failed chain call, separating timeouts from other errors"""
+        self.increment("timeouts" if is_timeout(error) else "errors", chain_name)
+
+    def snapshot(self) -> Dict:
+        """Plain-dict view of every metric"""
+        with self._lock:
+            return {
+                "since": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+                "latency": {name: hist.to_dict() for name, hist in sorted(self._latency.items())},
+                "tokens": {name: dict(tokens) for name, tokens in sorted(self._tokens.items())},
+                "fallbacks": {op: dict(reasons) for op, reasons in sorted(self._fallbacks.items())},
+                "counters": {name: dict(values) for name, values in sorted(self._counters.items())},
+                "gauges": {name: dict(values) for name, values in sorted(self._gauges.items())}
+            }
+
+    def export(self, path: str, extra: Optional[Dict] = None) -> str:
+        """Append the current snapshot as one JSON line to a local metrics file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        record = {"exported_at": datetime.now().isoformat(timespec="seconds"), **self.snapshot()}
+        if extra:
+            record.update(extra)
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+        return path
+
+# Shared registry for the whole process
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,265 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+class Priority(IntEnum):
+    """Queue order for LLM requests; lower values are admitted first"""
+    INTERACTIVE = 0
+    BATCH = 1
+    BACKGROUND = 2
+
+class RateLimitTimeout(Exception):
+    """A request waited longer than the queue timeout for rate-limit capacity"""
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar("llm_request_priority", default=Priority.INTERACTIVE)
+
+def current_priority() -> Priority:
+    """Priority for LLM requests made from the current thread or task"""
+    return _current_priority.get()
+
+@contextmanager
+def prioritized(priority: Priority) -> Iterator[None]:
+    """Run the enclosed LLM requests at the given priority"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+def estimate_prompt_tokens(messages: Iterable) -> int:
+    """About four characters per token, plus a few tokens of framing per message"""
+    return sum(len(str(getattr(message, "content", message))) // 4 + 4 for message in messages)
+
+class TokenBucket:
+    """Refills at per_minute / 60 per second, holding at most burst_seconds of refill"""
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (amount is capped at capacity)"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+    def available(self, now: float) -> float:
+        self._refill(now)
+        return self.level
+
+    def drain(self):
+        self.level = min(self.level, 0.0)
+
+class RequestScheduler:
+    """
+    Admission control in front of every LLM call, sized to the deployment quota.
+
+    Requests per minute and tokens per minute are each a token bucket. A
+    request costs one request plus its estimated prompt tokens and the full
+    completion allowance, which is how Azure OpenAI counts a request against
+    its TPM quota. Buckets hold about ten seconds of refill, matching the short
+    windows the quota is enforced over, so bursts are smoothed instead of
+    answered with 429s.
+
+    Requests that cannot be admitted yet wait in a priority queue: interactive
+    before batch before background, first come first served within a
+    priority, and only the head of the queue may take capacity. A request
+    that waits longer than queue_timeout raises RateLimitTimeout. A 429 from
+    the backend pauses admission for its Retry-After time. Queue depth per
+    priority is published as gauges, and wait time as "queue.<priority>"
+    latencies. With both limits at 0 every request is admitted immediately.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0,
+                 max_completion_tokens: int = 500, queue_timeout: float = 30.0, metrics=None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_completion_tokens = max_completion_tokens
+        self.queue_timeout = queue_timeout
+        self.metrics = metrics
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._queue: List[Tuple[int, int]] = []
+        self._abandoned = set()
+        self._async_waiters: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+        self._sequence = itertools.count()
+        self._depth = {priority: 0 for priority in Priority}
+        self._paused_until = 0.0
+        self._admitted = 0
+        self._timed_out = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests is not None or self.tokens is not None
+
+    def cost(self, prompt_tokens: int) -> int:
+        return prompt_tokens + self.max_completion_tokens
+
+    def acquire(self, prompt_tokens: int, priority: Priority = Priority.INTERACTIVE,
+                timeout: Optional[float] = None) -> float:
+        """Block until the request may be sent; returns the seconds spent waiting"""
+        if not self.enabled:
+            return 0.0
+
+        cost = self.cost(prompt_tokens)
+        started = time.monotonic()
+        deadline = started + (self.queue_timeout if timeout is None else timeout)
+        with self._lock:
+            ticket = self._enqueue(priority)
+            while True:
+                now = time.monotonic()
+                delay = self._try_admit(ticket, cost, now)
+                if delay == 0.0:
+                    break
+                if now >= deadline:
+                    self._give_up(ticket)
+                    raise RateLimitTimeout(f"LLM request queued for more than {now - started:.1f}s")
+                # Non-head tickets have no delay of their own; they wake when the queue moves
+                self._changed.wait(min(delay, deadline - now) if delay > 0 else deadline - now)
+
+        return self._admitted_after(priority, started)
+
+    async def aacquire(self, prompt_tokens: int, priority: Priority = Priority.INTERACTIVE,
+                       timeout: Optional[float] = None) -> float:
+        """Async variant of acquire; waiting does not block the event loop"""
+        if not self.enabled:
+            return 0.0
+
+        cost = self.cost(prompt_tokens)
+        started = time.monotonic()
+        deadline = started + (self.queue_timeout if timeout is None else timeout)
+        woken = asyncio.Event()
+        with self._lock:
+            ticket = self._enqueue(priority)
+            self._async_waiters[ticket[1]] = (asyncio.get_running_loop(), woken)
+
+        try:
+            while True:
+                with self._lock:
+                    woken.clear()
+                    now = time.monotonic()
+                    delay = self._try_admit(ticket, cost, now)
+                    if delay == 0.0:
+                        break
+                    if now >= deadline:
+                        self._give_up(ticket)
+                        raise RateLimitTimeout(f"LLM request queued for more than {now - started:.1f}s")
+                try:
+                    await asyncio.wait_for(woken.wait(), min(delay, deadline - now) if delay > 0 else deadline - now)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            with self._lock:
+                self._give_up(ticket, timed_out=False)
+            raise
+        finally:
+            with self._lock:
+                self._async_waiters.pop(ticket[1], None)
+
+        return self._admitted_after(priority, started)
+
+    def _enqueue(self, priority: Priority) -> Tuple[int, int]:
+        """Join the queue (lock held)"""
+        ticket = (int(priority), next(self._sequence))
+        heapq.heappush(self._queue, ticket)
+        self._depth[priority] += 1
+        self._publish_depth(priority)
+        return ticket
+
+    def _try_admit(self, ticket: Tuple[int, int], cost: int, now: float) -> float:
+        """
+        Admit ticket if it heads the queue and capacity allows (lock held).
+
+        Returns 0.0 once admitted, the seconds until capacity frees up for the
+        head, or -1.0 for a ticket that is not at the head.
+        """
+        while self._queue and self._queue[0] in self._abandoned:
+            self._abandoned.discard(heapq.heappop(self._queue))
+        if self._queue[0] != ticket:
+            return -1.0
+
+        delay = self._paused_until - now
+        if self.requests is not None:
+            delay = max(delay, self.requests.delay(1, now))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.delay(cost, now))
+        if delay > 0:
+            return delay
+
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(cost)
+        heapq.heappop(self._queue)
+        self._leave(ticket)
+        self._admitted += 1
+        return 0.0
+
+    def _give_up(self, ticket: Tuple[int, int], timed_out: bool = True):
+        """Drop a waiting ticket from the queue (lock held)"""
+        self._abandoned.add(ticket)
+        self._leave(ticket)
+        if timed_out:
+            self._timed_out += 1
+            if self.metrics:
+                self.metrics.increment("rate_limited", Priority(ticket[0]).name.lower())
+
+    def _leave(self, ticket: Tuple[int, int]):
+        """Account for a ticket leaving the queue and wake the rest (lock held)"""
+        priority = Priority(ticket[0])
+        self._depth[priority] -= 1
+        self._publish_depth(priority)
+        self._wake()
+
+    def _wake(self):
+        """Let every waiter re-check whether it now heads the queue (lock held)"""
+        self._changed.notify_all()
+        for loop, event in self._async_waiters.values():
+            loop.call_soon_threadsafe(event.set)
+
+    def _publish_depth(self, priority: Priority):
+        if self.metrics:
+            self.metrics.set_gauge("queue_depth", priority.name.lower(), self._depth[priority])
+
+    def _admitted_after(self, priority: Priority, started: float) -> float:
+        waited = time.monotonic() - started
+        if self.metrics:
+            self.metrics.record_latency(f"queue.{priority.name.lower()}", waited)
+        return waited
+
+    def pause(self, seconds: float):
+        """Stop admitting requests for a while, e.g. after the backend answered 429"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            if self.requests is not None:
+                self.requests.drain()
+            self._wake()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "enabled": self.enabled,
+                "queued": {priority.name.lower(): depth for priority, depth in self._depth.items()},
+                "admitted": self._admitted,
+                "timed_out": self._timed_out,
+                "paused_for": max(0.0, self._paused_until - now),
+                "requests_available": None if self.requests is None else self.requests.available(now),
+                "tokens_available": None if self.tokens is None else self.tokens.available(now)
+            }
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Caching rules for a single chain"""
+    enabled: bool = True
+    ttl_seconds: float = 3600.0
+    persist: bool = False
+
+class ResponseCache:
+    """
+    Two-tier cache for chain responses.
+
+    The memory tier is an LRU bounded by max_entries where every entry also
+    expires after its chain's TTL. The optional disk tier is a SQLite file that
+    survives restarts; only chains whose policy sets persist=True are written
+    to it. Disk hits are promoted back into memory.
+
+    derived_variables maps a variable to the variable that fully determines it
+    (e.g. a rendered system prompt to its context version). When both are
+    present only the shorter identifier goes into the key.
+    """
+
+    def __init__(self, policies: Dict[str, CachePolicy], max_entries: int = 1024,
+                 disk_path: Optional[str] = None, derived_variables: Optional[Dict[str, str]] = None):
+        self.policies = policies
+        self.max_entries = max_entries
+        self.derived_variables = derived_variables or {}
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {name: {"hits": 0, "disk_hits": 0, "misses": 0} for name in policies}
+        self._disk = self._open_disk(disk_path) if disk_path else None
+
+    def _open_disk(self, disk_path: str) -> sqlite3.Connection:
+        """Open (and prune) the on-disk tier"""
+        directory = os.path.dirname(disk_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(disk_path, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, chain TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def _normalize(value):
+        """Normalize a prompt variable so trivially different inputs share a key"""
+        if isinstance(value, str):
+            return " ".join(value.split()).lower()
+        if value is None:
+            return ""
+        return str(value)
+
+    def make_key(self, chain_name: str, variables: Dict) -> str:
+        """Build a stable key from the chain name and its normalized inputs"""
+        derived = self.derived_variables
+        normalized = sorted(
+            (name, self._normalize(value)) for name, value in variables.items()
+            if not (name in derived and derived[name] in variables)
+        )
+        payload = json.dumps([chain_name, normalized], ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _policy(self, chain_name: str) -> CachePolicy:
+        return self.policies.get(chain_name, CachePolicy(enabled=False))
+
+    def _count(self, chain_name: str, field: str):
+        self._stats.setdefault(chain_name, {"hits": 0, "disk_hits": 0, "misses": 0})[field] += 1
+
+    def get(self, chain_name: str, variables: Dict) -> Optional[str]:
+        """Return a cached response, or None on a miss"""
+        policy = self._policy(chain_name)
+        if not policy.enabled:
+            return None
+
+        key = self.make_key(chain_name, variables)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._count(chain_name, "hits")
+                    return value
+                del self._memory[key]
+
+            if self._disk is not None and policy.persist:
+                row = self._disk.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    self._store_memory(key, row[0], row[1])
+                    self._count(chain_name, "disk_hits")
+                    return row[0]
+
+            self._count(chain_name, "misses")
+            return None
+
+    def set(self, chain_name: str, variables: Dict, value: str):
+        """Store a response according to the chain's policy"""
+        policy = self._policy(chain_name)
+        if not policy.enabled or not value or not value.strip():
+            return
+
+        key = self.make_key(chain_name, variables)
+        expires_at = time.time() + policy.ttl_seconds
+
+        with self._lock:
+            self._store_memory(key, value, expires_at)
+
+            if self._disk is not None and policy.persist:
+                try:
+                    self._disk.execute(
+                        "INSERT OR REPLACE INTO responses (key, chain, value, expires_at) VALUES (?, ?, ?, ?)",
+                        (key, chain_name, value, expires_at)
+                    )
+                    self._disk.commit()
+                except sqlite3.Error as e:
+                    print(f"Response cache disk write error: {e}")
+
+    def _store_memory(self, key: str, value: str, expires_at: float):
+        """Insert into the LRU tier, evicting the least recently used entry when full"""
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached response from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM responses")
+                self._disk.commit()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters per chain plus tier sizes"""
+        with self._lock:
+            per_chain = {name: dict(counts) for name, counts in self._stats.items()}
+            hits = sum(c["hits"] + c["disk_hits"] for c in per_chain.values())
+            lookups = hits + sum(c["misses"] for c in per_chain.values())
+            return {
+                "chains": per_chain,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_enabled": self._disk is not None
+            }
@@ -0,0 +1,183 @@
+import re
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Word valences on a -4..4 scale, tuned for motorsport fan chatter
+LEXICON = {
+    # Positive
+    "amazing": 2.8, "awesome": 3.1, "brilliant": 2.8, "excellent": 2.7, "fantastic": 2.6,
+    "great": 3.1, "good": 1.9, "nice": 1.8, "love": 3.2, "loved": 2.9, "loving": 2.9,
+    "best": 3.2, "incredible": 2.9, "outstanding": 3.0, "superb": 3.1, "perfect": 2.7,
+    "happy": 2.7, "proud": 2.1, "congrats": 2.4, "congratulations": 2.9, "thanks": 1.9,
+    "thank": 1.5, "win": 2.8, "winner": 2.8, "winning": 2.4, "won": 2.7, "victory": 2.9,
+    "champion": 2.9, "championship": 1.2, "podium": 2.2, "pole": 1.6, "fastest": 1.8,
+    "flying": 1.6, "quick": 1.0, "fast": 1.2, "strong": 2.3, "stronger": 1.9, "solid": 1.6,
+    "believe": 1.2, "support": 1.7, "supporting": 1.6, "inspiring": 2.4, "legend": 2.6,
+    "beautiful": 2.9, "epic": 2.5, "fun": 2.3, "exciting": 2.2, "excited": 2.0,
+    "confident": 2.2, "hope": 1.9, "hopefully": 1.7, "respect": 2.1, "clean": 1.2,
+    "overtake": 1.1, "mega": 1.8, "mighty": 1.6, "wow": 2.8, "yes": 1.7, "glad": 2.0,
+    "impressive": 2.5, "masterclass": 2.9, "genius": 2.4, "class": 1.5, "positive": 2.3,
+    "progress": 1.5, "improving": 1.7, "improved": 1.9, "well": 1.1, "deserved": 1.9,
+    "keep": 0.4, "pushing": 0.6, "buzzing": 2.4, "ecstatic": 3.2, "stunning": 2.8,
+    # Negative
+    "bad": -2.5, "terrible": -2.9, "awful": -3.1, "horrible": -3.0, "worst": -3.1,
+    "disappointing": -2.2, "disappointed": -2.1, "disappointment": -2.3, "frustrating": -2.1,
+    "frustrated": -2.0, "sad": -2.1, "angry": -2.3, "hate": -2.7, "hated": -3.2,
+    "poor": -2.1, "slow": -1.5, "slower": -1.3, "crash": -2.2, "crashed": -2.2,
+    "dnf": -2.0, "retired": -1.0, "retirement": -0.8, "mechanical": -0.6, "failure": -2.3,
+    "fail": -2.5, "failed": -2.3, "mistake": -1.8, "mistakes": -1.8, "error": -1.7,
+    "penalty": -1.4, "tough": -0.9, "unlucky": -1.7, "luck": 0.6, "shame": -2.2,
+    "pathetic": -2.9, "useless": -2.5, "rubbish": -2.5, "joke": -0.9, "ridiculous": -2.1,
+    "overrated": -1.8, "boring": -1.9, "weak": -1.9, "losing": -1.9, "lost": -1.5,
+    "loser": -2.4, "embarrassing": -2.3, "disaster": -3.1, "nightmare": -2.7,
+    "unfair": -2.1, "sucks": -1.5, "wrong": -2.1, "worried": -1.7, "blame": -1.4,
+    # Emoji (matched as single tokens)
+    "❤": 2.7, "❤️": 2.7, "🔥": 2.0, "🏆": 2.3, "🥇": 2.3, "💪": 1.8, "👏": 2.0, "🙌": 2.0,
+    "😍": 3.0, "😊": 2.2, "🎉": 2.4, "👍": 1.6, "💯": 2.0, "😢": -2.2, "😭": -2.0,
+    "😡": -2.9, "👎": -2.0, "💔": -2.5, "🤦": -1.6,
+}
+
+NEGATIONS = frozenset({
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without",
+    "isn't", "wasn't", "aren't", "weren't", "don't", "doesn't", "didn't", "can't",
+    "cannot", "couldn't", "won't", "wouldn't", "shouldn't", "hasn't", "haven't", "ain't",
+})
+
+# Intensity adjustments applied to the valence word that follows
+BOOSTERS = {
+    "absolutely": 0.293, "very": 0.293, "really": 0.293, "so": 0.293, "extremely": 0.293,
+    "incredibly": 0.293, "totally": 0.293, "completely": 0.293, "hugely": 0.293,
+    "massively": 0.293, "super": 0.293, "truly": 0.293, "most": 0.293,
+    "slightly": -0.293, "somewhat": -0.293, "barely": -0.293, "kinda": -0.293,
+    "fairly": -0.2, "bit": -0.293, "little": -0.293,
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+|!|[\U0001F300-\U0001FAFF☀-➿]️?")
+
+NEGATION_SCALAR = -0.74
+EXCLAMATION_BOOST = 0.292
+NEGATION_WINDOW = 3
+NORMALIZATION_ALPHA = 15.0
+
+class SentimentEngine:
+    """
+    Local lexicon/rule-based sentiment scorer.
+
+    Returns the same {'compound', 'pos', 'neg', 'neu'} shape as the LLM-backed
+    analyze_sentiment. Texts are tokenized in Python, then every rule (boosters,
+    negation window, exclamation emphasis, normalization) runs as NumPy array
+    operations over the whole batch at once.
+    """
+
+    def __init__(self, lexicon: Dict[str, float] = None):
+        lexicon = lexicon or LEXICON
+        vocabulary = sorted(set(lexicon) | NEGATIONS | set(BOOSTERS) | {"!"})
+        self._index = {word: i for i, word in enumerate(vocabulary)}
+
+        # The extra trailing slot is the "unknown word" row
+        size = len(vocabulary) + 1
+        self._valence = np.zeros(size)
+        self._booster = np.zeros(size)
+        self._negation = np.zeros(size, dtype=bool)
+        self._exclamation = np.zeros(size, dtype=bool)
+
+        for word, i in self._index.items():
+            self._valence[i] = lexicon.get(word, 0.0)
+            self._booster[i] = BOOSTERS.get(word, 0.0)
+            self._negation[i] = word in NEGATIONS
+        self._exclamation[self._index["!"]] = True
+        self._unknown = size - 1
+
+    def tokenize(self, text: str) -> List[str]:
+        """Lowercase word, '!' and emoji tokens"""
+        return _TOKEN_PATTERN.findall(text.lower())
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Score a single text"""
+        return self.score_batch([text])[0]
+
+    def score_with_confidence(self, text: str) -> Tuple[Dict[str, float], float]:
+        """Score a single text and report how much the lexicon could tell about it"""
+        scores, confidence = self.score_batch_with_confidence([text])
+        return scores[0], float(confidence[0])
+
+    def score_batch(self, texts: Sequence[str]) -> List[Dict[str, float]]:
+        """Score many texts in one vectorized pass"""
+        return self.score_batch_with_confidence(texts)[0]
+
+    def score_batch_with_confidence(self, texts: Sequence[str]) -> Tuple[List[Dict[str, float]], np.ndarray]:
+        """Score many texts; also return a 0..1 confidence per text"""
+        compound, pos, neg, neu, confidence = self.score_arrays(texts)
+        scores = [
+            {'compound': c, 'pos': p, 'neg': n, 'neu': u}
+            for c, p, n, u in zip(compound.tolist(), pos.tolist(), neg.tolist(), neu.tolist())
+        ]
+        return scores, confidence
+
+    def score_arrays(self, texts: Sequence[str]) -> Tuple[np.ndarray, ...]:
+        """Vectorized core: returns (compound, pos, neg, neu, confidence) arrays"""
+        count = len(texts)
+        if count == 0:
+            empty = np.zeros(0)
+            return empty, empty, empty, empty, empty
+
+        index = self._index
+        unknown = self._unknown
+        token_ids = []
+        lengths = np.zeros(count, dtype=np.int64)
+        for i, text in enumerate(texts):
+            ids = [index.get(token, unknown) for token in self.tokenize(text or "")]
+            lengths[i] = len(ids)
+            token_ids.extend(ids)
+
+        ids = np.asarray(token_ids, dtype=np.int64)
+        doc = np.repeat(np.arange(count), lengths)
+
+        valence = self._valence[ids]
+        negation = self._negation[ids]
+        exclamation = self._exclamation[ids]
+        has_valence = valence != 0
+
+        # Booster on the immediately preceding token of the same text
+        boost = np.zeros_like(valence)
+        if ids.size > 1:
+            same_doc = doc[1:] == doc[:-1]
+            boost[1:] = np.where(same_doc, self._booster[ids[:-1]], 0.0)
+        scaled = valence + np.sign(valence) * boost
+
+        # Negation anywhere in the preceding window flips and dampens the valence
+        negated = np.zeros(ids.size, dtype=bool)
+        for k in range(1, NEGATION_WINDOW + 1):
+            if ids.size > k:
+                negated[k:] |= negation[:-k] & (doc[k:] == doc[:-k])
+        scaled = np.where(negated & has_valence, scaled * NEGATION_SCALAR, scaled)
+
+        total = np.bincount(doc, weights=scaled, minlength=count)
+        exclamations = np.minimum(np.bincount(doc, weights=exclamation, minlength=count), 4)
+        total = total + np.sign(total) * exclamations * EXCLAMATION_BOOST
+
+        compound = total / np.sqrt(total * total + NORMALIZATION_ALPHA)
+
+        # Proportions of positive, negative and neutral word mass
+        word_tokens = ~exclamation & ~negation
+        pos_mass = np.bincount(doc, weights=np.where(scaled > 0, scaled + 1, 0.0), minlength=count)
+        neg_mass = np.bincount(doc, weights=np.where(scaled < 0, -scaled + 1, 0.0), minlength=count)
+        neu_mass = np.bincount(doc, weights=(word_tokens & ~has_valence).astype(float), minlength=count)
+        mass = pos_mass + neg_mass + neu_mass
+        safe_mass = np.where(mass > 0, mass, 1.0)
+        pos = np.where(mass > 0, pos_mass / safe_mass, 0.0)
+        neg = np.where(mass > 0, neg_mass / safe_mass, 0.0)
+        neu = np.where(mass > 0, neu_mass / safe_mass, 1.0)
+
+        # Confidence grows with the number of lexicon hits and shrinks when
+        # positive and negative evidence cancel each other out
+        hits = np.bincount(doc, weights=has_valence.astype(float), minlength=count)
+        polar = pos_mass + neg_mass
+        agreement = np.abs(pos_mass - neg_mass) / np.where(polar > 0, polar, 1.0)
+        confidence = np.where(hits > 0, (1.0 - np.exp(-hits)) * agreement, 0.0)
+
+        return np.clip(compound, -1.0, 1.0), pos, neg, neu, confidence
+
+# Shared engine; building the lookup tables once per process is enough
+default_engine = SentimentEngine()
@@ -0,0 +1,128 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+SESSION_FORMAT_VERSION = 1
+
+def encode_session(state: Dict) -> bytes:
+    """Compact JSON, zlib-compressed"""
+    payload = {"v": SESSION_FORMAT_VERSION, **state}
+    return zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+def decode_session(data: bytes) -> Optional[Dict]:
+    """The state passed to encode_session, or None if data is unreadable or from another format version"""
+    try:
+        payload = json.loads(zlib.decompress(data).decode("utf-8"))
+    except (zlib.error, ValueError) as e:
+        print(f"Session decode error: {e}")
+        return None
+    if payload.pop("v", None) != SESSION_FORMAT_VERSION:
+        return None
+    return payload
+
+class MemorySessionStore:
+    """Sessions kept in this process; they do not survive a restart or reach other replicas"""
+
+    def __init__(self, ttl_seconds: float = 86400):
+        self.ttl_seconds = ttl_seconds
+        self._sessions: Dict[str, Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, username: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._sessions.get(username)
+            if entry is None:
+                return None
+            if time.time() - entry[1] > self.ttl_seconds:
+                del self._sessions[username]
+                return None
+        return decode_session(entry[0])
+
+    def save(self, username: str, state: Dict):
+        data = encode_session(state)
+        with self._lock:
+            self._sessions[username] = (data, time.time())
+
+    def delete(self, username: str):
+        with self._lock:
+            self._sessions.pop(username, None)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    username TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated);
+"""
+
+class SQLiteSessionStore:
+    """
+    Sessions as key-value rows in a SQLite file (WAL mode).
+
+    Stands in for a shared key-value service: every process that opens the
+    same file sees the same sessions, and they survive restarts. Entries
+    older than ttl_seconds are ignored on load and purged on save.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 86400):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def load(self, username: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE username = ? AND updated >= ?",
+                (username, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return decode_session(row[0]) if row else None
+
+    def save(self, username: str, state: Dict):
+        data = encode_session(state)
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (username, data, updated) VALUES (?, ?, ?)",
+                    (username, data, now)
+                )
+                self._conn.execute("DELETE FROM sessions WHERE updated < ?", (now - self.ttl_seconds,))
+        except sqlite3.Error as e:
+            print(f"Session store write error: {e}")
+
+    def delete(self, username: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE username = ?", (username,))
+
+# One store per backend and path in this process
+_stores: Dict[Tuple[str, str], object] = {}
+_stores_lock = threading.Lock()
+
+def get_session_store(backend: str, path: str = "", ttl_seconds: float = 86400):
+    """Shared session store: "memory" (this process only) or "sqlite" (the file at path)"""
+    if backend not in ("memory", "sqlite"):
+        raise ValueError(f"Unknown session backend: {backend}")
+    key = (backend, path if backend == "sqlite" else "")
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if backend == "sqlite":
+                store = SQLiteSessionStore(path, ttl_seconds)
+            else:
+                store = MemorySessionStore(ttl_seconds)
+            _stores[key] = store
+        return store
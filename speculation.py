@@ -0,0 +1,138 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, Optional
+
+class SpeculationCancelled(Exception):
+    """A speculative generation was dropped because its context changed"""
+
+class SpeculativeGenerator:
+    """
+    Runs speculative chain calls on a small dedicated thread pool.
+
+    Work is only accepted while the rolling one-minute token budget allows it.
+    Each call reserves its prompt estimate plus the full completion allowance;
+    once it finishes, the unused part of the completion allowance is given back.
+    Calls stream their output and stop between chunks as soon as their cancel
+    event is set, so a superseded context stops spending tokens.
+    """
+
+    def __init__(self, max_workers: int = 2, tokens_per_minute: int = 4000,
+                 max_completion_tokens: int = 500, on_event: Optional[Callable[[str], None]] = None):
+        self.tokens_per_minute = tokens_per_minute
+        self.max_completion_tokens = max_completion_tokens
+        self.on_event = on_event
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-speculation")
+        self._lock = threading.Lock()
+        self._window_started = time.monotonic()
+        self._tokens_used = 0
+
+    @staticmethod
+    def estimate_tokens(variables: Dict) -> int:
+        """Rough prompt size: about four characters per token"""
+        return sum(len(str(value)) for value in variables.values()) // 4
+
+    def _reserve(self, tokens: int) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_started >= 60:
+                self._window_started = now
+                self._tokens_used = 0
+            if self._tokens_used + tokens > self.tokens_per_minute:
+                return False
+            self._tokens_used += tokens
+            return True
+
+    def _refund(self, tokens: int):
+        with self._lock:
+            self._tokens_used = max(0, self._tokens_used - tokens)
+
+    def _emit(self, event: str):
+        if self.on_event:
+            self.on_event(event)
+
+    def submit(self, stream: Callable[[], Iterator[str]], variables: Dict,
+               cancelled: threading.Event) -> Optional[Future]:
+        """Start one speculative call, or return None when the token budget is spent"""
+        prompt_tokens = self.estimate_tokens(variables)
+        reserved = prompt_tokens + self.max_completion_tokens
+        if not self._reserve(reserved):
+            self._emit("skipped_budget")
+            return None
+
+        self._emit("started")
+        future = self._executor.submit(self._run, stream, cancelled, reserved, prompt_tokens)
+        future.add_done_callback(lambda done: self._on_done(done, reserved))
+        return future
+
+    def _on_done(self, future: Future, reserved: int):
+        """Work cancelled while still queued never runs, so give its reservation back"""
+        if future.cancelled():
+            self._refund(reserved)
+            self._emit("cancelled")
+
+    def _run(self, stream: Callable[[], Iterator[str]], cancelled: threading.Event,
+             reserved: int, prompt_tokens: int) -> str:
+        if cancelled.is_set():
+            self._refund(reserved)
+            self._emit("cancelled")
+            raise SpeculationCancelled("context changed before the call started")
+
+        chunks = []
+        generator = stream()
+        try:
+            for chunk in generator:
+                if cancelled.is_set():
+                    self._emit("cancelled")
+                    raise SpeculationCancelled("context changed while generating")
+                chunks.append(chunk)
+        finally:
+            generator.close()
+            completion_tokens = len("".join(chunks)) // 4
+            self._refund(max(0, reserved - prompt_tokens - completion_tokens))
+
+        return "".join(chunks)
+
+class SpeculationSlots:
+    """
+    Per-agent slots holding speculative results for one context version.
+
+    Slots are keyed by the request's cache key, so a call only takes a result
+    generated for exactly its inputs. Replacing the context cancels everything
+    still pending.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots: Dict[str, Future] = {}
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> threading.Event:
+        """Cancel event for work started under the current context"""
+        return self._cancelled
+
+    def put(self, key: str, future: Future):
+        with self._lock:
+            self._slots[key] = future
+
+    def take(self, key: str) -> Optional[Future]:
+        """Remove and return the slot for key, if any"""
+        if not self._slots:
+            return None
+        with self._lock:
+            return self._slots.pop(key, None)
+
+    def cancel(self) -> int:
+        """Cancel all pending work and empty the slots; returns how many were dropped"""
+        with self._lock:
+            self._cancelled.set()
+            self._cancelled = threading.Event()
+            dropped = len(self._slots)
+            for future in self._slots.values():
+                future.cancel()
+            self._slots.clear()
+            return dropped
+
+    def __len__(self) -> int:
+        return len(self._slots)
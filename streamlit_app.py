@@ -1,15 +1,21 @@
 import streamlit as st
 import os
-from datetime import datetime
 import warnings
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
 
 # Import our modules
-from f1_agent_langchain import F1RacerAgent, RaceStage, SessionType, RaceResult
-from auth import authenticate_user, check_authentication
-from config import get_config
+from f1_agent_langchain import F1RacerAgent, RaceStage, SessionType, RaceResult, get_shared_processor
+from auth import (
+    authenticate_user, check_authentication, auth_manager, login_identifiers, release_login_attempt,
+    reserve_login_attempt
+)
+from config import REQUIRED_ENV_HELP, ConfigurationError, get_config
+from metrics import metrics_registry
+from history import InteractionHistory, InteractionRecord, spill_path_for
+from interaction_store import get_interaction_store
+from session_store import get_session_store
 
 # Configure page
 st.set_page_config(
@@ -19,6 +25,73 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource
+def app_config():
+    """Configuration, read from the environment once per server process"""
+    return get_config()
+
+@st.cache_resource
+def _shared_processor():
+    return get_shared_processor(app_config())
+
+def shared_processor():
+    """The LLM processor (client pool, chains, cache) shared by every session, or None if it can't start"""
+    try:
+        return _shared_processor()
+    except Exception as e:
+        # Not cached, so the next session retries
+        print(f"Warning: LangChain processor failed to initialize: {e}")
+        return None
+
+@st.cache_resource
+def interaction_store():
+    """Persistent interaction store shared by every session, or None when disabled"""
+    return get_interaction_store(app_config().INTERACTION_STORE_PATH)
+
+@st.cache_resource
+def session_store():
+    """Backend for per-user session state (agent context and history)"""
+    config = app_config()
+    return get_session_store(config.SESSION_BACKEND, config.SESSION_STORE_PATH, config.SESSION_TTL_SECONDS)
+
+def session_key() -> str:
+    """The authenticated username, normalized the way auth stores it"""
+    user_info = st.session_state.get("user_info") or {}
+    return user_info.get("username") or st.session_state.username.lower()
+
+def save_session():
+    """Store the agent and history under the user, so any replica or a later login can resume them"""
+    if not st.session_state.authenticated:
+        return
+    
+    agent = st.session_state.agent
+    session_store().save(session_key(), {
+        "agent": agent.export_state() if agent else None,
+        "history": [record.to_row() for record in st.session_state.interaction_history],
+        "configured": st.session_state.context_configured
+    })
+
+def restore_session() -> bool:
+    """Resume the user's stored agent and history, if any; returns True when something was restored"""
+    state = session_store().load(session_key())
+    if not state:
+        return False
+    
+    try:
+        agent = F1RacerAgent.from_state(state["agent"], processor=shared_processor()) if state.get("agent") else None
+        history = new_interaction_history(session_key())
+        for row in state.get("history", []):
+            history.append(InteractionRecord.from_row(row))
+    except (KeyError, TypeError, ValueError) as e:
+        print(f"Session restore error: {e}")
+        return False
+    
+    st.session_state.agent = agent
+    st.session_state.context_configured = bool(agent and state.get("configured"))
+    st.session_state.interaction_history.close()
+    st.session_state.interaction_history = history
+    return True
+
 def initialize_session_state():
     """Initialize session state variables"""
     if 'authenticated' not in st.session_state:
@@ -30,7 +103,35 @@ def initialize_session_state():
     if 'context_configured' not in st.session_state:
         st.session_state.context_configured = False
     if 'interaction_history' not in st.session_state:
-        st.session_state.interaction_history = []
+        st.session_state.interaction_history = new_interaction_history()
+    if 'history_page' not in st.session_state:
+        st.session_state.history_page = 0
+    if 'history_unflushed' not in st.session_state:
+        st.session_state.history_unflushed = True
+
+def new_interaction_history(username: str = "") -> InteractionHistory:
+    """Bounded session history; older entries spill to disk when HISTORY_SPILL_DIR is set"""
+    config = app_config()
+    return InteractionHistory(
+        config.MAX_INTERACTION_HISTORY,
+        spill_path=spill_path_for(config.HISTORY_SPILL_DIR, username)
+    )
+
+def record_interaction(kind: str, input: str, output: str):
+    """Add an interaction to the session history and queue it for the persistent store"""
+    agent = st.session_state.agent
+    record = st.session_state.interaction_history.add(
+        kind, input, output,
+        stage=agent.context.stage.value if agent else None,
+        mood=agent.context.mood if agent else None
+    )
+    
+    store = interaction_store()
+    if store:
+        store.record(session_key(), record)
+        st.session_state.history_unflushed = True
+    
+    save_session()
 
 def login_page():
     """Display login page"""
@@ -67,9 +168,16 @@ def login_page():
             login_button = st.form_submit_button("Login")
             
             if login_button:
-                if authenticate_user(username, password):
+                identifiers = login_identifiers(username)
+                wait = reserve_login_attempt(identifiers)
+                if wait:
+                    st.error(f"Too many login attempts. Please try again in {wait} seconds.")
+                elif authenticate_user(username, password):
+                    release_login_attempt(identifiers)
                     st.session_state.authenticated = True
                     st.session_state.username = username
+                    st.session_state.interaction_history = new_interaction_history(session_key())
+                    restore_session()
                     st.success("Login successful! Redirecting...")
                     st.rerun()
                 else:
@@ -84,7 +192,8 @@ def logout():
     st.session_state.username = ""
     st.session_state.agent = None
     st.session_state.context_configured = False
-    st.session_state.interaction_history = []
+    st.session_state.interaction_history.close()
+    st.session_state.interaction_history = new_interaction_history()
     st.rerun()
 
 def context_config_tab():
@@ -147,7 +256,7 @@ def context_config_tab():
             with st.spinner("Configuring F1 Agent..."):
                 # Create or update agent
                 if st.session_state.agent is None:
-                    st.session_state.agent = F1RacerAgent(racer_name, team_name)
+                    st.session_state.agent = F1RacerAgent(racer_name, team_name, processor=shared_processor())
                 else:
                     st.session_state.agent.racer_name = racer_name
                     st.session_state.agent.team_name = team_name
@@ -164,6 +273,7 @@ def context_config_tab():
                 )
                 
                 st.session_state.context_configured = True
+                save_session()
                 st.success("✅ Agent configured successfully!")
                 
                 # Display current configuration
@@ -192,8 +302,9 @@ def context_config_tab():
         except Exception as e:
             st.error(f"Error configuring agent: {str(e)}")
 
+@st.fragment
 def agent_interaction_tab():
-    """Agent interaction tab"""
+    """Agent interaction tab; its widgets rerun only this fragment"""
     if not st.session_state.context_configured:
         st.warning("⚠️ Please configure the agent context first!")
         return
@@ -228,13 +339,71 @@ def agent_interaction_tab():
     elif interaction_type == "thoughts":
         handle_agent_thoughts()
     
-    # Display interaction history
-    if st.session_state.interaction_history:
-        st.subheader("📜 Interaction History")
-        for i, interaction in enumerate(reversed(st.session_state.interaction_history[-10:])):
-            with st.expander(f"{interaction['type']} - {interaction['timestamp'].strftime('%H:%M:%S')}"):
-                st.write(f"**Input:** {interaction.get('input', 'N/A')}")
-                st.write(f"**Output:** {interaction['output']}")
+    interaction_history_panel()
+
+@st.fragment
+def interaction_history_panel():
+    """Paginated interaction history, read from the persistent store when enabled"""
+    config = app_config()
+    store = interaction_store()
+    page_size = config.HISTORY_PAGE_SIZE
+    username = session_key()
+    
+    if store is None:
+        if st.session_state.interaction_history:
+            st.subheader("📜 Interaction History")
+            render_interactions(st.session_state.interaction_history.recent(page_size))
+        return
+    
+    # Make this session's new interactions visible before reading; paging
+    # and filtering reruns have nothing new to wait for
+    if st.session_state.history_unflushed:
+        st.session_state.history_unflushed = not store.flush(timeout=1.0)
+    
+    kinds = store.kinds(username)
+    if not kinds:
+        return
+    
+    st.subheader("📜 Interaction History")
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        selected_kind = st.selectbox("Filter", options=["All"] + kinds, key="history_kind")
+    kind = None if selected_kind == "All" else selected_kind
+    
+    total = store.count(username, kind)
+    pages = max(1, -(-total // page_size))
+    page = min(st.session_state.history_page, pages - 1)
+    
+    with col2:
+        if st.button("◀ Newer", disabled=page == 0):
+            page -= 1
+    with col3:
+        if st.button("Older ▶", disabled=page >= pages - 1):
+            page += 1
+    with col4:
+        st.caption(f"Page {page + 1} of {pages} ({total} total)")
+    
+    st.session_state.history_page = page
+    render_interactions(store.page(username, page, page_size, kind))
+
+def render_interactions(interactions):
+    """Show interactions as expanders, newest first"""
+    for interaction in interactions:
+        with st.expander(f"{interaction.kind} - {interaction.when.strftime('%Y-%m-%d %H:%M:%S')}"):
+            st.write(f"**Input:** {interaction.input or 'N/A'}")
+            st.write(f"**Output:** {interaction.output}")
+
+def render_stream(chunks) -> str:
+    """Render streamed text as it arrives and return the complete text"""
+    placeholder = st.empty()
+    text = ""
+    
+    for chunk in chunks:
+        text += chunk
+        placeholder.markdown(text + "▌")
+    
+    placeholder.empty()
+    return text.strip()
 
 def handle_status_post():
     """Handle status post generation"""
@@ -258,20 +427,14 @@ def handle_status_post():
     with col2:
         if st.button("🚀 Generate Post", type="primary"):
             try:
-                with st.spinner("Generating post..."):
-                    post = st.session_state.agent.speak(post_type)
-                    
-                    st.success("✅ Post generated!")
-                    st.text_area("Generated Post", value=post, height=150, disabled=True)
-                    
-                    # Add to history
-                    st.session_state.interaction_history.append({
-                        'type': 'Status Post',
-                        'input': selected_post_type,
-                        'output': post,
-                        'timestamp': datetime.now()
-                    })
-                    
+                post = render_stream(st.session_state.agent.speak_stream(post_type))
+                
+                st.success("✅ Post generated!")
+                st.text_area("Generated Post", value=post, height=150, disabled=True)
+                
+                # Add to history
+                record_interaction('Status Post', selected_post_type, post)
+                
             except Exception as e:
                 st.error(f"Error generating post: {str(e)}")
 
@@ -302,25 +465,16 @@ def handle_fan_reply():
         if st.button("💭 Generate Reply", type="primary"):
             if fan_comment.strip():
                 try:
-                    with st.spinner("Generating reply..."):
-                        reply = st.session_state.agent.reply_to_comment(fan_comment)
-                        
-                        st.success("✅ Reply generated!")
-                        
-                        # Display in a nice format
-                        st.markdown("**Fan Comment:**")
-                        st.info(fan_comment)
-                        st.markdown("**Agent Reply:**")
-                        st.success(reply)
-                        
-                        # Add to history
-                        st.session_state.interaction_history.append({
-                            'type': 'Fan Reply',
-                            'input': fan_comment,
-                            'output': reply,
-                            'timestamp': datetime.now()
-                        })
-                        
+                    # Display in a nice format
+                    st.markdown("**Fan Comment:**")
+                    st.info(fan_comment)
+                    st.markdown("**Agent Reply:**")
+                    reply = render_stream(st.session_state.agent.reply_to_comment_stream(fan_comment))
+                    st.success(reply)
+                    
+                    # Add to history
+                    record_interaction('Fan Reply', fan_comment, reply)
+                    
                 except Exception as e:
                     st.error(f"Error generating reply: {str(e)}")
             else:
@@ -355,12 +509,7 @@ def handle_mention():
                         st.text_area("Generated Mention", value=mention, height=100, disabled=True)
                         
                         # Add to history
-                        st.session_state.interaction_history.append({
-                            'type': 'Mention',
-                            'input': f"{person_name} ({selected_context})",
-                            'output': mention,
-                            'timestamp': datetime.now()
-                        })
+                        record_interaction('Mention', f"{person_name} ({selected_context})", mention)
                         
                 except Exception as e:
                     st.error(f"Error generating mention: {str(e)}")
@@ -401,12 +550,8 @@ def handle_like_simulation():
                         st.info(like_action)
                         
                         # Add to history
-                        st.session_state.interaction_history.append({
-                            'type': 'Like Action',
-                            'input': post_content[:50] + "..." if len(post_content) > 50 else post_content,
-                            'output': like_action,
-                            'timestamp': datetime.now()
-                        })
+                        preview = post_content[:50] + "..." if len(post_content) > 50 else post_content
+                        record_interaction('Like Action', preview, like_action)
                         
                 except Exception as e:
                     st.error(f"Error simulating like: {str(e)}")
@@ -419,23 +564,104 @@ def handle_agent_thoughts():
     
     if st.button("🧠 Generate Thoughts", type="primary"):
         try:
-            with st.spinner("Accessing agent thoughts..."):
-                thoughts = st.session_state.agent.think()
-                
-                st.success("✅ Thoughts generated!")
-                st.text_area("Agent Thoughts", value=thoughts, height=150, disabled=True)
-                
-                # Add to history
-                st.session_state.interaction_history.append({
-                    'type': 'Agent Thoughts',
-                    'input': 'Internal reflection',
-                    'output': thoughts,
-                    'timestamp': datetime.now()
-                })
-                
+            thoughts = render_stream(st.session_state.agent.think_stream())
+            
+            st.success("✅ Thoughts generated!")
+            st.text_area("Agent Thoughts", value=thoughts, height=150, disabled=True)
+            
+            # Add to history
+            record_interaction('Agent Thoughts', 'Internal reflection', thoughts)
+            
         except Exception as e:
             st.error(f"Error generating thoughts: {str(e)}")
 
+def metrics_panel():
+    """Admin-only panel with per-operation latency, token, fallback and cache metrics"""
+    st.header("📊 Metrics")
+    
+    snapshot = metrics_registry.snapshot()
+    st.caption(f"Collected since {snapshot['since']} (process-wide)")
+    
+    st.subheader("Latency")
+    latency_rows = [
+        {"name": name, **{key: value for key, value in hist.items() if key != "buckets"}}
+        for name, hist in snapshot["latency"].items()
+    ]
+    if latency_rows:
+        st.dataframe(latency_rows)
+    else:
+        st.info("No calls recorded yet.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Tokens")
+        st.dataframe([{"chain": name, **tokens} for name, tokens in snapshot["tokens"].items()])
+        
+        st.subheader("Counters")
+        st.dataframe([
+            {"counter": counter, "key": key, "value": value}
+            for counter, values in snapshot["counters"].items()
+            for key, value in values.items()
+        ])
+        
+        st.subheader("Gauges")
+        st.dataframe([
+            {"gauge": gauge, "key": key, "value": value}
+            for gauge, values in snapshot["gauges"].items()
+            for key, value in values.items()
+        ])
+    
+    with col2:
+        st.subheader("Fallbacks")
+        st.dataframe([
+            {"operation": operation, "reason": reason, "count": count}
+            for operation, reasons in snapshot["fallbacks"].items()
+            for reason, count in reasons.items()
+        ])
+        
+        if st.session_state.agent:
+            st.subheader("Cache")
+            agent = st.session_state.agent
+            st.json(agent.processor.cache.stats() if agent.processor else {})
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("💾 Export Metrics"):
+            try:
+                path = metrics_registry.export(app_config().METRICS_EXPORT_PATH)
+                st.success(f"Metrics appended to {path}")
+            except Exception as e:
+                st.error(f"Error exporting metrics: {str(e)}")
+    with col2:
+        if st.button("♻️ Reset Metrics"):
+            metrics_registry.reset()
+            st.rerun()
+
+@st.fragment
+def agent_summary():
+    """Current agent and what's trending for its context"""
+    agent = st.session_state.agent
+    if agent is None:
+        return
+    
+    context = agent.context
+    st.markdown("### 🏎️ Current Agent")
+    st.write(f"**Driver:** {agent.racer_name}")
+    st.write(f"**Team:** {agent.team_name}")
+    st.write(f"**Stage:** {context.stage.value.title() if context.stage else 'N/A'}")
+    st.write(f"**Mood:** {context.mood.title()}")
+    
+    if context.last_result:
+        st.write(f"**Last Result:** {context.last_result.value.title()}")
+    
+    trending = agent.trending(k=5, stage=context.stage, circuit_name=context.circuit_name)
+    if trending["keywords"] or trending["hashtags"]:
+        st.markdown("### 🔥 Trending Here")
+        if trending["hashtags"]:
+            st.write(" ".join(f"#{tag} ({count})" for tag, count in trending["hashtags"]))
+        if trending["keywords"]:
+            st.write(", ".join(f"{word} ({count})" for word, count in trending["keywords"]))
+
 def sidebar():
     """Display sidebar with user info and controls"""
     with st.sidebar:
@@ -446,21 +672,8 @@ def sidebar():
         
         st.markdown("---")
         
-        if st.session_state.agent:
-            st.markdown("### 🏎️ Current Agent")
-            agent_info = st.session_state.agent.get_agent_info()
-            st.write(f"**Driver:** {agent_info['racer_name']}")
-            st.write(f"**Team:** {agent_info['team_name']}")
-            
-            # Fix: Handle enum properly in sidebar too
-            stage_display = agent_info['current_stage'].value.title() if agent_info['current_stage'] else "N/A"
-            st.write(f"**Stage:** {stage_display}")
-            st.write(f"**Mood:** {agent_info['mood'].title()}")
-            
-            if agent_info.get('last_result'):
-                result_display = agent_info['last_result'].value.title() if hasattr(agent_info['last_result'], 'value') else str(agent_info['last_result'])
-                st.write(f"**Last Result:** {result_display}")
-            
+        agent_summary()
+        
         st.markdown("---")
         st.markdown("### ℹ️ About")
         st.markdown("""
@@ -478,6 +691,13 @@ def sidebar():
 
 def main():
     """Main application function"""
+    try:
+        app_config()
+    except ConfigurationError as e:
+        st.error(str(e))
+        st.info(REQUIRED_ENV_HELP)
+        st.stop()
+    
     initialize_session_state()
     
     # Check authentication
@@ -489,13 +709,21 @@ def main():
     sidebar()
     
     # Main content area
-    tab1, tab2 = st.tabs(["🛠️ Context Config", "🚀 Agent Interaction"])
+    is_admin = auth_manager.is_admin(st.session_state.username)
+    tab_names = ["🛠️ Context Config", "🚀 Agent Interaction"]
+    if is_admin:
+        tab_names.append("📊 Metrics")
+    tabs = st.tabs(tab_names)
     
-    with tab1:
+    with tabs[0]:
         context_config_tab()
     
-    with tab2:
+    with tabs[1]:
         agent_interaction_tab()
+    
+    if is_admin:
+        with tabs[2]:
+            metrics_panel()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,50 @@
+import os
+import sys
+from dataclasses import replace
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Every test runs offline on the fake LLM, with nothing persisted to disk
+os.environ.update({
+    "LLM_BACKEND": "fake",
+    "FAKE_LLM_LATENCY_SECONDS": "0",
+    "FAKE_LLM_TOKENS_PER_SECOND": "0",
+    "FAKE_LLM_ERROR_RATE": "0",
+    "CACHE_ENABLED": "false",
+    "CACHE_DIR": "",
+    "INTERACTION_STORE_PATH": "",
+    "LOGIN_RATE_LIMIT_PATH": "",
+    "SESSION_BACKEND": "memory",
+    "SPECULATION_ENABLED": "false",
+})
+
+from circuit_breaker import CircuitState
+from config import Config
+from f1_agent_langchain import F1RacerAgent, LangChainProcessor, RaceStage
+
+def trip_to_half_open(breaker):
+    """Open the breaker and let it go half-open at once, without the probe thread"""
+    breaker.probe = None
+    breaker.recovery_seconds = 0
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(RuntimeError("backend down"))
+    assert breaker.state == CircuitState.HALF_OPEN
+
+@pytest.fixture
+def make_processor():
+    """Build a processor on the fake backend, with Config fields overridden"""
+    def make(**overrides) -> LangChainProcessor:
+        return LangChainProcessor(replace(Config.from_env(), **overrides))
+    return make
+
+@pytest.fixture
+def make_agent(make_processor):
+    """Build an agent on its own fake processor, with its context set"""
+    def make(**overrides) -> F1RacerAgent:
+        agent = F1RacerAgent("Test Driver", "Test Racing", processor=make_processor(**overrides))
+        agent.update_context(RaceStage.RACE, circuit_name="Monza", pregenerate=False)
+        return agent
+    return make
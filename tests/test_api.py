@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import pytest
+
+import api
+from circuit_breaker import CircuitState
+from config import reload_config
+from conftest import trip_to_half_open
+from f1_agent_langchain import clear_shared_processors, get_shared_processor
+
+@pytest.fixture
+def api_env(monkeypatch):
+    """A fresh agent pool and shared processor built from patched settings"""
+    def configure(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        reload_config()
+        clear_shared_processors()
+        monkeypatch.setattr(api, "pool", api.AgentPool())
+
+    yield configure
+    monkeypatch.undo()
+    reload_config()
+    clear_shared_processors()
+
+async def request(method: str, path: str, body=None):
+    """Send one request through the ASGI app; returns (status, JSON payload)"""
+    data = json.dumps(body).encode() if body is not None else b""
+    messages = [{"type": "http.request", "body": data, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await api.app({"type": "http", "method": method, "path": path}, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+async def lifespan(*events: str):
+    messages = [{"type": f"lifespan.{event}"} for event in events]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    await api.app({"type": "lifespan"}, receive, send)
+    return sent
+
+def test_startup_builds_the_processor_and_a_first_agent(api_env):
+    api_env()
+    assert asyncio.run(lifespan("startup", "shutdown")) == [
+        "lifespan.startup.complete", "lifespan.shutdown.complete"
+    ]
+    assert len(api.pool._agents) == 1
+
+def test_reply_and_validation(api_env):
+    api_env()
+    status, payload = asyncio.run(request("POST", "/reply", {"racer": "Test Driver", "comment": "Great race!"}))
+    assert status == 200 and payload["text"]
+
+    status, payload = asyncio.run(request("POST", "/reply", {"comment": "Great race!"}))
+    assert (status, payload) == (400, {"error": "'racer' is required"})
+
+def test_timed_out_request_leaves_the_breaker_usable(api_env):
+    api_env(FAKE_LLM_LATENCY_SECONDS=2, API_REQUEST_TIMEOUT_SECONDS=0.2)
+    processor = get_shared_processor()
+    trip_to_half_open(processor.breaker)
+
+    status, _ = asyncio.run(request("POST", "/thoughts", {"racer": "Test Driver"}))
+    assert status == 504
+    assert processor.breaker.state == CircuitState.HALF_OPEN
+
+    processor.llm.latency_seconds = 0
+    status, _ = asyncio.run(request("POST", "/thoughts", {"racer": "Test Driver"}))
+    assert status == 200
+    assert processor.breaker.state == CircuitState.CLOSED
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from conftest import trip_to_half_open
+
+class ClientError(Exception):
+    status_code = 400
+
+def open_breaker(**kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=60, **kwargs)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure(RuntimeError("backend down"))
+    return breaker
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, recovery_seconds=60)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure(RuntimeError("boom"))
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure(RuntimeError("boom"))
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats()["rejected"] == 1
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=60)
+    breaker.record_failure(RuntimeError("boom"))
+    breaker.record_success()
+    breaker.record_failure(RuntimeError("boom"))
+    assert breaker.state == CircuitState.CLOSED
+
+def test_client_errors_do_not_count():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=60)
+    breaker.record_failure(ClientError("bad request"))
+    breaker.record_failure(CircuitOpenError("refused"))
+    assert breaker.state == CircuitState.CLOSED
+
+def test_half_open_after_recovery_without_probe():
+    breaker = open_breaker()
+    assert breaker.state == CircuitState.OPEN
+    breaker.recovery_seconds = 0
+    assert breaker.state == CircuitState.HALF_OPEN
+
+def test_half_open_admits_one_trial_then_closes_on_success():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=60)
+    trip_to_half_open(breaker)
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError, match="trial request already in flight"):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.before_call()
+
+def test_half_open_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=60)
+    trip_to_half_open(breaker)
+    breaker.recovery_seconds = 60
+
+    breaker.before_call()
+    breaker.record_failure(RuntimeError("still down"))
+    assert breaker.state == CircuitState.OPEN
+
+def test_release_gives_back_the_trial_slot():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=60)
+    trip_to_half_open(breaker)
+
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == CircuitState.HALF_OPEN
+
+def test_probe_moves_open_to_half_open():
+    probed = threading.Event()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=0.01, probe=probed.set)
+    breaker.record_failure(RuntimeError("backend down"))
+
+    assert probed.wait(timeout=2)
+    deadline = time.time() + 2
+    while breaker.state != CircuitState.HALF_OPEN and time.time() < deadline:
+        time.sleep(0.01)
+    assert breaker.state == CircuitState.HALF_OPEN
+
+def test_failed_probe_keeps_the_circuit_open():
+    attempts = []
+
+    def probe():
+        attempts.append(1)
+        raise RuntimeError("still down")
+
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=0.01, probe=probe)
+    breaker.record_failure(RuntimeError("backend down"))
+    deadline = time.time() + 2
+    while len(attempts) < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    assert breaker.state == CircuitState.OPEN
+    assert "still down" in breaker.stats()["last_error"]
+
+def test_transitions_are_reported():
+    transitions = []
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_seconds=60, on_transition=lambda old, new: transitions.append(new)
+    )
+    trip_to_half_open(breaker)
+    breaker.before_call()
+    breaker.record_success()
+    assert transitions == [CircuitState.OPEN, CircuitState.HALF_OPEN, CircuitState.CLOSED]
+
+# Processor calls that end without a result must not leak the trial slot
+
+def test_cancelled_async_call_gives_back_the_trial_slot(make_agent):
+    agent = make_agent(FAKE_LLM_LATENCY_SECONDS=2.0)
+    breaker = agent.processor.breaker
+    trip_to_half_open(breaker)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(agent.athink(), 0.2))
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    # The next call is the trial, reaches the model and closes the circuit
+    fallbacks = agent.metrics.snapshot()["fallbacks"].get("think", {})
+    agent.processor.llm.latency_seconds = 0
+    agent.think()
+    assert breaker.state == CircuitState.CLOSED
+    assert agent.metrics.snapshot()["fallbacks"].get("think", {}) == fallbacks
+
+def test_interrupted_sync_call_gives_back_the_trial_slot(make_agent):
+    agent = make_agent()
+    processor = agent.processor
+    trip_to_half_open(processor.breaker)
+
+    class Interrupted:
+        def invoke(self, *args, **kwargs):
+            raise KeyboardInterrupt
+
+    chain = processor.chains["thoughts"]
+    processor.chains["thoughts"] = Interrupted()
+    with pytest.raises(KeyboardInterrupt):
+        agent.think()
+
+    processor.chains["thoughts"] = chain
+    agent.think()
+    assert processor.breaker.state == CircuitState.CLOSED
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from cli import JsonlWriter, load_checkpoint, read_rows, run
+
+def write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+def read_output(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+def run_file(agent, task, input_path, output_path, **kwargs):
+    done = load_checkpoint(str(output_path))
+    writer = JsonlWriter(str(output_path))
+    try:
+        return run(agent, task, read_rows(str(input_path), "jsonl"), done, writer, parallel=4, **kwargs)
+    finally:
+        writer.close()
+
+def test_read_rows_keeps_falsy_ids(tmp_path):
+    path = tmp_path / "in.jsonl"
+    write_jsonl(path, [{"id": 0, "comment": "a"}, {"id": "", "comment": "b"}, {"comment": "c"}])
+    assert [row_id for row_id, _ in read_rows(str(path), "jsonl")] == ["0", "", "3"]
+
+def test_read_rows_csv(tmp_path):
+    path = tmp_path / "in.csv"
+    path.write_text("id,comment\nfirst,great race\n,tough day\n", encoding="utf-8")
+    rows = list(read_rows(str(path), "csv"))
+    assert [row_id for row_id, _ in rows] == ["first", ""]
+    assert rows[1][1]["comment"] == "tough day"
+
+def test_checkpoint_skips_failed_rows_and_drops_a_torn_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text(
+        json.dumps({"id": "1", "output": "ok"}) + "\n"
+        + json.dumps({"id": "2", "error": "ValueError: boom"}) + "\n"
+        + '{"id": "3", "outp',
+        encoding="utf-8"
+    )
+    assert load_checkpoint(str(path)) == {"1"}
+    assert path.read_text(encoding="utf-8").endswith("\n")
+
+def test_resume_retries_only_failed_rows(make_agent, tmp_path):
+    agent = make_agent()
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_jsonl(input_path, [
+        {"id": 0, "comment": "Amazing drive today!"},
+        {"id": 1},
+        {"id": 2, "comment": "Keep pushing!"},
+    ])
+
+    counts = run_file(agent, "reply", input_path, output_path)
+    assert counts == {"processed": 2, "skipped": 0, "errors": 1}
+    failed = [record for record in read_output(output_path) if "error" in record]
+    assert [record["id"] for record in failed] == ["1"]
+
+    counts = run_file(agent, "reply", input_path, output_path)
+    assert counts == {"processed": 0, "skipped": 2, "errors": 1}
+
+    write_jsonl(input_path, [{"id": 0, "comment": "Amazing drive today!"}, {"id": 1, "comment": "Fixed row"}])
+    counts = run_file(agent, "reply", input_path, output_path)
+    assert counts == {"processed": 1, "skipped": 1, "errors": 0}
+    assert load_checkpoint(str(output_path)) == {"0", "1", "2"}
+
+@pytest.mark.parametrize("allow_fallback, processed, errors", [(False, 0, 2), (True, 2, 0)])
+def test_fallback_rows_fail_unless_allowed(make_agent, tmp_path, allow_fallback, processed, errors):
+    agent = make_agent(FAKE_LLM_ERROR_RATE=1.0)
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_jsonl(input_path, [{"comment": "Great race"}, {"comment": "Bad luck today"}])
+
+    counts = run_file(agent, "reply", input_path, output_path, allow_fallback=allow_fallback)
+    assert (counts["processed"], counts["errors"]) == (processed, errors)
+    for record in read_output(output_path):
+        assert record["output"]
+        assert ("error" in record) == (not allow_fallback)
@@ -0,0 +1,50 @@
+import asyncio
+from contextlib import aclosing
+
+from circuit_breaker import CircuitState
+from conftest import trip_to_half_open
+from f1_agent_langchain import RaceStage
+from grid import Grid
+
+DRIVERS = [("Driver A", "Team A"), ("Driver B", "Team B"), ("Driver C", "Team C")]
+
+def make_grid(processor) -> Grid:
+    grid = Grid(DRIVERS, processor=processor)
+    grid.update_context(RaceStage.RACE, circuit_name="Monza", pregenerate=False)
+    return grid
+
+def test_async_round_yields_every_driver(make_processor):
+    grid = make_grid(make_processor())
+
+    async def collect():
+        return [post async for post in grid.athink_all()]
+
+    posts = asyncio.run(collect())
+    assert sorted(post.racer_name for post in posts) == [name for name, _ in DRIVERS]
+
+def test_stopping_an_async_round_early_leaves_the_breaker_usable(make_processor):
+    processor = make_processor(FAKE_LLM_LATENCY_SECONDS=2.0)
+    grid = make_grid(processor)
+    trip_to_half_open(processor.breaker)
+
+    async def first_post():
+        # One driver takes the trial slot and waits on the slow model; the
+        # others are refused and fall back at once, so the first post arrives
+        # while the trial is still running and stopping cancels it
+        async with aclosing(grid.athink_all()) as posts:
+            async for post in posts:
+                break
+        await asyncio.sleep(0.05)
+        return post
+
+    asyncio.run(first_post())
+    assert processor.breaker.state == CircuitState.HALF_OPEN
+
+    processor.llm.latency_seconds = 0
+    grid["Driver A"].think()
+    assert processor.breaker.state == CircuitState.CLOSED
+
+def test_stopping_a_sync_round_early_returns(make_processor):
+    grid = make_grid(make_processor())
+    first = next(iter(grid.think_all()))
+    assert first.racer_name in grid.drivers
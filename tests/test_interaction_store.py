@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from history import InteractionRecord
+from interaction_store import InteractionStore, get_interaction_store
+
+@pytest.fixture
+def store(tmp_path):
+    store = InteractionStore(str(tmp_path / "interactions.sqlite3"), batch_size=8, flush_interval=60)
+    yield store
+    store.close()
+
+def add(store, username, kind, n, start=1000.0):
+    for i in range(n):
+        store.record(username, InteractionRecord(kind, f"in {i}", f"out {i}", timestamp=start + i))
+
+def test_flush_makes_queued_records_readable(store):
+    add(store, "bob", "post", 3)
+    assert store.flush(timeout=5)
+    assert store.count("bob") == 3
+
+def test_pages_are_newest_first_and_filtered(store):
+    add(store, "bob", "post", 5)
+    add(store, "bob", "reply", 2, start=2000.0)
+    add(store, "amy", "post", 4)
+    store.flush(timeout=5)
+
+    assert store.kinds("bob") == ["post", "reply"]
+    assert [r.output for r in store.page("bob", 0, 3)] == ["out 1", "out 0", "out 4"]
+    assert [r.output for r in store.page("bob", 1, 3, kind="post")] == ["out 1", "out 0"]
+    assert store.count("bob", kind="post", since=1001, until=1003) == 2
+    assert store.page("bob", 5, 3) == []
+
+def test_concurrent_writers_lose_nothing(store):
+    def write(n):
+        add(store, f"user{n}", "post", 50)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.flush(timeout=5)
+    assert sum(store.count(f"user{n}") for n in range(8)) == 400
+
+def test_close_commits_pending_records(tmp_path):
+    path = str(tmp_path / "interactions.sqlite3")
+    store = InteractionStore(path, batch_size=1000, flush_interval=60)
+    add(store, "bob", "post", 10)
+    store.close()
+    assert store.flush() is True
+
+    reopened = InteractionStore(path)
+    try:
+        assert reopened.count("bob") == 10
+    finally:
+        reopened.close()
+
+def test_stores_are_shared_per_path(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    assert get_interaction_store("") is None
+    assert get_interaction_store(path) is get_interaction_store(path)
@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import auth
+import login_limiter
+from login_limiter import MemoryLimiterBackend, RateLimiter, SQLiteLimiterBackend, create_rate_limiter
+
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter(request, tmp_path):
+    if request.param == "sqlite":
+        backend = SQLiteLimiterBackend(str(tmp_path / "attempts.sqlite3"))
+    else:
+        backend = MemoryLimiterBackend()
+    return RateLimiter(max_attempts=3, window_minutes=15, backend=backend)
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen time.time for the limiter, at the start of a window"""
+    now = [1_000_000 * 900.0]
+    monkeypatch.setattr(login_limiter.time, "time", lambda: now[0])
+    return now
+
+@pytest.fixture
+def shared_limiter(monkeypatch):
+    """The limiter auth.py uses, fresh for each test"""
+    limiter = RateLimiter(max_attempts=3, window_minutes=15)
+    monkeypatch.setattr(auth, "_rate_limiter", limiter)
+    return limiter
+
+def test_blocks_after_max_attempts(limiter, clock):
+    for _ in range(3):
+        assert limiter.is_allowed("user:bob")
+        limiter.record_attempt("user:bob")
+    allowed, wait = limiter.check("user:bob")
+    assert not allowed and wait > 0
+    assert limiter.is_allowed("user:amy")
+
+def test_check_with_record_counts_only_allowed_attempts(limiter, clock):
+    for _ in range(3):
+        assert limiter.check("user:bob", record=True) == (True, 0)
+    for _ in range(5):
+        assert not limiter.check("user:bob", record=True)[0]
+
+    # Refused attempts were not counted: just into the next window, the three
+    # recorded ones have started to slide out
+    clock[0] += 15 * 60 + 1
+    assert limiter.check("user:bob") == (True, 0)
+
+def test_previous_window_slides_out(limiter, clock):
+    for _ in range(3):
+        limiter.record_attempt("user:bob")
+    clock[0] += 15 * 60
+    # The whole previous window still overlaps the sliding window
+    assert not limiter.is_allowed("user:bob")
+    clock[0] += 1
+    assert limiter.is_allowed("user:bob")
+
+def test_wait_time_is_when_the_next_attempt_is_allowed(limiter, clock):
+    for _ in range(3):
+        limiter.record_attempt("user:bob")
+    clock[0] += 15 * 60
+    wait = limiter.get_wait_time("user:bob")
+    clock[0] += wait - 1
+    assert not limiter.is_allowed("user:bob")
+    clock[0] += 1
+    assert limiter.is_allowed("user:bob")
+
+def test_release_takes_back_a_reserved_attempt(limiter, clock):
+    for _ in range(3):
+        assert limiter.check("user:bob", record=True)[0]
+        limiter.release_attempt("user:bob")
+    assert limiter.check("user:bob") == (True, 0)
+    assert len(limiter.backend) == 0
+
+def test_memory_backend_evicts_least_recently_used():
+    limiter = RateLimiter(max_attempts=3, backend=MemoryLimiterBackend(max_identifiers=2))
+    for name in ("a", "b", "c"):
+        limiter.record_attempt(name)
+    assert len(limiter.backend) == 2
+
+def test_sqlite_backend_is_shared_between_limiters(tmp_path, clock):
+    path = str(tmp_path / "attempts.sqlite3")
+    first = create_rate_limiter(3, 15, path)
+    second = create_rate_limiter(3, 15, path)
+    for _ in range(3):
+        first.record_attempt("user:bob")
+    assert not second.is_allowed("user:bob")
+
+def test_concurrent_reservations_never_exceed_the_limit(limiter):
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(lambda _: limiter.check("user:bob", record=True)[0], range(32)))
+    assert results.count(True) == 3
+
+def test_reserve_login_attempt_checks_every_identifier(shared_limiter):
+    identifiers = ["user:bob", "ip:10.0.0.1"]
+    for _ in range(3):
+        assert auth.reserve_login_attempt(identifiers) == 0
+    assert auth.reserve_login_attempt(identifiers) > 0
+
+    # The address is exhausted, so another user's attempt from it is refused
+    # and not counted against that user
+    assert auth.reserve_login_attempt(["user:amy", "ip:10.0.0.1"]) > 0
+    assert shared_limiter.check("user:amy") == (True, 0)
+    assert len(shared_limiter.backend) == 2
+
+def test_successful_logins_do_not_count(shared_limiter):
+    identifiers = ["user:bob"]
+    for _ in range(10):
+        assert auth.reserve_login_attempt(identifiers) == 0
+        auth.release_login_attempt(identifiers)
+    assert shared_limiter.check("user:bob") == (True, 0)
+
+def test_login_identifiers_without_a_script_context():
+    assert auth.login_identifiers(" Bob ") == ["user:bob"]
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from request_scheduler import Priority, RateLimitTimeout, RequestScheduler, current_priority, prioritized
+
+def drained(requests_per_minute: int) -> RequestScheduler:
+    """A scheduler whose request bucket has just been emptied by a burst"""
+    scheduler = RequestScheduler(requests_per_minute=requests_per_minute, queue_timeout=5)
+    for _ in range(int(scheduler.requests.capacity)):
+        assert scheduler.acquire(10) < 0.05
+    return scheduler
+
+def test_disabled_scheduler_admits_immediately():
+    scheduler = RequestScheduler()
+    assert not scheduler.enabled
+    assert scheduler.acquire(10_000) == 0.0
+    assert asyncio.run(scheduler.aacquire(10_000)) == 0.0
+
+def test_burst_then_refill_rate():
+    scheduler = drained(600)  # 10 requests per second
+    waited = scheduler.acquire(10)
+    assert 0.05 < waited < 0.5
+    assert scheduler.stats()["admitted"] == int(scheduler.requests.capacity) + 1
+
+def test_token_quota_counts_the_completion_allowance():
+    # 500 tokens per second, bursts of 5000
+    scheduler = RequestScheduler(tokens_per_minute=30000, max_completion_tokens=500, queue_timeout=5)
+    assert scheduler.cost(100) == 600
+    assert scheduler.acquire(4000) < 0.05
+    # 900 more tokens with 500 left: the prompt alone would have fit
+    waited = scheduler.acquire(400)
+    assert 0.5 < waited < 2.0
+
+def test_queue_timeout_raises_and_leaves_the_queue_clean():
+    scheduler = drained(6)
+    with pytest.raises(RateLimitTimeout):
+        scheduler.acquire(10, timeout=0.05)
+    stats = scheduler.stats()
+    assert stats["timed_out"] == 1
+    assert all(depth == 0 for depth in stats["queued"].values())
+
+def test_interactive_requests_go_before_queued_batch_requests():
+    scheduler = drained(120)  # one request every half second
+    admitted = []
+
+    def wait_for(priority):
+        scheduler.acquire(10, priority)
+        admitted.append(priority)
+
+    batch = threading.Thread(target=wait_for, args=(Priority.BATCH,))
+    batch.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=wait_for, args=(Priority.INTERACTIVE,))
+    interactive.start()
+    batch.join(timeout=5)
+    interactive.join(timeout=5)
+    assert admitted == [Priority.INTERACTIVE, Priority.BATCH]
+
+def test_cancelled_async_waiter_does_not_block_the_queue():
+    scheduler = drained(120)
+
+    async def cancel_one_then_acquire():
+        waiter = asyncio.ensure_future(scheduler.aacquire(10))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await scheduler.aacquire(10)
+
+    waited = asyncio.run(cancel_one_then_acquire())
+    assert waited < 1.0
+    stats = scheduler.stats()
+    assert stats["timed_out"] == 0
+    assert all(depth == 0 for depth in stats["queued"].values())
+
+def test_pause_holds_admission():
+    scheduler = RequestScheduler(requests_per_minute=6000, queue_timeout=5)
+    scheduler.pause(0.2)
+    assert scheduler.acquire(10) >= 0.15
+
+def test_prioritized_sets_the_priority_for_the_block():
+    assert current_priority() == Priority.INTERACTIVE
+    with prioritized(Priority.BACKGROUND):
+        assert current_priority() == Priority.BACKGROUND
+    assert current_priority() == Priority.INTERACTIVE
@@ -0,0 +1,76 @@
+import zlib
+
+import pytest
+
+import session_store
+from f1_agent_langchain import F1RacerAgent, RaceResult, RaceStage
+from session_store import (
+    MemorySessionStore, SQLiteSessionStore, decode_session, encode_session, get_session_store
+)
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), ttl_seconds=60)
+    return MemorySessionStore(ttl_seconds=60)
+
+def test_encoding_round_trips():
+    state = {"agent": None, "history": [["post", "", "Grüße 🏁", 1.5, None, None]], "configured": True}
+    assert decode_session(encode_session(state)) == state
+
+def test_unreadable_or_other_version_data_decodes_to_none():
+    assert decode_session(b"not zlib") is None
+    assert decode_session(zlib.compress(b'{"v": 999, "agent": null}')) is None
+
+def test_save_load_delete(store):
+    assert store.load("bob") is None
+    store.save("bob", {"configured": True})
+    store.save("amy", {"configured": False})
+    assert store.load("bob") == {"configured": True}
+
+    store.save("bob", {"configured": False})
+    assert store.load("bob") == {"configured": False}
+
+    store.delete("bob")
+    assert store.load("bob") is None
+    assert store.load("amy") == {"configured": False}
+
+def test_expired_sessions_are_not_loaded(store, monkeypatch):
+    store.save("bob", {"configured": True})
+    later = session_store.time.time() + 61
+    monkeypatch.setattr(session_store.time, "time", lambda: later)
+    assert store.load("bob") is None
+
+def test_sqlite_sessions_survive_reopening(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    SQLiteSessionStore(path).save("bob", {"configured": True})
+    assert SQLiteSessionStore(path).load("bob") == {"configured": True}
+
+def test_stores_are_shared_per_backend_and_path(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    assert get_session_store("sqlite", path) is get_session_store("sqlite", path)
+    assert get_session_store("memory") is get_session_store("memory", "ignored")
+    with pytest.raises(ValueError):
+        get_session_store("redis")
+
+def test_agent_state_survives_a_round_trip(make_agent):
+    agent = make_agent()
+    agent.update_context(
+        RaceStage.POST_RACE, circuit_name="Monaco", race_name="Monaco Grand Prix",
+        last_result=RaceResult.PODIUM, position=3, pregenerate=False
+    )
+    post = agent.speak("general")
+    agent.interaction_history.add("post", "", post, stage="post_race", mood=agent.context.mood)
+
+    state = decode_session(encode_session({"agent": agent.export_state()}))["agent"]
+    restored = F1RacerAgent.from_state(state, processor=agent.processor)
+
+    assert (restored.racer_name, restored.team_name) == (agent.racer_name, agent.team_name)
+    assert restored.context.stage == RaceStage.POST_RACE
+    assert restored.context.last_result == RaceResult.PODIUM
+    assert restored.context.position == 3
+    assert restored.context.mood == agent.context.mood
+    assert [p["content"] for p in restored.recent_posts] == [post]
+    assert [r.to_row() for r in restored.interaction_history] == [r.to_row() for r in agent.interaction_history]
+    if restored.post_index is not None:
+        assert restored.post_index.find(post) is not None
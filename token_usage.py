@@ -0,0 +1,31 @@
+from typing import List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from metrics import CHAIN_TAG_PREFIX, MetricsRegistry
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """Feeds prompt/completion token counts from every LLM call into a MetricsRegistry"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+
+    def on_llm_end(self, response, *, tags: Optional[List[str]] = None, **kwargs):
+        chain_name = next(
+            (tag[len(CHAIN_TAG_PREFIX):] for tag in tags or [] if tag.startswith(CHAIN_TAG_PREFIX)),
+            "unknown"
+        )
+
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens")
+        completion_tokens = usage.get("completion_tokens")
+
+        if prompt_tokens is None:
+            prompt_tokens = completion_tokens = 0
+            for generations in response.generations:
+                for generation in generations:
+                    metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    prompt_tokens += metadata.get("input_tokens", 0)
+                    completion_tokens += metadata.get("output_tokens", 0)
+
+        self.registry.record_tokens(chain_name, prompt_tokens or 0, completion_tokens or 0)